@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Literal
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from cloud_cost_audit.models.schema import has_value
+from cloud_cost_audit.transforms.rollup import requires_grain
+
+AllocationDriver = Literal["tagged_spend", "usage", "fixed"]
+
+# Owner label for spend no driver could place (e.g. nothing on the bill is tagged).
+UNALLOCATED_OWNER = "unallocated"
+
+
+def _driver_weights(
+    pools: npt.NDArray[np.int64],
+    owners: npt.NDArray[np.int64],
+    values: npt.NDArray[np.float64],
+    n_pools: int,
+    n_owners: int,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """Row-normalized (pool, owner, share) entries of the sparse pool x owner driver matrix.
+
+    Pools without any driver value take the bill-wide owner distribution instead.
+    """
+    cell = pools * n_owners + owners
+    ids, inverse = np.unique(cell, return_inverse=True)
+    value = np.bincount(inverse, weights=values)
+    keep = value > 0
+    ids, value = ids[keep], value[keep]
+    rows, cols = ids // n_owners, ids % n_owners
+    row_total = np.bincount(rows, weights=value, minlength=n_pools)
+
+    overall = np.bincount(cols, weights=value, minlength=n_owners)
+    orphan = np.flatnonzero(row_total <= 0)
+    if len(orphan) and overall.sum() > 0:
+        fallback = np.flatnonzero(overall)
+        rows = np.concatenate([rows, np.repeat(orphan, len(fallback))])
+        cols = np.concatenate([cols, np.tile(fallback, len(orphan))])
+        value = np.concatenate([value, np.tile(overall[fallback], len(orphan))])
+        row_total[orphan] = overall.sum()
+    return rows, cols, value / row_total[rows]
+
+
+@requires_grain("month")
+def allocate_shared_costs(
+    line_items: pd.DataFrame,
+    *,
+    key: str = "team",
+    driver: AllocationDriver = "tagged_spend",
+    scope: Sequence[str] = ("provider", "account"),
+    shared_services: Sequence[str] = (),
+    weights: Mapping[str, float] | None = None,
+) -> pd.DataFrame:
+    """Fully allocated spend per owner (distinct value of ``key``).
+
+    Spend without ``key`` and spend on ``shared_services`` forms one shared pool per
+    ``scope`` tuple, and each pool is spread across owners in proportion to ``driver``:
+    the owners' directly attributed spend or usage within the same scope, or fixed
+    ``weights``. Pools whose scope has no driver spend follow the bill-wide distribution.
+    The spread is a sparse (pools x owners) matrix product evaluated with ``bincount`` over
+    the non-zero entries, so the work is linear in line items plus non-zeros.
+
+    Returns ``key``, ``direct_cost_usd``, ``shared_cost_usd`` and ``total_cost_usd`` per
+    owner, largest total first; the totals add up to the bill.
+    """
+    owner = line_items[key].astype(object).fillna("").astype(str).to_numpy()
+    cost = line_items["cost_usd"].to_numpy(dtype=float)
+    shared = (
+        ~has_value(line_items[key])
+        | line_items["service"].astype(str).isin(shared_services).to_numpy()
+    )
+    direct = ~shared
+
+    fixed = dict(weights or {})
+    owner_codes, owner_names = pd.factorize(
+        np.concatenate([owner[direct], np.array(list(fixed), dtype=object)])
+    )
+    n_owners = len(owner_names)
+    direct_owner = owner_codes[: int(direct.sum())]
+    pool_codes = (
+        line_items.groupby(list(scope), observed=True, sort=False, dropna=False)
+        .ngroup()
+        .to_numpy(dtype=np.int64)
+    )
+    n_pools = int(pool_codes.max()) + 1 if len(pool_codes) else 0
+
+    if driver == "fixed":
+        fixed_codes = owner_codes[int(direct.sum()) :]
+        pools = np.repeat(np.arange(n_pools), len(fixed))
+        owners = np.tile(fixed_codes, n_pools)
+        values = np.tile(np.array(list(fixed.values()), dtype=float), n_pools)
+    else:
+        column = "cost_usd" if driver == "tagged_spend" else "usage_amount"
+        pools, owners = pool_codes[direct], direct_owner
+        values = line_items[column].to_numpy(dtype=float)[direct]
+    rows, cols, share = _driver_weights(pools, owners, values, n_pools, n_owners)
+
+    pool_cost = np.bincount(pool_codes[shared], weights=cost[shared], minlength=n_pools)
+    shared_cost = np.bincount(cols, weights=pool_cost[rows] * share, minlength=n_owners)
+    direct_cost = np.bincount(direct_owner, weights=cost[direct], minlength=n_owners)
+    out = pd.DataFrame(
+        {key: owner_names, "direct_cost_usd": direct_cost, "shared_cost_usd": shared_cost}
+    )
+    placed = np.zeros(n_pools, dtype=bool)
+    placed[rows] = True
+    unplaced = float(pool_cost[~placed].sum())
+    if unplaced:
+        out.loc[len(out)] = [UNALLOCATED_OWNER, 0.0, unplaced]
+    out["total_cost_usd"] = out["direct_cost_usd"] + out["shared_cost_usd"]
+    out = out.sort_values("total_cost_usd", ascending=False, kind="stable", ignore_index=True)
+    return out.round({"direct_cost_usd": 2, "shared_cost_usd": 2, "total_cost_usd": 2})
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from cloud_cost_audit.analytics.opportunities import (
+    OPPORTUNITY_COLUMNS,
+    opportunity_frame,
+)
+from cloud_cost_audit.transforms.rollup import last_usage_day, requires_grain, split_across_days
+
+ANOMALY_KEYS = ["provider", "account", "service", "team"]
+
+ANOMALY_COLUMNS = [
+    *ANOMALY_KEYS,
+    "usage_day",
+    "cost_usd",
+    "expected_usd",
+    "stddev_usd",
+    "zscore",
+]
+
+_STATE_COLUMNS = [*ANOMALY_KEYS, "last_day", "days", "mean", "var"]
+
+_STATE_DDL = """
+create table if not exists anomaly_state (
+    provider VARCHAR,
+    account VARCHAR,
+    service VARCHAR,
+    team VARCHAR,
+    last_day DATE,
+    days BIGINT,
+    mean DOUBLE,
+    var DOUBLE,
+    primary key (provider, account, service, team)
+);
+create table if not exists cost_anomalies (
+    provider VARCHAR,
+    account VARCHAR,
+    service VARCHAR,
+    team VARCHAR,
+    usage_day DATE,
+    cost_usd DOUBLE,
+    expected_usd DOUBLE,
+    stddev_usd DOUBLE,
+    zscore DOUBLE,
+    primary key (provider, account, service, team, usage_day)
+);
+"""
+
+
+def load_anomaly_state(con: duckdb.DuckDBPyConnection) -> pd.DataFrame:
+    con.execute(_STATE_DDL)
+    state = con.execute(f"select {', '.join(_STATE_COLUMNS)} from anomaly_state").fetchdf()
+    return state.astype({"last_day": "datetime64[ns]"})
+
+
+def update_anomaly_state(
+    state: pd.DataFrame,
+    daily: pd.DataFrame,
+    *,
+    alpha: float,
+    z_threshold: float,
+    warmup_days: int,
+    min_excess_usd: float,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Advance per-series EWMA mean/variance over the days of ``daily`` not yet in ``state``.
+
+    ``daily`` holds one cost per (series, ``usage_day``). Each series resumes the day after its
+    ``last_day`` (new series start at their first day); days without cost count as zero.
+    Days are stepped in order with every series updated at once, so the work is
+    O(new days x series) however long the history is. A day is anomalous when the series has
+    ``warmup_days`` of history and its cost exceeds the EWMA forecast by ``z_threshold``
+    standard deviations and by ``min_excess_usd``. Costs restated for days already folded
+    into the state are ignored.
+
+    Returns the new state and the anomalies found.
+    """
+    daily = daily.astype({k: str for k in ANOMALY_KEYS})
+    keys = (
+        pd.concat([state[ANOMALY_KEYS], daily[ANOMALY_KEYS]], ignore_index=True)
+        .drop_duplicates()
+        .reset_index(drop=True)
+    )
+    prior = keys.merge(state, on=ANOMALY_KEYS, how="left")
+    grouped = daily.groupby(ANOMALY_KEYS, observed=True, sort=False)
+    first_day = grouped["usage_day"].min().rename("first_day").reset_index()
+    prior = prior.merge(first_day, on=ANOMALY_KEYS, how="left")
+    start = (prior["last_day"] + pd.Timedelta(days=1)).fillna(prior["first_day"])
+    # Series with no unseen days keep their state untouched.
+    if daily.empty or (start > daily["usage_day"].max()).all():
+        return state.copy(), pd.DataFrame(columns=ANOMALY_COLUMNS)
+
+    days = pd.date_range(start.min(), daily["usage_day"].max(), freq="D")
+    codes = pd.MultiIndex.from_frame(keys).get_indexer(
+        pd.MultiIndex.from_frame(daily[ANOMALY_KEYS])
+    )
+    cols = ((daily["usage_day"] - days[0]) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+    in_window = cols >= 0
+    cost = np.zeros((len(keys), len(days)))
+    np.add.at(
+        cost,
+        (codes[in_window], cols[in_window]),
+        daily["cost_usd"].to_numpy(dtype=float)[in_window],
+    )
+    rows = np.arange(len(keys))
+    active = days.to_numpy()[None, :] >= start.to_numpy()[:, None]
+
+    n = prior["days"].fillna(0).to_numpy(dtype=np.int64)
+    mean = prior["mean"].fillna(0.0).to_numpy(dtype=float)
+    var = prior["var"].fillna(0.0).to_numpy(dtype=float)
+    found: list[pd.DataFrame] = []
+    for t, day in enumerate(days):
+        on = active[:, t]
+        x = cost[:, t]
+        std = np.sqrt(var)
+        excess = x - mean
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(std > 0, excess / std, np.inf)
+        flagged = on & (n >= warmup_days) & (z > z_threshold) & (excess > min_excess_usd)
+        if flagged.any():
+            hit = rows[flagged]
+            found.append(
+                keys.iloc[hit].assign(
+                    usage_day=day,
+                    cost_usd=x[hit],
+                    expected_usd=mean[hit],
+                    stddev_usd=std[hit],
+                    zscore=z[hit],
+                )
+            )
+        # West's EWMA update; a series' first day seeds the mean.
+        incr = alpha * excess
+        mean = np.where(on, np.where(n == 0, x, mean + incr), mean)
+        var = np.where(on & (n > 0), (1.0 - alpha) * (var + excess * incr), var)
+        n = n + on
+
+    last_seen = active.any(axis=1)
+    out = keys.assign(
+        last_day=prior["last_day"].where(~last_seen, days[-1]),
+        days=n,
+        mean=mean,
+        var=var,
+    )
+    anomalies = (
+        pd.concat(found, ignore_index=True)[ANOMALY_COLUMNS]
+        if found
+        else pd.DataFrame(columns=ANOMALY_COLUMNS)
+    )
+    return out[_STATE_COLUMNS], anomalies
+
+
+@requires_grain("day")
+def detect_cost_anomalies(
+    con: duckdb.DuckDBPyConnection,
+    line_items: pd.DataFrame,
+    *,
+    alpha: float = 0.1,
+    z_threshold: float = 4.0,
+    warmup_days: int = 7,
+    min_excess_usd: float = 50.0,
+    through: pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """Fold the unseen days of ``line_items`` into the persisted state and return every
+    recorded anomaly within their date range.
+
+    State and anomalies live in the ``anomaly_state`` / ``cost_anomalies`` tables, so a
+    daily run only processes the new days, and re-running over the same line items reports
+    the same anomalies. Days after ``through`` (default: the last metered day of
+    ``line_items``) are left for a later run, so fee rows covering the rest of the month do
+    not close days whose usage has not been billed yet.
+    """
+    if through is None:
+        through = last_usage_day(line_items)
+    # Monthly and fee rows are spread over their usage window, not booked on its first day.
+    windows = [c for c in ("usage_start_time", "usage_end_time") if c in line_items.columns]
+    line_items = split_across_days(line_items[[*ANOMALY_KEYS, "usage_day", "cost_usd", *windows]])
+    line_items = line_items[line_items["usage_day"] <= through]
+    keys = {k: line_items[k].astype(object).fillna("").astype(str) for k in ANOMALY_KEYS}
+    daily = (
+        line_items[["usage_day", "cost_usd"]]
+        .assign(**keys)
+        .groupby([*ANOMALY_KEYS, "usage_day"], observed=True, sort=False)["cost_usd"]
+        .sum()
+        .reset_index()
+    )
+    state, found = update_anomaly_state(
+        load_anomaly_state(con),
+        daily,
+        alpha=alpha,
+        z_threshold=z_threshold,
+        warmup_days=warmup_days,
+        min_excess_usd=min_excess_usd,
+    )
+    # Baselines and the anomalies they produced are replaced together or not at all.
+    con.execute("begin transaction")
+    try:
+        con.register("anomaly_state_df", state)
+        # The new state covers every stored series, so an upsert replaces it; DuckDB rejects
+        # re-inserting a key deleted earlier in the same transaction.
+        con.execute("insert or replace into anomaly_state select * from anomaly_state_df")
+        con.unregister("anomaly_state_df")
+        if not found.empty:
+            con.register("cost_anomalies_df", found)
+            con.execute("insert or replace into cost_anomalies select * from cost_anomalies_df")
+            con.unregister("cost_anomalies_df")
+        con.execute("commit")
+    except BaseException:
+        con.execute("rollback")
+        raise
+    if daily.empty:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    recorded = con.execute(
+        f"select {', '.join(ANOMALY_COLUMNS)} from cost_anomalies "
+        "where usage_day between ? and ? order by usage_day, provider, account, service, team",
+        [daily["usage_day"].min().date(), daily["usage_day"].max().date()],
+    ).fetchdf()
+    return recorded.astype({"usage_day": "datetime64[ns]"})
+
+
+def anomaly_opportunities(anomalies: pd.DataFrame) -> pd.DataFrame:
+    """One ``cost_anomaly`` opportunity per series: its largest spike, valued at the spend it
+    observed above the baseline."""
+    if anomalies.empty:
+        return opportunity_frame([])
+    excess = anomalies["cost_usd"] - anomalies["expected_usd"]
+    worst = anomalies.assign(excess_usd=excess).sort_values(
+        ["excess_usd", "usage_day"], ascending=[False, True], kind="stable"
+    )
+    worst = worst.drop_duplicates(ANOMALY_KEYS).reset_index(drop=True)
+    day = worst["usage_day"].dt.strftime("%Y-%m-%d")
+    frame = pd.DataFrame(
+        {
+            "kind": "cost_anomaly",
+            "title": (
+                "Investigate "
+                + worst["service"]
+                + " spend spike on "
+                + day
+                + " for "
+                + worst["provider"]
+                + " account "
+                + worst["account"]
+            ),
+            "scope": worst["provider"] + ":" + worst["account"] + ":" + worst["service"],
+            "estimated_savings_usd": worst["excess_usd"].round(2),
+            "confidence": "low",
+            "risk": "low",
+            "effort": "S",
+            "details": [
+                f"spent ${r.cost_usd:,.2f} vs expected ${r.expected_usd:,.2f} "
+                f"(z={r.zscore:.1f})"
+                for r in worst.itertuples()
+            ],
+            "team": worst["team"],
+        }
+    )
+    return frame[OPPORTUNITY_COLUMNS]
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Literal
+
+import duckdb
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+# Distinct (provider, service, sku) tuples are classified once; rows map to them by group code.
+CLASSIFICATION_KEYS = ["provider", "service", "sku"]
+# Per-row class bitmask column, set on the aggregate groups handed to line-item detectors.
+SERVICE_CLASS_COLUMN = "service_class"
+
+ServiceCategory = Literal[
+    "egress", "object_storage", "block_storage", "compute", "database", "analytics"
+]
+# Bit i of a class mask is set when the tuple belongs to SERVICE_CATEGORIES[i].
+SERVICE_CATEGORIES: tuple[ServiceCategory, ...] = (
+    "egress",
+    "object_storage",
+    "block_storage",
+    "compute",
+    "database",
+    "analytics",
+)
+
+
+@dataclass(frozen=True)
+class ClassificationRule:
+    category: ServiceCategory
+    column: Literal["service", "sku"]
+    # Case-insensitive substring match, or exact match against any of ``equals``.
+    contains: str | None = None
+    equals: tuple[str, ...] = ()
+    provider: str | None = None
+
+
+DEFAULT_RULES: tuple[ClassificationRule, ...] = (
+    ClassificationRule("egress", "service", contains="DataTransfer"),
+    ClassificationRule("egress", "sku", contains="Egress"),
+    ClassificationRule("egress", "service", contains="Networking"),
+    ClassificationRule("object_storage", "service", equals=("AmazonS3", "Cloud Storage")),
+    ClassificationRule("block_storage", "service", equals=("AmazonEBS",)),
+    ClassificationRule("compute", "service", equals=("AmazonEC2", "Compute Engine")),
+    ClassificationRule("database", "service", equals=("AmazonRDS", "Cloud SQL")),
+    ClassificationRule("analytics", "service", equals=("BigQuery", "AmazonAthena")),
+)
+
+_CACHE_DDL = """
+create table if not exists service_classification (
+    rules VARCHAR,
+    provider VARCHAR,
+    service VARCHAR,
+    sku VARCHAR,
+    classes USMALLINT
+)
+"""
+
+
+def category_bit(category: ServiceCategory) -> int:
+    return 1 << SERVICE_CATEGORIES.index(category)
+
+
+def classify_keys(
+    keys: pd.DataFrame, rules: Sequence[ClassificationRule]
+) -> npt.NDArray[np.uint16]:
+    """Class bitmask per row of a frame of distinct classification keys."""
+    classes = np.zeros(len(keys), dtype=np.uint16)
+    for rule in rules:
+        values = keys[rule.column].astype(str)
+        if rule.contains is not None:
+            hit = values.str.contains(rule.contains, case=False, regex=False)
+        else:
+            hit = values.isin(rule.equals)
+        if rule.provider is not None:
+            hit &= keys["provider"].astype(str) == rule.provider
+        classes[hit.to_numpy(dtype=bool)] |= np.uint16(category_bit(rule.category))
+    return classes
+
+
+class ClassificationIndex:
+    """Class bitmasks of (provider, service, sku) tuples under one rule table.
+
+    Tuples seen before (in this process, or loaded from the DuckDB cache) are not
+    re-classified, so a run only pays for SKUs that are new to the catalog.
+    """
+
+    def __init__(self, rules: Sequence[ClassificationRule] = DEFAULT_RULES) -> None:
+        self.rules = tuple(rules)
+        self.version = hashlib.blake2b(repr(self.rules).encode(), digest_size=8).hexdigest()
+        self._classes: dict[tuple[str, str, str], int] = {}
+        self._unsaved: set[tuple[str, str, str]] = set()
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+    def classify(self, frame: pd.DataFrame) -> npt.NDArray[np.uint16]:
+        """Class bitmask per row of ``frame``, evaluated once per distinct key tuple."""
+        grouped = frame.groupby(CLASSIFICATION_KEYS, observed=True, sort=False, dropna=False)
+        codes = grouped.ngroup().to_numpy()
+        _, first = np.unique(codes, return_index=True)
+        distinct = frame[CLASSIFICATION_KEYS].iloc[first].astype(str)
+        keys = list(distinct.itertuples(index=False, name=None))
+        missing = [i for i, key in enumerate(keys) if key not in self._classes]
+        if missing:
+            new = classify_keys(distinct.iloc[missing], self.rules)
+            for i, value in zip(missing, new.tolist(), strict=True):
+                self._classes[keys[i]] = value
+                self._unsaved.add(keys[i])
+        lookup = np.array([self._classes[key] for key in keys], dtype=np.uint16)
+        classes: npt.NDArray[np.uint16] = lookup[codes]
+        return classes
+
+    @staticmethod
+    def load(
+        con: duckdb.DuckDBPyConnection, rules: Sequence[ClassificationRule] = DEFAULT_RULES
+    ) -> ClassificationIndex:
+        index = ClassificationIndex(rules)
+        con.execute(_CACHE_DDL)
+        rows = con.execute(
+            "select provider, service, sku, classes from service_classification where rules = ?",
+            [index.version],
+        ).fetchall()
+        index._classes.update(((p, s, k), c) for p, s, k, c in rows)
+        return index
+
+    def save(self, con: duckdb.DuckDBPyConnection) -> None:
+        """Persist tuples classified since load; entries of other rule tables are dropped."""
+        con.execute(_CACHE_DDL)
+        con.execute("delete from service_classification where rules <> ?", [self.version])
+        if self._unsaved:
+            con.executemany(
+                "insert into service_classification values (?, ?, ?, ?, ?)",
+                [[self.version, *key, self._classes[key]] for key in sorted(self._unsaved)],
+            )
+            self._unsaved.clear()
+
+
+_DEFAULT_INDEX = ClassificationIndex()
+
+
+def in_category(frame: pd.DataFrame, category: ServiceCategory) -> npt.NDArray[np.bool_]:
+    """Row mask of ``frame`` in ``category``, from its class column if already classified."""
+    if SERVICE_CLASS_COLUMN in frame.columns:
+        classes = frame[SERVICE_CLASS_COLUMN].to_numpy(dtype=np.uint16)
+    else:
+        classes = _DEFAULT_INDEX.classify(frame)
+    mask: npt.NDArray[np.bool_] = (classes & category_bit(category)) != 0
+    return mask
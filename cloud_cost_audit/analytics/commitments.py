@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from cloud_cost_audit.analytics.classification import in_category
+from cloud_cost_audit.analytics.opportunities import Opportunity
+from cloud_cost_audit.analytics.registry import register_detector
+from cloud_cost_audit.units import HOURS_PER_MONTH
+
+# Opt-in replacement for the flat "commitments" detector: add this module to
+# detectors.modules and "commitments" to detectors.disabled. Needs hourly line items
+# (ingestion.rollup_grain unset).
+
+CURVE_KEYS = ["provider", "account"]
+
+
+@dataclass(frozen=True)
+class HourlySpendCurves:
+    keys: pd.DataFrame
+    hours: pd.DatetimeIndex
+    # On-demand-equivalent spend per key (row) and hour (column), USD.
+    spend: npt.NDArray[np.float64]
+
+
+@dataclass(frozen=True)
+class CommitmentSimulation:
+    """Commitment levels (on-demand-equivalent USD/hour) evaluated against one spend curve.
+
+    ``coverage[k]`` is the share of spend covered at ``levels[k]``, ``utilization[k]`` the
+    share of the commitment used, and ``savings[t, k]`` the net saving over the curve of
+    committing ``levels[k]`` under ``terms[t]``.
+    """
+
+    terms: list[str]
+    levels: npt.NDArray[np.float64]
+    coverage: npt.NDArray[np.float64]
+    utilization: npt.NDArray[np.float64]
+    savings: npt.NDArray[np.float64]
+
+    def best(self) -> tuple[str, int]:
+        """``(term, level index)`` maximizing savings."""
+        t, k = np.unravel_index(int(np.argmax(self.savings)), self.savings.shape)
+        return self.terms[int(t)], int(k)
+
+
+def hourly_spend_curves(line_items: pd.DataFrame) -> HourlySpendCurves:
+    """Spread each line item's cost evenly over the hours it covers, per (provider, account).
+
+    Hourly rows land on their own hour; daily or monthly rows are spread across their usage
+    window, which keeps the curve's total equal to the line-item cost.
+    """
+    start = line_items["usage_start_time"].dt.floor("h")
+    end = line_items["usage_end_time"].dt.ceil("h")
+    end = end.where(end > start, start + pd.Timedelta(hours=1))
+    first = start.min()
+    hours = pd.date_range(first, end.max(), freq="h", inclusive="left")
+    grouped = line_items.groupby(CURVE_KEYS, observed=True, sort=True)
+    rows = grouped.ngroup().to_numpy()
+    keys = grouped.size().reset_index()[CURVE_KEYS]
+    h0 = ((start - first) // pd.Timedelta(hours=1)).to_numpy(dtype=np.int64)
+    h1 = ((end - first) // pd.Timedelta(hours=1)).to_numpy(dtype=np.int64)
+    rate = line_items["cost_usd"].to_numpy(dtype=float) / (h1 - h0)
+    # Difference array: +rate at each window start, -rate at its end, then a running sum.
+    diff = np.zeros((len(keys), len(hours) + 1))
+    np.add.at(diff, (rows, h0), rate)
+    np.add.at(diff, (rows, h1), -rate)
+    return HourlySpendCurves(keys=keys, hours=hours, spend=np.cumsum(diff, axis=1)[:, :-1])
+
+
+def simulate_commitments(
+    spend: npt.NDArray[np.float64], discounts: Mapping[str, float], *, levels: int = 200
+) -> CommitmentSimulation:
+    """Evaluate ``levels`` commitment levels x every term in ``discounts`` over ``spend``.
+
+    Committing ``L`` (on-demand-equivalent USD/hour) at discount ``d`` costs
+    ``L * (1 - d)`` every hour and covers ``min(spend, L)``, so the saving is
+    ``sum(min(spend, L)) - H * L * (1 - d)``. ``sum(min(spend, L))`` is read off the sorted
+    curve's prefix sums for all levels at once; terms then broadcast against levels.
+    """
+    curve = np.sort(np.clip(spend, 0.0, None))
+    n_hours = len(curve)
+    candidates = np.linspace(0.0, curve[-1] if n_hours else 0.0, levels)
+    prefix = np.concatenate([[0.0], np.cumsum(curve)])
+    below = np.searchsorted(curve, candidates, side="left")
+    covered = prefix[below] + candidates * (n_hours - below)
+    total = prefix[-1]
+    committed = candidates * n_hours
+    terms = list(discounts)
+    rates = 1.0 - np.array([discounts[t] for t in terms])
+    savings = covered[None, :] - committed[None, :] * rates[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = np.where(total > 0, covered / total, 0.0)
+        utilization = np.where(committed > 0, covered / committed, 1.0)
+    return CommitmentSimulation(
+        terms=terms, levels=candidates, coverage=coverage, utilization=utilization, savings=savings
+    )
+
+
+@register_detector(
+    "commitment_model",
+    inputs=("line_items",),
+    grain="line_item",
+    thresholds={"discounts": "commitment_discounts", "levels": "commitment_levels"},
+)
+def detect_modeled_commitments(
+    *,
+    line_items: pd.DataFrame,
+    discounts: Mapping[str, Mapping[str, float]],
+    levels: int,
+) -> list[Opportunity]:
+    usage = line_items["line_item_type"].astype(str).to_numpy() == "Usage"
+    compute = line_items[in_category(line_items, "compute") & usage]
+    if compute.empty:
+        return []
+    curves = hourly_spend_curves(compute)
+    out: list[Opportunity] = []
+    for row, (provider, account) in enumerate(curves.keys.itertuples(index=False)):
+        terms = discounts.get(str(provider))
+        if not terms:
+            continue
+        sim = simulate_commitments(curves.spend[row], terms, levels=levels)
+        term, k = sim.best()
+        saving = float(sim.savings[sim.terms.index(term), k])
+        if saving <= 0:
+            continue
+        monthly = saving / len(curves.hours) * HOURS_PER_MONTH
+        out.append(
+            Opportunity(
+                kind=f"commitments_{provider}",
+                title=(
+                    f"Commit ${sim.levels[k]:,.2f}/h on-demand-equivalent compute "
+                    f"({term}) for {provider} account {account}"
+                ),
+                scope=f"{provider}:{account}:compute",
+                estimated_savings_usd=round(monthly, 2),
+                confidence="high",
+                risk="low",
+                effort="S",
+                details=(
+                    f"coverage={sim.coverage[k]:.0%}, utilization={sim.utilization[k]:.0%}, "
+                    f"hourly commitment=${sim.levels[k] * (1 - terms[term]):,.2f} "
+                    f"over {len(curves.hours)} observed hours"
+                ),
+            )
+        )
+    return out
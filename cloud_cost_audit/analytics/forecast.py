@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from cloud_cost_audit.transforms.rollup import last_usage_day, requires_grain, usage_day_spans
+
+SERIES_KEYS = ["provider", "account", "service"]
+
+# History needed before fitting a trend, and before adding day-of-week seasonality.
+_MIN_DAYS_FOR_TREND = 7
+_MIN_DAYS_FOR_SEASONALITY = 14
+
+
+@dataclass(frozen=True)
+class DailyCostSeries:
+    keys: pd.DataFrame
+    days: pd.DatetimeIndex
+    # Cost per series (row) and day (column), USD; days without line items are zero.
+    cost: npt.NDArray[np.float64]
+
+
+def daily_cost_series(
+    line_items: pd.DataFrame, *, through: pd.Timestamp | None = None
+) -> DailyCostSeries:
+    """Cost per (provider, account, service) and day, each row spread evenly over its window.
+
+    Monthly or fee rows cover their whole usage window instead of landing on its first day,
+    but the series stop at ``through`` (by default the last day with metered usage), so a
+    mid-month run does not book fees on days that have not happened yet. A difference array
+    (+rate at each window's first day, -rate after its last, then a running sum) keeps this
+    linear in rows plus series x days.
+    """
+    start, spans = usage_day_spans(line_items)
+    if through is None:
+        through = last_usage_day(line_items)
+    grouped = line_items.groupby(SERIES_KEYS, observed=True, sort=True)
+    rows = grouped.ngroup().to_numpy()
+    keys = grouped.size().reset_index()[SERIES_KEYS]
+    first = start.min()
+    n_days = (through - first) // pd.Timedelta(days=1) + 1
+    d0 = ((start - first) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+    d1 = np.minimum(d0 + spans, n_days)
+    rate = line_items["cost_usd"].to_numpy(dtype=float) / spans
+    seen = d0 < n_days
+    diff = np.zeros((len(keys), n_days + 1))
+    np.add.at(diff, (rows[seen], d0[seen]), rate[seen])
+    np.add.at(diff, (rows[seen], d1[seen]), -rate[seen])
+    days = pd.date_range(first, periods=n_days, freq="D")
+    return DailyCostSeries(keys=keys, days=days, cost=np.cumsum(diff, axis=1)[:, :-1])
+
+
+def _design(days: pd.DatetimeIndex, origin: pd.Timestamp, columns: int) -> npt.NDArray[np.float64]:
+    """Intercept, linear trend, then Tuesday..Sunday indicators (Monday is the baseline)."""
+    t = ((days - origin) // pd.Timedelta(days=1)).to_numpy(dtype=float)
+    weekday = days.dayofweek.to_numpy()
+    weekdays = [weekday == d for d in range(1, 7)]
+    full = np.column_stack([np.ones(len(days)), t, *weekdays]).astype(float)
+    return full[:, :columns]
+
+
+def fit_daily_forecast(
+    series: DailyCostSeries, horizon: pd.DatetimeIndex, *, seasonality: bool = True
+) -> npt.NDArray[np.float64]:
+    """Projected cost per series over the ``horizon`` days (series x horizon).
+
+    Every series shares one design matrix, so all of them are fitted by a single
+    least-squares solve with the stacked series as right-hand sides. The model grows with
+    the available history: mean, then linear trend, then weekly seasonality.
+    """
+    n_days = len(series.days)
+    columns = 1
+    if n_days >= _MIN_DAYS_FOR_TREND:
+        columns = 2
+    if seasonality and n_days >= _MIN_DAYS_FOR_SEASONALITY:
+        columns = 8
+    origin = series.days[0]
+    coef, *_ = np.linalg.lstsq(_design(series.days, origin, columns), series.cost.T, rcond=None)
+    projected: npt.NDArray[np.float64] = np.clip(
+        (_design(horizon, origin, columns) @ coef).T, 0.0, None
+    )
+    return projected
+
+
+@requires_grain("day")
+def forecast_spend(
+    line_items: pd.DataFrame,
+    *,
+    seasonality: bool = True,
+    through: pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """Month-end and next-quarter spend per (provider, account, service).
+
+    The forecast is as of ``through``, by default the last day with metered usage (see
+    ``daily_cost_series``): the current month is its month-to-date actuals plus projections
+    for the remaining days, and the next quarter is the calendar quarter after the one
+    containing that day.
+    """
+    series = daily_cost_series(line_items, through=through)
+    as_of = series.days[-1]
+    month_end = as_of + pd.offsets.MonthEnd(0)
+    next_quarter = as_of.to_period("Q") + 1
+    quarter_end = next_quarter.end_time.normalize()
+    horizon = pd.date_range(as_of + pd.Timedelta(days=1), quarter_end, freq="D")
+    projected = fit_daily_forecast(series, horizon, seasonality=seasonality)
+
+    in_month = series.days.to_period("M") == as_of.to_period("M")
+    rest_of_month = horizon <= month_end
+    in_next_quarter = horizon.to_period("Q") == next_quarter
+    out = series.keys.copy()
+    out["as_of"] = as_of.date().isoformat()
+    out["month_to_date_usd"] = series.cost[:, in_month].sum(axis=1).round(2)
+    out["forecast_month_usd"] = (
+        series.cost[:, in_month].sum(axis=1) + projected[:, rest_of_month].sum(axis=1)
+    ).round(2)
+    out["next_quarter"] = str(next_quarter)
+    out["forecast_next_quarter_usd"] = projected[:, in_next_quarter].sum(axis=1).round(2)
+    return out
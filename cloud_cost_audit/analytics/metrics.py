@@ -4,8 +4,12 @@ import json
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from cloud_cost_audit.models.schema import has_value
+from cloud_cost_audit.transforms.rollup import requires_grain
+
 
 @dataclass(frozen=True)
 class TagCoverage:
@@ -29,50 +33,98 @@ class TagCoverage:
         )
 
 
-def compute_tag_coverage(line_items: pd.DataFrame, required_keys: list[str]) -> TagCoverage:
-    total = float(line_items["cost_usd"].sum())
-    coverage_by_key: dict[str, float] = {}
-    for key in required_keys:
-        has = line_items[key].astype(str).str.len() > 0
-        coverage_by_key[key] = (
-            float(line_items.loc[has, "cost_usd"].sum() / total) if total else 0.0
+# Columns kept by the single-pass aggregation: what the exports and the line-item detectors
+# read besides the allocation keys, which are folded into one presence bitmask.
+AGGREGATE_COLUMNS = ["provider", "service", "sku", "env"]
+
+
+@dataclass(frozen=True)
+class LineItemAggregates:
+    """Cost summed once per (provider, service, sku, env, tag bitmask) group.
+
+    Bit ``i`` of ``tag_mask`` is set when ``required_keys[i]`` is non-blank. Baseline, tag
+    coverage, the service/unallocated exports and the line-item detectors are all cheap
+    reductions over these few groups instead of separate passes over the line items.
+    """
+
+    required_keys: list[str]
+    groups: pd.DataFrame
+
+    @property
+    def total_cost_usd(self) -> float:
+        return float(self.groups["cost_usd"].sum())
+
+    @property
+    def fully_allocated(self) -> pd.Series:
+        full = (1 << len(self.required_keys)) - 1
+        return self.groups["tag_mask"] == full
+
+    def tag_coverage(self) -> TagCoverage:
+        total = self.total_cost_usd
+        cost = self.groups["cost_usd"]
+        coverage_by_key: dict[str, float] = {}
+        for bit, key in enumerate(self.required_keys):
+            has = (self.groups["tag_mask"] & (1 << bit)) != 0
+            coverage_by_key[key] = float(cost[has].sum() / total) if total else 0.0
+        fully_allocated_cost = float(cost[self.fully_allocated].sum())
+        return TagCoverage(
+            required_keys=self.required_keys,
+            total_cost_usd=total,
+            coverage_by_key=coverage_by_key,
+            fully_allocated_cost_usd=fully_allocated_cost,
+            fully_allocated_pct=(fully_allocated_cost / total) if total else 0.0,
         )
 
-    fully_allocated = line_items.copy()
-    for key in required_keys:
-        fully_allocated = fully_allocated[fully_allocated[key].astype(str).str.len() > 0]
-    fully_allocated_cost = float(fully_allocated["cost_usd"].sum())
-    fully_allocated_pct = (fully_allocated_cost / total) if total else 0.0
-    return TagCoverage(
-        required_keys=required_keys,
-        total_cost_usd=total,
-        coverage_by_key=coverage_by_key,
-        fully_allocated_cost_usd=fully_allocated_cost,
-        fully_allocated_pct=fully_allocated_pct,
+    def cost_by_service(self) -> pd.DataFrame:
+        return _cost_by_service(self.groups)
+
+    def unallocated_spend(self) -> pd.DataFrame:
+        return _cost_by_service(self.groups.loc[~self.fully_allocated])
+
+
+@requires_grain("month")
+def aggregate_line_items(line_items: pd.DataFrame, required_keys: list[str]) -> LineItemAggregates:
+    if len(required_keys) > 16:
+        raise ValueError("At most 16 allocation keys fit the tag bitmask")
+    mask = np.zeros(len(line_items), dtype=np.uint16)
+    for bit, key in enumerate(required_keys):
+        mask |= has_value(line_items[key]).astype(np.uint16) << bit
+    keys = [col for col in AGGREGATE_COLUMNS if col in line_items.columns]
+    groups = (
+        line_items[[*keys, "cost_usd"]]
+        .assign(tag_mask=mask)
+        .groupby([*keys, "tag_mask"], as_index=False, sort=False, dropna=False, observed=True)[
+            "cost_usd"
+        ]
+        .sum()
     )
+    return LineItemAggregates(required_keys=list(required_keys), groups=groups)
 
 
-def export_cost_by_service(line_items: pd.DataFrame, out_csv: Path) -> pd.DataFrame:
-    df = (
-        line_items.groupby(["provider", "service"], as_index=False)["cost_usd"]
+def _cost_by_service(groups: pd.DataFrame) -> pd.DataFrame:
+    return (
+        groups.groupby(["provider", "service"], as_index=False, observed=True)["cost_usd"]
         .sum()
         .sort_values("cost_usd", ascending=False)
     )
+
+
+@requires_grain("month")
+def compute_tag_coverage(line_items: pd.DataFrame, required_keys: list[str]) -> TagCoverage:
+    return aggregate_line_items(line_items, required_keys).tag_coverage()
+
+
+@requires_grain("month")
+def export_cost_by_service(line_items: pd.DataFrame, out_csv: Path) -> pd.DataFrame:
+    df = aggregate_line_items(line_items, []).cost_by_service()
     df.to_csv(out_csv, index=False)
     return df
 
 
+@requires_grain("month")
 def export_unallocated_spend(
     line_items: pd.DataFrame, required_keys: list[str], out_csv: Path
 ) -> pd.DataFrame:
-    mask = pd.Series(False, index=line_items.index)
-    for key in required_keys:
-        mask = mask | (line_items[key].astype(str).str.len() == 0)
-    df = (
-        line_items.loc[mask]
-        .groupby(["provider", "service"], as_index=False)["cost_usd"]
-        .sum()
-        .sort_values("cost_usd", ascending=False)
-    )
+    df = aggregate_line_items(line_items, required_keys).unallocated_spend()
     df.to_csv(out_csv, index=False)
     return df
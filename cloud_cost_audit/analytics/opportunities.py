@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import astuple, dataclass, fields
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Opportunity:
+    kind: str
+    title: str
+    scope: str
+    estimated_savings_usd: float
+    confidence: str
+    risk: str
+    effort: str
+    details: str
+    # Owning team for showback; empty for account-wide findings.
+    team: str = ""
+
+
+# Columnar opportunity set: one column per Opportunity field. Detectors that can flag one
+# opportunity per resource build these columns vectorized; Opportunity objects are only
+# created for the rows that make it into the ranked output.
+OPPORTUNITY_COLUMNS = [f.name for f in fields(Opportunity)]
+
+
+def opportunity_frame(opportunities: Sequence[Opportunity]) -> pd.DataFrame:
+    return pd.DataFrame([astuple(o) for o in opportunities], columns=OPPORTUNITY_COLUMNS).astype(
+        {"estimated_savings_usd": float}
+    )
+
+
+def materialize_opportunities(frame: pd.DataFrame) -> list[Opportunity]:
+    return [
+        Opportunity(*row) for row in frame[OPPORTUNITY_COLUMNS].itertuples(index=False, name=None)
+    ]
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
-from cloud_cost_audit.analytics.waste_detection import Opportunity
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+from cloud_cost_audit.analytics.opportunities import (
+    OPPORTUNITY_COLUMNS,
+    Opportunity,
+    materialize_opportunities,
+    opportunity_frame,
+)
 from cloud_cost_audit.models.core import QuickWin
 
+_SAVINGS = "estimated_savings_usd"
+
 
 def _as_quick_win(rank: int, opp: Opportunity) -> QuickWin:
     return QuickWin(
@@ -21,12 +33,123 @@ def _as_quick_win(rank: int, opp: Opportunity) -> QuickWin:
     )
 
 
-def build_top_10_quick_wins(opportunities: list[Opportunity]) -> list[QuickWin]:
-    ranked = sorted(opportunities, key=lambda o: o.estimated_savings_usd, reverse=True)
-    top = ranked[:10]
-    out: list[QuickWin] = []
-    for idx, opp in enumerate(top, start=1):
-        out.append(_as_quick_win(idx, opp))
-    if len(out) != 10:
-        raise ValueError(f"Expected exactly 10 quick wins, got {len(out)}")
-    return out
+def _as_frame(opportunities: Sequence[Opportunity] | pd.DataFrame) -> pd.DataFrame:
+    if isinstance(opportunities, pd.DataFrame):
+        return opportunities[OPPORTUNITY_COLUMNS]
+    return opportunity_frame(opportunities)
+
+
+def _largest(frame: pd.DataFrame, n: int) -> pd.DataFrame:
+    """The ``n`` highest-savings rows in their original order; ties keep the earliest rows."""
+    if len(frame) <= n:
+        return frame
+    savings = frame[_SAVINGS].to_numpy(dtype=float)
+    cutoff = np.partition(savings, len(savings) - n)[len(savings) - n]
+    keep = savings > cutoff
+    tied = np.flatnonzero(savings == cutoff)[: n - int(keep.sum())]
+    keep[tied] = True
+    return frame[keep]
+
+
+def _by_savings(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.sort_values(_SAVINGS, ascending=False, kind="stable")
+
+
+class TopOpportunities:
+    """Streaming top-``k`` opportunity selector with optional per-kind / per-team caps.
+
+    Batches (detector outputs, partitions of a large candidate set) are pushed one at a time
+    and reduced as they arrive, so only a bounded candidate set is ever held: the ``k`` best
+    rows without caps, the best ``min(k, cap)`` per kind or team with one cap, and per
+    (kind, team) pair with both. Ranking matches a stable sort by savings over all batches
+    in arrival order, with caps applied greedily from the top.
+    """
+
+    def __init__(
+        self, k: int = 10, *, max_per_kind: int | None = None, max_per_team: int | None = None
+    ) -> None:
+        if k < 1:
+            raise ValueError("k must be positive")
+        self.k = k
+        self._caps = {
+            col: cap for col, cap in (("kind", max_per_kind), ("team", max_per_team)) if cap
+        }
+        self._candidates = opportunity_frame([])
+
+    @property
+    def candidate_count(self) -> int:
+        """Rows currently held; stays bounded however many batches are pushed."""
+        return len(self._candidates)
+
+    def push(self, opportunities: Sequence[Opportunity] | pd.DataFrame) -> None:
+        batch = _as_frame(opportunities)
+        if not self._caps:
+            # argpartition-style selection; the batch is never sorted.
+            batch = _largest(batch, self.k)
+        merged = pd.concat([self._candidates, batch], ignore_index=True)
+        self._candidates = self._prune(merged)
+
+    def _prune(self, frame: pd.DataFrame) -> pd.DataFrame:
+        if not self._caps:
+            return _largest(frame, self.k)
+        keys = list(self._caps)
+        limit = min(self.k, *self._caps.values())
+        ranked = _by_savings(frame)
+        kept = ranked[ranked.groupby(keys, sort=False).cumcount().to_numpy() < limit].sort_index()
+        # With a single cap the greedy pass never skips past the capped rows, so the k best
+        # of them are exact.
+        return _largest(kept, self.k) if len(keys) == 1 else kept
+
+    def result(self) -> pd.DataFrame:
+        ranked = _by_savings(self._candidates)
+        if self._caps:
+            counts: dict[tuple[str, str], int] = {}
+            selected: list[int] = []
+            columns = [ranked[col].to_numpy() for col in self._caps]
+            for pos, values in enumerate(zip(*columns, strict=True)):
+                group = list(zip(self._caps, values, strict=True))
+                if any(counts.get(g, 0) >= self._caps[g[0]] for g in group):
+                    continue
+                for g in group:
+                    counts[g] = counts.get(g, 0) + 1
+                selected.append(pos)
+                if len(selected) == self.k:
+                    break
+            ranked = ranked.iloc[selected]
+        return ranked.head(self.k).reset_index(drop=True)
+
+
+def select_top_opportunities(
+    opportunities: Sequence[Opportunity] | pd.DataFrame,
+    *,
+    k: int = 10,
+    max_per_kind: int | None = None,
+    max_per_team: int | None = None,
+) -> pd.DataFrame:
+    top = TopOpportunities(k, max_per_kind=max_per_kind, max_per_team=max_per_team)
+    top.push(opportunities)
+    return top.result()
+
+
+def top_opportunities_by_team(
+    opportunities: Sequence[Opportunity] | pd.DataFrame, *, k: int = 5
+) -> pd.DataFrame:
+    """Top ``k`` opportunities of every team, ranked within the team, from one sort."""
+    ranked = _by_savings(_as_frame(opportunities))
+    team_rank = ranked.groupby("team", sort=False).cumcount().to_numpy() + 1
+    out = ranked.assign(team_rank=team_rank)[team_rank <= k]
+    return out.sort_values(["team", "team_rank"], kind="stable").reset_index(drop=True)
+
+
+def build_quick_wins(
+    opportunities: Sequence[Opportunity] | pd.DataFrame,
+    *,
+    k: int = 10,
+    max_per_kind: int | None = None,
+    max_per_team: int | None = None,
+) -> list[QuickWin]:
+    """Rank the best ``k`` opportunities as quick wins; fewer are returned if fewer exist."""
+    top = select_top_opportunities(
+        opportunities, k=k, max_per_kind=max_per_kind, max_per_team=max_per_team
+    )
+    return [_as_quick_win(idx, opp) for idx, opp in enumerate(materialize_opportunities(top), 1)]
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import importlib
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Literal, TypeVar
+
+import pandas as pd
+from pydantic import BaseModel
+
+from cloud_cost_audit.analytics.opportunities import OPPORTUNITY_COLUMNS, opportunity_frame
+from cloud_cost_audit.io.pricing_catalog import PricingCatalog
+from cloud_cost_audit.transforms.rollup import Grain
+
+# What a detector can ask for, passed as the keyword argument of the same name:
+# - "inventory" / "utilization": the shared per-run resource tables.
+# - "line_items": unified line items rolled up to the detector's declared grain.
+# - "line_item_groups": the single-pass aggregate groups (provider/service/sku/env/tag mask),
+#   passed as ``line_items=``; enough for detectors that only filter and sum cost.
+# - "pricing": the indexed pricing catalog, or None when none is configured.
+DetectorInput = Literal["inventory", "utilization", "line_items", "line_item_groups", "pricing"]
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+@dataclass(frozen=True)
+class DetectorSpec:
+    name: str
+    fn: Callable[..., Any]
+    inputs: tuple[DetectorInput, ...]
+    grain: Grain = "line_item"
+    # Keyword argument -> Thresholds field (or ``thresholds.custom`` key) supplying it.
+    thresholds: Mapping[str, str] = field(default_factory=dict)
+    # Relative runtime hint; costlier detectors are started first.
+    cost: int = 1
+
+
+@dataclass(frozen=True)
+class DetectorInputs:
+    inventory: pd.DataFrame
+    utilization: pd.DataFrame
+    line_items: Callable[[Grain], pd.DataFrame]
+    line_item_groups: pd.DataFrame
+    pricing: PricingCatalog | None = None
+
+
+_REGISTRY: dict[str, DetectorSpec] = {}
+
+BUILTIN_DETECTOR_MODULES = ("cloud_cost_audit.analytics.waste_detection",)
+
+
+def register_detector(
+    name: str,
+    *,
+    inputs: Sequence[DetectorInput],
+    grain: Grain = "line_item",
+    thresholds: Mapping[str, str] | None = None,
+    cost: int = 1,
+) -> Callable[[_F], _F]:
+    """Register a detector returning an opportunity frame or a list of ``Opportunity``."""
+
+    def register(fn: _F) -> _F:
+        if name in _REGISTRY:
+            raise ValueError(f"Detector already registered: {name}")
+        _REGISTRY[name] = DetectorSpec(
+            name=name,
+            fn=fn,
+            inputs=tuple(inputs),
+            grain=grain,
+            thresholds=dict(thresholds or {}),
+            cost=cost,
+        )
+        return fn
+
+    return register
+
+
+def load_detector_modules(modules: Sequence[str]) -> None:
+    """Import modules whose ``@register_detector`` decorators add their detectors."""
+    for module in modules:
+        importlib.import_module(module)
+
+
+def registered_detectors(
+    enabled: Sequence[str] | None = None,
+    disabled: Sequence[str] = (),
+    *,
+    modules: Sequence[str] | None = None,
+) -> list[DetectorSpec]:
+    """Specs in registration order, restricted to ``enabled`` (if given) minus ``disabled``.
+
+    ``modules`` limits the candidates to detectors defined in those modules, so a plugin
+    imported for one run is not picked up by later runs in the same process.
+    """
+    candidates = {
+        name: spec
+        for name, spec in _REGISTRY.items()
+        if modules is None or spec.fn.__module__ in modules
+    }
+    unknown = sorted(set(enabled or ()).union(disabled) - set(candidates))
+    if unknown:
+        raise ValueError(f"Unknown detectors: {unknown}. Registered: {sorted(candidates)}")
+    return [
+        spec
+        for spec in candidates.values()
+        if (enabled is None or spec.name in enabled) and spec.name not in disabled
+    ]
+
+
+def run_detectors(
+    specs: Sequence[DetectorSpec],
+    inputs: DetectorInputs,
+    *,
+    thresholds: BaseModel,
+    executor: Literal["thread", "process"] = "thread",
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """Run independent detectors concurrently and merge their opportunities.
+
+    Arguments are resolved up front on the calling thread (rollups are memoized there), the
+    inputs are shared read-only, and results are concatenated in ``specs`` order whatever
+    the completion order, so the merged frame is deterministic.
+    """
+    calls = [(spec, _kwargs(spec, inputs, thresholds)) for spec in specs]
+    if max_workers == 1 or len(calls) <= 1:
+        results = [spec.fn(**kwargs) for spec, kwargs in calls]
+    else:
+        pool: Executor = (
+            ProcessPoolExecutor(max_workers=max_workers)
+            if executor == "process"
+            else ThreadPoolExecutor(max_workers=max_workers)
+        )
+        with pool:
+            futures: dict[int, Future[Any]] = {}
+            for idx in sorted(range(len(calls)), key=lambda i: -calls[i][0].cost):
+                spec, kwargs = calls[idx]
+                futures[idx] = pool.submit(spec.fn, **kwargs)
+            results = [futures[idx].result() for idx in range(len(calls))]
+    frames = [r if isinstance(r, pd.DataFrame) else opportunity_frame(r) for r in results]
+    if not frames:
+        return opportunity_frame([])
+    return pd.concat([f[OPPORTUNITY_COLUMNS] for f in frames], ignore_index=True)
+
+
+def _kwargs(spec: DetectorSpec, inputs: DetectorInputs, thresholds: BaseModel) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {}
+    for name in spec.inputs:
+        if name == "line_items":
+            kwargs["line_items"] = inputs.line_items(spec.grain)
+        elif name == "line_item_groups":
+            kwargs["line_items"] = inputs.line_item_groups
+        else:
+            kwargs[name] = getattr(inputs, name)
+    custom: Mapping[str, Any] = getattr(thresholds, "custom", {})
+    for kwarg, threshold in spec.thresholds.items():
+        if threshold in type(thresholds).model_fields:
+            kwargs[kwarg] = getattr(thresholds, threshold)
+        elif threshold in custom:
+            kwargs[kwarg] = custom[threshold]
+        else:
+            raise ValueError(f"Detector {spec.name} needs threshold {threshold!r}")
+    return kwargs
@@ -1,114 +1,154 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-
+import numpy as np
 import pandas as pd
 
-
-@dataclass(frozen=True)
-class Opportunity:
-    kind: str
-    title: str
-    scope: str
-    estimated_savings_usd: float
-    confidence: str
-    risk: str
-    effort: str
-    details: str
+from cloud_cost_audit.analytics.classification import in_category
+from cloud_cost_audit.analytics.opportunities import Opportunity
+from cloud_cost_audit.analytics.registry import register_detector
+from cloud_cost_audit.io.pricing_catalog import PricingCatalog
+from cloud_cost_audit.units import HOURS_PER_MONTH
 
 
+def _resource_opportunities(
+    rows: pd.DataFrame,
+    *,
+    kind: str | pd.Series,
+    title: pd.Series,
+    savings: pd.Series,
+    confidence: str,
+    risk: str,
+    effort: str,
+    details: str | pd.Series,
+) -> pd.DataFrame:
+    scope = rows["provider"].astype(str) + ":" + rows["region"].astype(str) + ":"
+    return pd.DataFrame(
+        {
+            "kind": kind,
+            "title": title,
+            "scope": scope + rows["service"].astype(str),
+            "estimated_savings_usd": savings.astype(float).round(2),
+            "confidence": confidence,
+            "risk": risk,
+            "effort": effort,
+            "details": details,
+            "team": rows["team"].fillna("").astype(str),
+        },
+        index=rows.index,
+    ).reset_index(drop=True)
+
+
+def _fmt(template: str, values: pd.Series) -> pd.Series:
+    return pd.Series(np.char.mod(template, values.to_numpy(dtype=float)), index=values.index)
+
+
+@register_detector(
+    "underutilized_compute",
+    inputs=("inventory", "utilization", "pricing"),
+    thresholds={
+        "underutilized_cpu_pct": "underutilized_cpu_pct",
+        "min_cost_usd": "min_compute_cost_usd",
+        "cpu_statistic": "rightsizing_cpu_statistic",
+    },
+    cost=3,
+)
 def detect_underutilized_compute(
     *,
     inventory: pd.DataFrame,
     utilization: pd.DataFrame,
     underutilized_cpu_pct: float,
     min_cost_usd: float,
-) -> list[Opportunity]:
-    inv = inventory[inventory["resource_type"] == "instance"].copy()
-    util = utilization.copy()
-    merged = inv.merge(util, on=["provider", "resource_id"], how="left")
+    cpu_statistic: str = "avg",
+    pricing: PricingCatalog | None = None,
+) -> pd.DataFrame:
+    inv = inventory[inventory["resource_type"] == "instance"]
+    merged = inv.merge(utilization, on=["provider", "resource_id"], how="left")
     merged["avg_cpu_pct"] = merged["avg_cpu_pct"].fillna(100.0).astype(float)
     merged["monthly_cost_estimate_usd"] = merged["monthly_cost_estimate_usd"].astype(float)
+    # Decide on a sketched percentile when samples were summarized (averages hide peaks);
+    # resources without samples fall back to their average.
+    peak = f"{cpu_statistic}_cpu_pct"
+    use_peak = cpu_statistic != "avg" and peak in merged.columns
+    cpu = merged[peak].fillna(merged["avg_cpu_pct"]) if use_peak else merged["avg_cpu_pct"]
     candidates = merged[
-        (merged["avg_cpu_pct"] < underutilized_cpu_pct)
-        & (merged["monthly_cost_estimate_usd"] >= min_cost_usd)
-    ].copy()
-    opps: list[Opportunity] = []
-    for _, row in candidates.sort_values("monthly_cost_estimate_usd", ascending=False).iterrows():
-        # Conservative expected savings for "rightsizing" suggestions (validate before applying).
-        savings = float(row["monthly_cost_estimate_usd"] * 0.25)
-        opps.append(
-            Opportunity(
-                kind="underutilized_compute",
-                title=f"Rightsize underutilized compute: {row['resource_id']}",
-                scope=f"{row['provider']}:{row['region']}:{row['service']}",
-                estimated_savings_usd=round(savings, 2),
-                confidence="high",
-                risk="medium",
-                effort="M",
-                details=(
-                    f"avg_cpu_pct={float(row['avg_cpu_pct']):.1f}, "
-                    f"current_estimated_monthly_cost=${float(row['monthly_cost_estimate_usd']):.0f}"
-                ),
-            )
-        )
-    return opps
-
-
-def detect_schedule_nonprod_compute(*, inventory: pd.DataFrame) -> list[Opportunity]:
+        (cpu < underutilized_cpu_pct) & (merged["monthly_cost_estimate_usd"] >= min_cost_usd)
+    ].sort_values("monthly_cost_estimate_usd", ascending=False)
+    cost = candidates["monthly_cost_estimate_usd"]
+    details = _fmt("avg_cpu_pct=%.1f", candidates["avg_cpu_pct"])
+    if use_peak:
+        details += _fmt(f", {peak}=%.1f", cpu[candidates.index])
+    details += _fmt(", current_estimated_monthly_cost=$%.0f", cost)
+    # Conservative expected savings for "rightsizing" suggestions (validate before applying).
+    savings = cost * 0.25
+    if pricing is not None and "instance_type" in candidates.columns:
+        # Priced moves to the next size down replace the flat estimate where the catalog
+        # knows the instance.
+        moves = pricing.rightsizing(candidates)
+        priced = moves["hourly_savings_usd"].notna()
+        savings = savings.mask(priced, moves["hourly_savings_usd"] * HOURS_PER_MONTH)
+        details = details.mask(priced, details + ", rightsize_to=" + moves["next_instance_type"])
+    return _resource_opportunities(
+        candidates,
+        kind="underutilized_compute",
+        title="Rightsize underutilized compute: " + candidates["resource_id"].astype(str),
+        savings=savings,
+        confidence="high",
+        risk="medium",
+        effort="M",
+        details=details,
+    )
+
+
+@register_detector("schedule_nonprod", inputs=("inventory",), cost=2)
+def detect_schedule_nonprod_compute(*, inventory: pd.DataFrame) -> pd.DataFrame:
     inv = inventory[
         (inventory["resource_type"] == "instance") & (inventory["env"].astype(str) != "prod")
-    ].copy()
-    inv["monthly_cost_estimate_usd"] = inv["monthly_cost_estimate_usd"].astype(float)
-    opps: list[Opportunity] = []
-    for _, row in inv.sort_values("monthly_cost_estimate_usd", ascending=False).iterrows():
+    ]
+    inv = inv.assign(
+        monthly_cost_estimate_usd=inv["monthly_cost_estimate_usd"].astype(float)
+    ).sort_values("monthly_cost_estimate_usd", ascending=False)
+    return _resource_opportunities(
+        inv,
+        kind="schedule_nonprod",
+        title="Schedule non-prod compute off-hours: " + inv["resource_id"].astype(str),
         # Assume a pragmatic schedule (nights + weekends), not full shutdown.
-        savings = float(row["monthly_cost_estimate_usd"] * 0.35)
-        opps.append(
-            Opportunity(
-                kind="schedule_nonprod",
-                title=f"Schedule non-prod compute off-hours: {row['resource_id']}",
-                scope=f"{row['provider']}:{row['region']}:{row['service']}",
-                estimated_savings_usd=round(savings, 2),
-                confidence="high",
-                risk="low",
-                effort="S",
-                details="Implement instance schedules (nights/weekends) and enforce via policy.",
-            )
-        )
-    return opps
-
-
-def detect_zombie_assets(*, inventory: pd.DataFrame) -> list[Opportunity]:
-    inv = inventory.copy()
-    inv["monthly_cost_estimate_usd"] = inv["monthly_cost_estimate_usd"].astype(float)
-
-    zombie = inv[
-        (inv["resource_type"].isin(["volume", "disk", "ip", "snapshot"]))
-        & (inv["status"].astype(str).str.len() > 0)
-        & (inv["monthly_cost_estimate_usd"] > 0.0)
-    ].copy()
-
-    opps: list[Opportunity] = []
-    for _, row in zombie.sort_values("monthly_cost_estimate_usd", ascending=False).iterrows():
-        kind = f"zombie_{row['resource_type']}"
-        opps.append(
-            Opportunity(
-                kind=kind,
-                title=f"Remove zombie asset: {row['resource_type']} {row['resource_id']}",
-                scope=f"{row['provider']}:{row['region']}:{row['service']}",
-                estimated_savings_usd=round(float(row["monthly_cost_estimate_usd"]), 2),
-                confidence="high",
-                risk="low",
-                effort="S",
-                details=f"status={row['status']}, created_at={row['created_at']}",
-            )
-        )
-    return opps
+        savings=inv["monthly_cost_estimate_usd"] * 0.35,
+        confidence="high",
+        risk="low",
+        effort="S",
+        details="Implement instance schedules (nights/weekends) and enforce via policy.",
+    )
+
+
+@register_detector("zombie_assets", inputs=("inventory",), cost=2)
+def detect_zombie_assets(*, inventory: pd.DataFrame) -> pd.DataFrame:
+    cost = inventory["monthly_cost_estimate_usd"].astype(float)
+    zombie = inventory.assign(monthly_cost_estimate_usd=cost)[
+        (inventory["resource_type"].isin(["volume", "disk", "ip", "snapshot"]))
+        & (inventory["status"].astype(str).str.len() > 0)
+        & (cost > 0.0)
+    ].sort_values("monthly_cost_estimate_usd", ascending=False)
+    resource_type = zombie["resource_type"].astype(str)
+    return _resource_opportunities(
+        zombie,
+        kind="zombie_" + resource_type,
+        title="Remove zombie asset: " + resource_type + " " + zombie["resource_id"].astype(str),
+        savings=zombie["monthly_cost_estimate_usd"],
+        confidence="high",
+        risk="low",
+        effort="S",
+        details=(
+            "status="
+            + zombie["status"].astype(str)
+            + ", created_at="
+            + zombie["created_at"].astype(str)
+        ),
+    )
 
 
+@register_detector("storage_tier", inputs=("line_item_groups",))
 def detect_storage_tier_optimizations(*, line_items: pd.DataFrame) -> list[Opportunity]:
-    storage = line_items[line_items["service"].isin(["AmazonS3", "Cloud Storage"])].copy()
+    storage = line_items[in_category(line_items, "object_storage")]
     total = float(storage["cost_usd"].sum())
     if total <= 0:
         return []
@@ -130,12 +170,9 @@ def detect_storage_tier_optimizations(*, line_items: pd.DataFrame) -> list[Oppor
     ]
 
 
+@register_detector("egress", inputs=("line_item_groups",))
 def detect_egress_hotspots(*, line_items: pd.DataFrame) -> list[Opportunity]:
-    egress = line_items[
-        (line_items["service"].astype(str).str.contains("DataTransfer", case=False))
-        | (line_items["sku"].astype(str).str.contains("Egress", case=False))
-        | (line_items["service"].astype(str).str.contains("Networking", case=False))
-    ].copy()
+    egress = line_items[in_category(line_items, "egress")]
     total = float(egress["cost_usd"].sum())
     if total <= 0:
         return []
@@ -157,8 +194,9 @@ def detect_egress_hotspots(*, line_items: pd.DataFrame) -> list[Opportunity]:
     ]
 
 
+@register_detector("commitments", inputs=("line_item_groups",))
 def detect_commitment_opportunities(*, line_items: pd.DataFrame) -> list[Opportunity]:
-    compute = line_items[line_items["service"].isin(["AmazonEC2", "Compute Engine"])].copy()
+    compute = line_items[in_category(line_items, "compute")]
     steady = float(compute[compute["env"].astype(str) == "prod"]["cost_usd"].sum())
     if steady <= 0:
         return []
@@ -28,7 +28,11 @@ def _load_config(config_path: Path) -> AuditConfig:
 
 
 def _ensure_demo_inputs(cfg: AuditConfig) -> None:
-    ensure_synthetic_inputs(data_dir=cfg.data_dir, invoice_month=cfg.invoice_month)
+    ensure_synthetic_inputs(
+        data_dir=cfg.data_dir,
+        invoice_month=cfg.invoice_month,
+        billing_format=cfg.ingestion.billing_format,
+    )
 
 
 @app.command()
@@ -111,6 +115,7 @@ def _render_report(*, cfg: AuditConfig, result: AuditRunResult) -> None:
         baseline_cost_usd=result.baseline_cost_usd,
         quick_wins=result.quick_wins,
         tag_coverage=result.tag_coverage,
+        anomalies=result.anomalies,
     )
     template_dir = Path(__file__).parent / "reporting" / "templates"
     render_executive_report(
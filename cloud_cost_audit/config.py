@@ -1,14 +1,175 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any, Literal
 
 import yaml
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from cloud_cost_audit.analytics.percentiles import quantile_column
+from cloud_cost_audit.io.billing_readers import DEFAULT_DECOMPRESSION_THREADS, BillingFormat
+from cloud_cost_audit.io.utilization_samples import SampleFormat
+from cloud_cost_audit.transforms.normalize import ANALYTIC_DIMENSIONS
+from cloud_cost_audit.transforms.rollup import RollupGrain
 
 
 class Thresholds(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     underutilized_cpu_pct: float = Field(ge=0.0, le=100.0)
     min_compute_cost_usd: float = Field(ge=0.0)
+    # CPU statistic the rightsizing decision uses: "avg", or a percentile such as "p95"
+    # sketched from utilization samples (resources without samples use their average).
+    rightsizing_cpu_statistic: str = Field(default="p95", pattern=r"^(avg|p\d+(\.\d+)?)$")
+    # Discount per commitment term by provider, and candidate levels swept per account, for
+    # the opt-in commitment_model detector.
+    commitment_discounts: dict[str, dict[str, float]] = Field(
+        default_factory=lambda: {
+            "aws": {"1yr": 0.27, "3yr": 0.46},
+            "gcp": {"1yr": 0.37, "3yr": 0.55},
+        }
+    )
+    commitment_levels: int = Field(default=200, ge=2)
+    # Thresholds declared by in-house detectors, kept apart so typos in built-in keys fail.
+    custom: dict[str, Any] = Field(default_factory=dict)
+
+
+class ObjectStoreConfig(BaseModel):
+    # Root of the local stand-in bucket; keys mirror the data_dir layout.
+    root: Path
+    max_concurrency: int = Field(default=16, ge=1)
+    range_size_mb: int = Field(default=8, ge=1)
+    max_inflight_mb: int = Field(default=256, ge=1)
+
+
+class LineItemCacheConfig(BaseModel):
+    # Normalized line items keyed by a hash of the raw inputs; reused across runs.
+    dir: Path
+    max_size_mb: int = Field(default=2048, ge=1)
+
+
+class IngestionConfig(BaseModel):
+    # Rows per billing chunk; None loads each billing export in one read.
+    chunk_size_rows: int | None = Field(default=None, ge=1)
+    billing_format: BillingFormat = "csv"
+    # "duckdb" scans and normalizes the raw billing files in SQL (chunk_size_rows is unused).
+    engine: Literal["pandas", "duckdb"] = "pandas"
+    # Process pool size for multi-part billing deliveries; None uses every core.
+    max_workers: int | None = Field(default=None, ge=1)
+    # Threads python-isal's gzip reader uses per compressed billing input (when installed).
+    decompression_threads: int = Field(default=DEFAULT_DECOMPRESSION_THREADS, ge=1)
+    # Read billing/inventory/utilization objects from an object store instead of data_dir.
+    object_store: ObjectStoreConfig | None = None
+    # Cache unified line items of full (non-streaming) pandas loads from data_dir.
+    cache: LineItemCacheConfig | None = None
+    # Roll line items up to "day" or "month" before analytics; None keeps full detail
+    # (streaming and the duckdb engine then compact to month).
+    rollup_grain: RollupGrain | None = None
+    # Only (re)ingest billing parts that are new or changed since the last run, tracked by
+    # watermarks in the DuckDB file; needs the pandas engine without chunking.
+    incremental: bool = False
+
+    @model_validator(mode="after")
+    def _validate_incremental(self) -> IngestionConfig:
+        if self.incremental and (self.engine != "pandas" or self.chunk_size_rows is not None):
+            raise ValueError("incremental ingestion requires engine=pandas and no chunk_size_rows")
+        return self
+
+
+class UtilizationSamplesConfig(BaseModel):
+    # Raw per-resource metric samples (a file or a directory of parts), reduced to
+    # per-resource percentiles in bounded memory.
+    path: Path
+    format: SampleFormat = "parquet"
+    quantiles: list[float] = Field(default_factory=lambda: [0.95, 0.99])
+    relative_accuracy: float = Field(default=0.01, gt=0.0, lt=1.0)
+    batch_rows: int = Field(default=1_000_000, ge=1)
+
+    @field_validator("quantiles")
+    @classmethod
+    def _validate_quantiles(cls, v: list[float]) -> list[float]:
+        if not v or not all(0.0 < q <= 1.0 for q in v):
+            raise ValueError("quantiles must be a non-empty list of values in (0, 1]")
+        return v
+
+
+class PricingConfig(BaseModel):
+    # Indexed SQLite catalog; (re)built from the price list files when missing or older
+    # than any of them.
+    catalog: Path
+    # Offline EC2 price list (offer) JSON files and GCP Cloud Billing SKU listings;
+    # .gz/.zst/.bz2 are read compressed.
+    aws_offer_files: list[Path] = Field(default_factory=list)
+    gcp_sku_files: list[Path] = Field(default_factory=list)
+    # In-process LRU size for hot instance lookups.
+    cache_size: int = Field(default=4096, ge=1)
+
+
+class ForecastConfig(BaseModel):
+    # Fit day-of-week seasonality once two weeks of daily history are available; needs
+    # line items at day grain or finer (ingestion.rollup_grain unset or "day").
+    seasonality: bool = True
+
+
+class AnomaliesConfig(BaseModel):
+    # Daily spend spikes per (provider, account, service, team) against an EWMA baseline kept
+    # in the DuckDB file; needs line items at day grain or finer.
+    alpha: float = Field(default=0.1, gt=0.0, lt=1.0)
+    z_threshold: float = Field(default=4.0, gt=0.0)
+    # Days of history a series needs before it can be flagged.
+    warmup_days: int = Field(default=7, ge=1)
+    # Minimum spend over the EWMA baseline for a day to count, USD.
+    min_excess_usd: float = Field(default=50.0, ge=0.0)
+
+
+class AllocationConfig(BaseModel):
+    # Showback: spread untagged and shared-service spend across owners by a driver, pooled
+    # per scope tuple; writes out/allocated_cost.csv.
+    key: Literal["team", "cost_center"] = "team"
+    driver: Literal["tagged_spend", "usage", "fixed"] = "tagged_spend"
+    scope: list[str] = Field(default_factory=lambda: ["provider", "account"])
+    # Services treated as shared even when tagged, e.g. support plans or networking.
+    shared_services: list[str] = Field(default_factory=list)
+    # Owner weights for the "fixed" driver.
+    weights: dict[str, float] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def _validate_driver(self) -> AllocationConfig:
+        if self.driver == "fixed" and (
+            not self.weights or any(w < 0 for w in self.weights.values())
+        ):
+            raise ValueError("the fixed allocation driver requires non-negative owner weights")
+        unknown = sorted(set(self.scope) - set(ANALYTIC_DIMENSIONS))
+        if unknown:
+            raise ValueError(f"Unknown allocation scope columns: {unknown}")
+        return self
+
+
+class TagInferenceConfig(BaseModel):
+    # Back-fill blank allocation keys of line items from inventory.csv (by resource_id) and
+    # an optional ownership map CSV: provider, account or project, and any allocation key
+    # columns. Writes out/tag_inference.json.
+    ownership_map: Path | None = None
+
+
+class DetectorsConfig(BaseModel):
+    # Modules imported before the run so their @register_detector detectors are picked up.
+    modules: list[str] = Field(default_factory=list)
+    # Registered detector names to run; None runs all of them.
+    enabled: list[str] | None = None
+    # Registered detector names to skip, e.g. a built-in replaced by an in-house module.
+    disabled: list[str] = Field(default_factory=list)
+    executor: Literal["thread", "process"] = "thread"
+    max_workers: int | None = Field(default=None, ge=1)
+
+
+class QuickWinsConfig(BaseModel):
+    k: int = Field(default=10, ge=1)
+    # Caps on how many quick wins may share a detector kind / owning team; None is uncapped.
+    max_per_kind: int | None = Field(default=None, ge=1)
+    max_per_team: int | None = Field(default=None, ge=1)
+    # Opportunities listed per team in the showback export.
+    per_team_k: int = Field(default=5, ge=1)
 
 
 class AuditConfig(BaseModel):
@@ -18,6 +179,17 @@ class AuditConfig(BaseModel):
     duckdb_path: Path
     required_allocation_keys: list[str]
     thresholds: Thresholds
+    ingestion: IngestionConfig = Field(default_factory=IngestionConfig)
+    detectors: DetectorsConfig = Field(default_factory=DetectorsConfig)
+    quick_wins: QuickWinsConfig = Field(default_factory=QuickWinsConfig)
+    utilization_samples: UtilizationSamplesConfig | None = None
+    pricing: PricingConfig | None = None
+    # Writes out/forecast.csv and adds projected spend to the monthly plan.
+    forecast: ForecastConfig | None = None
+    # Writes out/cost_anomalies.csv and ranks spikes alongside the detector findings.
+    anomalies: AnomaliesConfig | None = None
+    allocation: AllocationConfig | None = None
+    tag_inference: TagInferenceConfig | None = None
 
     @field_validator("required_allocation_keys")
     @classmethod
@@ -28,6 +200,29 @@ class AuditConfig(BaseModel):
             raise ValueError(f"Unknown allocation keys: {unknown}. Allowed: {sorted(allowed)}")
         return v
 
+    @model_validator(mode="after")
+    def _validate_rightsizing_statistic(self) -> AuditConfig:
+        statistic = self.thresholds.rightsizing_cpu_statistic
+        samples = self.utilization_samples
+        if samples is None or statistic == "avg":
+            return self
+        sketched = [quantile_column(q, "cpu_pct") for q in samples.quantiles]
+        if f"{statistic}_cpu_pct" not in sketched:
+            raise ValueError(
+                f"rightsizing_cpu_statistic {statistic!r} is not among the sketched quantiles "
+                f"{samples.quantiles}"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def _validate_tag_inference(self) -> AuditConfig:
+        ingestion = self.ingestion
+        if self.tag_inference is not None and (
+            ingestion.engine != "pandas" or ingestion.incremental
+        ):
+            raise ValueError("tag_inference requires engine=pandas without incremental ingestion")
+        return self
+
     @staticmethod
     def load(path: Path) -> AuditConfig:
         data = yaml.safe_load(path.read_text(encoding="utf-8"))
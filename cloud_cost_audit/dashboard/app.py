@@ -46,7 +46,7 @@ def main() -> None:
         )
         st.plotly_chart(fig, use_container_width=True)
     with right:
-        st.subheader("Top 10 quick wins")
+        st.subheader(f"Top {len(quick_wins)} quick wins")
         st.dataframe(quick_wins, use_container_width=True, hide_index=True)
 
 
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import io
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Literal
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from cloud_cost_audit.models.schema import CATEGORY, TableSchema, conform
+
+BillingFormat = Literal["csv", "parquet", "arrow"]
+
+# pyarrow.dataset format names for the columnar billing layouts.
+_DATASET_FORMATS: dict[str, str] = {"parquet": "parquet", "arrow": "ipc"}
+
+
+@dataclass(frozen=True)
+class BillingBlob:
+    """A billing object already fetched into memory, e.g. from an object store."""
+
+    name: str
+    data: bytes
+
+
+BillingSource = Path | BillingBlob
+
+# Text inputs may arrive compressed (CUR parts are .csv.gz); columnar formats compress internally.
+COMPRESSION_SUFFIXES: dict[str, str] = {".gz": "gzip", ".bz2": "bz2", ".zst": "zstd"}
+
+
+# Worker threads for python-isal's gzip reader, unless configured otherwise.
+DEFAULT_DECOMPRESSION_THREADS = 4
+
+
+def compression_of(source: BillingSource) -> str | None:
+    name = source.name if isinstance(source, BillingBlob) else str(source)
+    return COMPRESSION_SUFFIXES.get(PurePosixPath(name).suffix)
+
+
+@contextmanager
+def open_decompressed(
+    source: BillingSource, *, threads: int = DEFAULT_DECOMPRESSION_THREADS
+) -> Iterator[IO[bytes]]:
+    """Open ``source`` as a byte stream, decompressing on the fly according to its suffix.
+
+    Nothing is inflated to disk. gzip uses python-isal's threaded reader with ``threads``
+    workers when it is installed (decompression runs ahead of the parser); everything else
+    goes through Arrow's native codecs, which decompress outside the GIL.
+    """
+    compression = compression_of(source)
+    if compression == "gzip":
+        try:
+            from isal import igzip_threaded
+        except ImportError:
+            pass
+        else:
+            raw = io.BytesIO(source.data) if isinstance(source, BillingBlob) else source
+            with igzip_threaded.open(raw, "rb", threads=threads) as fh:
+                yield fh
+            return
+    stream_source = pa.py_buffer(source.data) if isinstance(source, BillingBlob) else str(source)
+    with pa.input_stream(stream_source, compression=compression) as fh:
+        yield fh
+
+
+def read_billing(
+    path: BillingSource,
+    *,
+    fmt: BillingFormat,
+    schema: TableSchema,
+    invoice_month: str | None = None,
+    decompression_threads: int = DEFAULT_DECOMPRESSION_THREADS,
+) -> pd.DataFrame:
+    if fmt == "csv":
+        with open_decompressed(path, threads=decompression_threads) as fh:
+            df = pd.read_csv(fh, usecols=schema.columns.__contains__, dtype=schema.read_dtypes())
+        return _filter_invoice_month(df, invoice_month)
+    dataset, projected, expr = _columnar_scan(path, fmt, schema, invoice_month)
+    return _arrow_to_pandas(dataset.to_table(columns=projected, filter=expr), schema)
+
+
+def iter_billing(
+    path: BillingSource,
+    *,
+    fmt: BillingFormat,
+    schema: TableSchema,
+    chunk_size: int,
+    invoice_month: str | None = None,
+    decompression_threads: int = DEFAULT_DECOMPRESSION_THREADS,
+) -> Iterator[pd.DataFrame]:
+    if fmt == "csv":
+        with (
+            open_decompressed(path, threads=decompression_threads) as fh,
+            pd.read_csv(
+                fh,
+                usecols=schema.columns.__contains__,
+                dtype=schema.read_dtypes(),
+                chunksize=chunk_size,
+            ) as reader,
+        ):
+            for chunk in reader:
+                yield _filter_invoice_month(chunk, invoice_month)
+        return
+    dataset, projected, expr = _columnar_scan(path, fmt, schema, invoice_month)
+    for batch in dataset.to_batches(columns=projected, filter=expr, batch_size=chunk_size):
+        if batch.num_rows:
+            yield _arrow_to_pandas(pa.Table.from_batches([batch]), schema)
+
+
+def _columnar_scan(
+    source: BillingSource, fmt: BillingFormat, schema: TableSchema, invoice_month: str | None
+) -> tuple[Any, list[str], ds.Expression | None]:
+    # Datasets (files) and fragments (in-memory blobs) share the to_table/to_batches API.
+    scan: Any
+    if isinstance(source, BillingBlob):
+        file_format = ds.ParquetFileFormat() if fmt == "parquet" else ds.IpcFileFormat()
+        scan = file_format.make_fragment(pa.BufferReader(source.data))
+        names = scan.physical_schema.names
+    else:
+        scan = ds.dataset(str(source), format=_DATASET_FORMATS[fmt])
+        names = scan.schema.names
+    # Only project the columns normalization needs; missing ones are reported by the
+    # normalizers' column validation rather than as an opaque Arrow error.
+    projected = [name for name in names if name in schema.columns]
+    expr = None
+    if invoice_month is not None and "invoice_month" in names:
+        # Parquet row groups whose invoice_month statistics exclude the month are skipped.
+        expr = pc.field("invoice_month") == invoice_month
+    return scan, projected, expr
+
+
+def _arrow_to_pandas(table: pa.Table, schema: TableSchema) -> pd.DataFrame:
+    # Dictionary-encode low-cardinality columns on the Arrow side so pandas receives
+    # categoricals directly instead of materializing one Python string per row.
+    categories = [name for name in table.column_names if schema.columns.get(name) == CATEGORY]
+    return conform(table.to_pandas(categories=categories), schema)
+
+
+def _filter_invoice_month(df: pd.DataFrame, invoice_month: str | None) -> pd.DataFrame:
+    if invoice_month is None or "invoice_month" not in df.columns:
+        return df
+    mask = df["invoice_month"].astype(str) == invoice_month
+    if bool(mask.all()):
+        return df
+    return df.loc[mask].reset_index(drop=True)
+
+
+def export_columnar_billing(csv_path: Path, out_path: Path, *, fmt: BillingFormat) -> None:
+    if fmt == "csv":
+        raise ValueError("export_columnar_billing expects a columnar format")
+    df = pd.read_csv(csv_path, dtype={"account_id": str, "payer_account_id": str})
+    if fmt == "parquet":
+        df.to_parquet(out_path, index=False)
+    else:
+        df.to_feather(out_path)
@@ -1,50 +1,206 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterator, Mapping
 from dataclasses import dataclass
 from pathlib import Path
+from typing import ClassVar, Protocol
 
 import pandas as pd
 
-from cloud_cost_audit.io.paths import DataPaths
+from cloud_cost_audit.io.billing_readers import (
+    DEFAULT_DECOMPRESSION_THREADS,
+    BillingFormat,
+    BillingSource,
+    iter_billing,
+    open_decompressed,
+)
+from cloud_cost_audit.io.discovery import discover_billing_parts, load_billing_parts
+from cloud_cost_audit.io.paths import DataPaths, resolve_input
+from cloud_cost_audit.models.schema import AWS_BILLING_SCHEMA, GCP_BILLING_SCHEMA, TableSchema
 
 
-class MockAwsProvider:
-    def __init__(self, data_dir: Path) -> None:
-        self._paths = DataPaths(data_dir)
+class CloudProvider(Protocol):
+    @property
+    def billing_format(self) -> BillingFormat: ...
 
-    def billing(self) -> pd.DataFrame:
-        return pd.read_csv(self._paths.aws_billing_csv)
+    def billing(self, *, invoice_month: str | None = None) -> pd.DataFrame: ...
 
-    def inventory(self) -> pd.DataFrame:
-        df = pd.read_csv(self._paths.inventory_csv)
-        return df[df["provider"] == "aws"].reset_index(drop=True)
+    def billing_chunks(
+        self, chunk_size: int, *, invoice_month: str | None = None
+    ) -> Iterator[pd.DataFrame]: ...
 
-    def utilization(self) -> pd.DataFrame:
-        df = pd.read_csv(self._paths.utilization_csv)
-        return df[df["provider"] == "aws"].reset_index(drop=True)
+    def inventory(self) -> pd.DataFrame: ...
 
+    def utilization(self) -> pd.DataFrame: ...
 
-class MockGcpProvider:
-    def __init__(self, data_dir: Path) -> None:
-        self._paths = DataPaths(data_dir)
 
-    def billing(self) -> pd.DataFrame:
-        return pd.read_csv(self._paths.gcp_billing_csv)
+BILLING_SCHEMAS: dict[str, TableSchema] = {
+    "aws": AWS_BILLING_SCHEMA,
+    "gcp": GCP_BILLING_SCHEMA,
+}
+
+
+class SharedDatasets:
+    """Per-run cache of the inputs shared by every provider (inventory, utilization).
+
+    Each input is parsed once and stably sorted by provider, so provider partitions are
+    contiguous ``iloc`` slices of the cached frame rather than filtered copies. Frames handed
+    out are shared and must be treated as read-only.
+    """
+
+    def __init__(self, sources: Mapping[str, Callable[[], BillingSource]]) -> None:
+        self._sources = sources
+        self._frames: dict[str, tuple[pd.DataFrame, dict[str, tuple[int, int]]]] = {}
+
+    @staticmethod
+    def from_paths(paths: DataPaths) -> SharedDatasets:
+        return SharedDatasets(
+            {
+                "inventory": lambda: resolve_input(paths.inventory_csv),
+                "utilization": lambda: resolve_input(paths.utilization_csv),
+            }
+        )
+
+    def inventory(self, provider: str | None = None) -> pd.DataFrame:
+        return self._partition("inventory", provider)
+
+    def utilization(self, provider: str | None = None) -> pd.DataFrame:
+        return self._partition("utilization", provider)
+
+    def _partition(self, name: str, provider: str | None) -> pd.DataFrame:
+        if name not in self._frames:
+            self._frames[name] = _load_partitioned(self._sources[name]())
+        frame, bounds = self._frames[name]
+        if provider is None:
+            return frame
+        start, stop = bounds.get(provider, (0, 0))
+        part = frame.iloc[start:stop]
+        part.index = pd.RangeIndex(len(part))
+        return part
+
+
+def _load_partitioned(
+    source: BillingSource,
+) -> tuple[pd.DataFrame, dict[str, tuple[int, int]]]:
+    with open_decompressed(source) as fh:
+        df = pd.read_csv(fh)
+    df = df.sort_values("provider", kind="stable", ignore_index=True)
+    providers = df["provider"].to_numpy()
+    names = pd.unique(providers)
+    starts = providers.searchsorted(names, side="left")
+    stops = providers.searchsorted(names, side="right")
+    bounds = {
+        str(name): (int(start), int(stop))
+        for name, start, stop in zip(names, starts, stops, strict=True)
+    }
+    return df, bounds
+
+
+class MockProvider:
+    provider: ClassVar[str]
+
+    def __init__(
+        self,
+        data_dir: Path,
+        *,
+        billing_format: BillingFormat = "csv",
+        shared: SharedDatasets | None = None,
+        max_workers: int | None = None,
+        decompression_threads: int = DEFAULT_DECOMPRESSION_THREADS,
+    ) -> None:
+        self._paths = DataPaths(data_dir)
+        self._shared = shared if shared is not None else SharedDatasets.from_paths(self._paths)
+        self._billing_format: BillingFormat = billing_format
+        self._max_workers = max_workers
+        self._decompression_threads = decompression_threads
+
+    @property
+    def billing_format(self) -> BillingFormat:
+        return self._billing_format
+
+    def billing_parts(self, *, invoice_month: str | None = None) -> list[Path]:
+        billing_dir, billing_file = self._paths.billing_location(
+            self.provider, self._billing_format
+        )
+        if not billing_dir.is_dir():
+            return [resolve_input(billing_file)]
+        return discover_billing_parts(
+            billing_dir, fmt=self._billing_format, invoice_month=invoice_month
+        )
+
+    def billing(self, *, invoice_month: str | None = None) -> pd.DataFrame:
+        return load_billing_parts(
+            self.billing_parts(invoice_month=invoice_month),
+            fmt=self._billing_format,
+            schema=BILLING_SCHEMAS[self.provider],
+            invoice_month=invoice_month,
+            max_workers=self._max_workers,
+            decompression_threads=self._decompression_threads,
+        )
+
+    def billing_chunks(
+        self, chunk_size: int, *, invoice_month: str | None = None
+    ) -> Iterator[pd.DataFrame]:
+        for part in self.billing_parts(invoice_month=invoice_month):
+            yield from iter_billing(
+                part,
+                fmt=self._billing_format,
+                schema=BILLING_SCHEMAS[self.provider],
+                chunk_size=chunk_size,
+                invoice_month=invoice_month,
+                decompression_threads=self._decompression_threads,
+            )
 
     def inventory(self) -> pd.DataFrame:
-        df = pd.read_csv(self._paths.inventory_csv)
-        return df[df["provider"] == "gcp"].reset_index(drop=True)
+        return self._shared.inventory(self.provider)
 
     def utilization(self) -> pd.DataFrame:
-        df = pd.read_csv(self._paths.utilization_csv)
-        return df[df["provider"] == "gcp"].reset_index(drop=True)
+        return self._shared.utilization(self.provider)
+
+
+class MockAwsProvider(MockProvider):
+    provider = "aws"
+
+
+class MockGcpProvider(MockProvider):
+    provider = "gcp"
 
 
 @dataclass(frozen=True)
 class Providers:
-    aws: MockAwsProvider
-    gcp: MockGcpProvider
+    aws: CloudProvider
+    gcp: CloudProvider
+    shared: SharedDatasets
+
+    def inventory(self) -> pd.DataFrame:
+        return self.shared.inventory()
+
+    def utilization(self) -> pd.DataFrame:
+        return self.shared.utilization()
 
     @staticmethod
-    def from_data_dir(data_dir: Path) -> Providers:
-        return Providers(aws=MockAwsProvider(data_dir), gcp=MockGcpProvider(data_dir))
+    def from_data_dir(
+        data_dir: Path,
+        *,
+        billing_format: BillingFormat = "csv",
+        max_workers: int | None = None,
+        decompression_threads: int = DEFAULT_DECOMPRESSION_THREADS,
+    ) -> Providers:
+        shared = SharedDatasets.from_paths(DataPaths(data_dir))
+        return Providers(
+            aws=MockAwsProvider(
+                data_dir,
+                billing_format=billing_format,
+                shared=shared,
+                max_workers=max_workers,
+                decompression_threads=decompression_threads,
+            ),
+            gcp=MockGcpProvider(
+                data_dir,
+                billing_format=billing_format,
+                shared=shared,
+                max_workers=max_workers,
+                decompression_threads=decompression_threads,
+            ),
+            shared=shared,
+        )
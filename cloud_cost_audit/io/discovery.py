@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+import pandas as pd
+
+from cloud_cost_audit.io.billing_readers import (
+    DEFAULT_DECOMPRESSION_THREADS,
+    BillingFormat,
+    read_billing,
+)
+from cloud_cost_audit.models.schema import TableSchema, concat_frames
+
+BILLING_SUFFIXES: dict[str, tuple[str, ...]] = {
+    "csv": (".csv", ".csv.gz", ".csv.bz2", ".csv.zst"),
+    "parquet": (".parquet",),
+    "arrow": (".arrow", ".feather"),
+}
+
+MANIFEST_SUFFIX = "-Manifest.json"
+
+
+def discover_billing_parts(
+    directory: Path, *, fmt: BillingFormat, invoice_month: str | None = None
+) -> list[Path]:
+    """List the billing parts delivered under ``directory`` in a deterministic order.
+
+    CUR deliveries carry a ``*-Manifest.json`` per report and billing period; when any are
+    present only the parts listed by the current manifests are used (see
+    :func:`current_manifests`), each once. Otherwise every file with a matching suffix is
+    picked up, recursively.
+    """
+    manifests = current_manifests(
+        p.relative_to(directory).as_posix() for p in directory.rglob(f"*{MANIFEST_SUFFIX}")
+    )
+    if manifests:
+        parts: list[Path] = []
+        for manifest in manifests:
+            parts += _manifest_parts(directory, directory / manifest, invoice_month=invoice_month)
+        return list(dict.fromkeys(parts))
+    suffixes = BILLING_SUFFIXES[fmt]
+    return sorted(p for p in directory.rglob("*") if p.is_file() and p.name.endswith(suffixes))
+
+
+def current_manifests(keys: Iterable[str]) -> list[str]:
+    """The billing-period-level CUR manifests among ``keys`` (POSIX paths), sorted.
+
+    CUR writes each report's manifest at the billing-period level and again inside every
+    assemblyId folder, and superseded assemblies keep theirs. Only the period-level copy
+    points at the current assembly, so a manifest is dropped when a parent folder holds a
+    manifest of the same name.
+    """
+    manifests = sorted(key for key in keys if key.endswith(MANIFEST_SUFFIX))
+    present = set(manifests)
+    current = []
+    for key in manifests:
+        path = PurePosixPath(key)
+        if not any((parent / path.name).as_posix() in present for parent in path.parents[1:]):
+            current.append(key)
+    return current
+
+
+def load_billing_parts(
+    parts: Sequence[Path],
+    *,
+    fmt: BillingFormat,
+    schema: TableSchema,
+    invoice_month: str | None = None,
+    max_workers: int | None = None,
+    decompression_threads: int = DEFAULT_DECOMPRESSION_THREADS,
+) -> pd.DataFrame:
+    read = partial(
+        read_billing,
+        fmt=fmt,
+        schema=schema,
+        invoice_month=invoice_month,
+        decompression_threads=decompression_threads,
+    )
+    if len(parts) <= 1 or max_workers == 1:
+        frames = [read(part) for part in parts]
+    else:
+        # Executor.map yields in submission order, so the concatenation is deterministic
+        # regardless of which worker finishes first.
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(read, parts))
+    if not frames:
+        raise ValueError("No billing parts to load")
+    return concat_frames(frames)
+
+
+def manifest_report_keys(manifest: dict[str, Any], *, invoice_month: str | None) -> list[str]:
+    """Return the report keys of a CUR manifest, or none if it is for another month."""
+    if invoice_month is not None:
+        start = str(manifest.get("billingPeriod", {}).get("start", ""))
+        if start and start[:6] != invoice_month.replace("-", ""):
+            return []
+    return [str(key) for key in manifest.get("reportKeys", [])]
+
+
+def _manifest_parts(directory: Path, manifest: Path, *, invoice_month: str | None) -> list[Path]:
+    doc = json.loads(manifest.read_text(encoding="utf-8"))
+    parts: list[Path] = []
+    for key in manifest_report_keys(doc, invoice_month=invoice_month):
+        # Report keys are bucket-relative; locally they resolve either against the delivery
+        # root or, for flattened downloads, next to the manifest.
+        key_path = PurePosixPath(key)
+        for candidate in (directory.joinpath(*key_path.parts), manifest.parent / key_path.name):
+            if candidate.is_file():
+                parts.append(candidate)
+                break
+        else:
+            raise FileNotFoundError(f"{manifest} lists a missing billing part: {key}")
+    return parts
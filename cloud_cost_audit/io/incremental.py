@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+from cloud_cost_audit.io.line_item_cache import file_checksum
+from cloud_cost_audit.models.schema import UNIFIED_LINE_ITEM_SCHEMA
+
+# Incremental runs persist line items with the billing part they came from, so a restated
+# part can be swapped out without touching the rest of the month.
+SOURCE_PART_COLUMN = "source_part"
+
+_WATERMARKS_DDL = """
+create table if not exists ingestion_watermarks (
+    provider VARCHAR,
+    part VARCHAR,
+    invoice_month VARCHAR,
+    size_bytes BIGINT,
+    mtime_ns BIGINT,
+    checksum VARCHAR,
+    ingested_at TIMESTAMP,
+    primary key (provider, part, invoice_month)
+)
+"""
+
+
+@dataclass(frozen=True)
+class SyncSummary:
+    ingested: list[str]
+    unchanged: list[str]
+    removed: list[str]
+
+
+def ensure_incremental_tables(con: duckdb.DuckDBPyConnection) -> None:
+    """Create the watermark and line-item tables, rebuilding both if the layout changed."""
+    expected = [*UNIFIED_LINE_ITEM_SCHEMA.column_names, SOURCE_PART_COLUMN]
+    existing = [
+        row[0]
+        for row in con.execute(
+            "select column_name from information_schema.columns "
+            "where table_name = 'unified_line_items' order by ordinal_position"
+        ).fetchall()
+    ]
+    con.execute(_WATERMARKS_DDL)
+    if existing != expected:
+        # Created by a full (non-incremental) run or an older schema: start over.
+        con.execute(
+            "create or replace table unified_line_items "
+            f"({UNIFIED_LINE_ITEM_SCHEMA.duckdb_columns()}, {SOURCE_PART_COLUMN} VARCHAR)"
+        )
+        con.execute("delete from ingestion_watermarks")
+
+
+def sync_line_item_parts(
+    con: duckdb.DuckDBPyConnection,
+    *,
+    provider: str,
+    parts: Sequence[Path],
+    invoice_month: str,
+    load_part: Callable[[Path], pd.DataFrame],
+) -> SyncSummary:
+    """Bring ``unified_line_items`` up to date with the delivered billing ``parts``.
+
+    A part is skipped when its size and mtime match its watermark, or when only the mtime
+    moved but the content checksum is unchanged. New or changed parts are loaded with
+    ``load_part`` and replace their previous (invoice_month, part) slice in one transaction;
+    slices of parts no longer delivered for the month are deleted.
+    """
+    marks = {
+        row[0]: row[1:]
+        for row in con.execute(
+            "select part, size_bytes, mtime_ns, checksum from ingestion_watermarks "
+            "where provider = ? and invoice_month = ?",
+            [provider, invoice_month],
+        ).fetchall()
+    }
+    ingested: list[str] = []
+    unchanged: list[str] = []
+    for path in parts:
+        key = path.resolve().as_posix()
+        stat = path.stat()
+        mark = marks.pop(key, None)
+        if mark is not None and (mark[0], mark[1]) == (stat.st_size, stat.st_mtime_ns):
+            unchanged.append(key)
+            continue
+        checksum = file_checksum(path)
+        if mark is not None and mark[2] == checksum:
+            _write_watermark(
+                con, provider, key, invoice_month, stat.st_size, stat.st_mtime_ns, checksum
+            )
+            unchanged.append(key)
+            continue
+
+        line_items = load_part(path)
+        con.execute("begin transaction")
+        try:
+            _delete_slice(con, key, invoice_month)
+            con.register("part_line_items", line_items)
+            con.execute("insert into unified_line_items select *, ? from part_line_items", [key])
+            con.unregister("part_line_items")
+            _write_watermark(
+                con, provider, key, invoice_month, stat.st_size, stat.st_mtime_ns, checksum
+            )
+            con.execute("commit")
+        except BaseException:
+            con.execute("rollback")
+            raise
+        ingested.append(key)
+
+    # Whatever is left was ingested before but is no longer part of the delivery
+    # (e.g. superseded by a restated assembly).
+    removed = sorted(marks)
+    for key in removed:
+        _delete_slice(con, key, invoice_month)
+        con.execute(
+            "delete from ingestion_watermarks "
+            "where provider = ? and part = ? and invoice_month = ?",
+            [provider, key, invoice_month],
+        )
+    return SyncSummary(ingested=ingested, unchanged=unchanged, removed=removed)
+
+
+def _delete_slice(con: duckdb.DuckDBPyConnection, part: str, invoice_month: str) -> None:
+    con.execute(
+        f"delete from unified_line_items where {SOURCE_PART_COLUMN} = ? and invoice_month = ?",
+        [part, invoice_month],
+    )
+
+
+def _write_watermark(
+    con: duckdb.DuckDBPyConnection,
+    provider: str,
+    part: str,
+    invoice_month: str,
+    size_bytes: int,
+    mtime_ns: int,
+    checksum: str,
+) -> None:
+    con.execute(
+        "insert or replace into ingestion_watermarks "
+        "values (?, ?, ?, ?, ?, ?, current_timestamp)",
+        [provider, part, invoice_month, size_bytes, mtime_ns, checksum],
+    )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import io
+import json
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import IO, Any
+
+from cloud_cost_audit.io.billing_readers import open_decompressed
+
+JsonKey = str | int
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class _Reader:
+    """Buffered view of a JSON text stream; only the value being decoded is held in memory."""
+
+    def __init__(self, fh: IO[str], chunk_chars: int) -> None:
+        self._fh = fh
+        self._chunk_chars = chunk_chars
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # Grow reads with the pending text so decoding a large value is not quadratic.
+        data = self._fh.read(max(self._chunk_chars, len(self._buf) - self._pos))
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Malformed JSON: expected one of {chars!r}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may continue in the next chunk.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def _members(reader: _Reader) -> Iterator[JsonKey]:
+    """Yield each key (or array index) of the next container; the caller consumes its value."""
+    opener = reader.expect("{[")
+    closer = "}" if opener == "{" else "]"
+    if reader.peek() == closer:
+        reader.expect(closer)
+        return
+    index = 0
+    while True:
+        if opener == "{":
+            key = reader.value()
+            reader.expect(":")
+            yield key
+        else:
+            yield index
+            index += 1
+        if reader.expect("," + closer) == closer:
+            return
+
+
+def _skip(reader: _Reader) -> None:
+    if reader.peek() in "{[":
+        for _ in _members(reader):
+            _skip(reader)
+    else:
+        reader.value()
+
+
+def _walk(
+    reader: _Reader, paths: list[tuple[JsonKey, ...]], prefix: tuple[JsonKey, ...]
+) -> Iterator[tuple[tuple[JsonKey, ...], JsonKey, Any]]:
+    for key in _members(reader):
+        rest = [path[1:] for path in paths if path[0] == key]
+        if not rest:
+            _skip(reader)
+        elif () in rest:
+            for member in _members(reader):
+                yield (*prefix, key), member, reader.value()
+        else:
+            yield from _walk(reader, rest, (*prefix, key))
+
+
+def iter_json_members(
+    path: Path, paths: Sequence[Sequence[JsonKey]], *, chunk_chars: int = 1 << 20
+) -> Iterator[tuple[tuple[JsonKey, ...], JsonKey, Any]]:
+    """Stream ``(container path, key, value)`` for the members of each container in ``paths``.
+
+    The document is walked once. Only the containers on ``paths`` are descended into, one
+    member value is decoded at a time, and everything else is skipped member by member, so
+    multi-GB documents (price lists, SKU catalogs) are read in bounded memory. Compressed
+    files are decompressed on the fly by suffix.
+    """
+    with (
+        open_decompressed(path) as raw,
+        io.TextIOWrapper(raw, encoding="utf-8") as fh,
+    ):
+        reader = _Reader(fh, chunk_chars)
+        if reader.peek() != "{":
+            raise ValueError(f"{path} is not a JSON object")
+        yield from _walk(reader, [tuple(p) for p in paths], ())
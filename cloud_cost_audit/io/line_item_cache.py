@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from cloud_cost_audit.models.schema import TableSchema, conform, conforms
+from cloud_cost_audit.units import MiB
+
+_SUFFIX = ".arrow"
+
+
+def file_checksum(path: Path) -> str:
+    with path.open("rb") as fh:
+        return hashlib.file_digest(fh, "blake2b").hexdigest()
+
+
+def cache_key(
+    inputs: Mapping[str, Sequence[Path]], *, schema: TableSchema, params: Mapping[str, str]
+) -> str:
+    """Content hash of the raw input files plus everything that shapes the normalized output.
+
+    ``inputs`` maps a label (e.g. the provider) to its billing parts. File contents rather than
+    paths or mtimes are hashed, so copying or touching an unchanged delivery is still a hit.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((schema.name, sorted(schema.columns.items()))).encode())
+    for name, value in sorted(params.items()):
+        digest.update(f"{name}={value}\0".encode())
+    for label, paths in sorted(inputs.items()):
+        digest.update(f"{label}:{len(paths)}\0".encode())
+        for path in paths:
+            digest.update(file_checksum(path).encode())
+    return digest.hexdigest()
+
+
+class LineItemCache:
+    """Directory of normalized line-item frames stored as uncompressed Arrow IPC files.
+
+    Hits are memory-mapped and converted with ``split_blocks``, so an entry that already
+    matches the schema comes back without a copy: its fixed-width columns are read-only views
+    of the mapped file rather than re-read and re-normalized. Entries are evicted
+    least-recently-used first (hits refresh the file's mtime) once the directory exceeds
+    ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path, *, max_bytes: int = 2048 * MiB) -> None:
+        if max_bytes < 1:
+            raise ValueError("Cache size limit must be positive")
+        self._dir = directory
+        self._max_bytes = max_bytes
+
+    def get(self, key: str, *, schema: TableSchema) -> pd.DataFrame | None:
+        path = self._path(key)
+        try:
+            source = pa.memory_map(str(path))
+        except FileNotFoundError:
+            return None
+        with source:
+            table = pa.ipc.open_file(source).read_all()
+        os.utime(path)
+        df = table.to_pandas(split_blocks=True)
+        return df if conforms(df, schema) else conform(df, schema)
+
+    def put(self, key: str, df: pd.DataFrame) -> Path:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Write then rename, so concurrent runs never memory-map a half-written entry.
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        tmp.replace(path)
+        self._evict(keep=path)
+        return path
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}{_SUFFIX}"
+
+    def _evict(self, *, keep: Path) -> None:
+        entries = sorted(
+            ((p.stat(), p) for p in self._dir.glob(f"*{_SUFFIX}")), key=lambda e: e[0].st_mtime
+        )
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, path in entries:
+            if total <= self._max_bytes:
+                break
+            if path != keep:
+                path.unlink(missing_ok=True)
+                total -= stat.st_size
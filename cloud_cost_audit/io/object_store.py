@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import json
+from collections import deque
+from collections.abc import Iterator, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Protocol
+
+import pandas as pd
+
+from cloud_cost_audit.io.billing_readers import (
+    DEFAULT_DECOMPRESSION_THREADS,
+    BillingBlob,
+    BillingFormat,
+    iter_billing,
+    read_billing,
+)
+from cloud_cost_audit.io.cloud_providers import (
+    BILLING_SCHEMAS,
+    Providers,
+    SharedDatasets,
+)
+from cloud_cost_audit.io.discovery import (
+    BILLING_SUFFIXES,
+    current_manifests,
+    manifest_report_keys,
+)
+from cloud_cost_audit.io.paths import DataPaths
+from cloud_cost_audit.models.schema import concat_frames
+from cloud_cost_audit.units import MiB
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    key: str
+    size: int
+
+
+class ObjectStore(Protocol):
+    """Minimal S3/GCS-style interface: prefix listing plus byte-range reads."""
+
+    def list(self, prefix: str) -> list[ObjectInfo]: ...
+
+    def head(self, key: str) -> ObjectInfo | None: ...
+
+    def read_range(self, key: str, start: int, end: int) -> bytes: ...
+
+
+class LocalObjectStore:
+    """Filesystem stand-in for a bucket; keys are POSIX paths relative to ``root``."""
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+
+    def list(self, prefix: str) -> list[ObjectInfo]:
+        base = self._root.joinpath(*PurePosixPath(prefix).parent.parts)
+        if not base.is_dir():
+            return []
+        out = []
+        for path in base.rglob("*"):
+            key = path.relative_to(self._root).as_posix()
+            if path.is_file() and key.startswith(prefix):
+                out.append(ObjectInfo(key=key, size=path.stat().st_size))
+        return sorted(out, key=lambda o: o.key)
+
+    def head(self, key: str) -> ObjectInfo | None:
+        path = self._root.joinpath(*PurePosixPath(key).parts)
+        return ObjectInfo(key=key, size=path.stat().st_size) if path.is_file() else None
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        with self._root.joinpath(*PurePosixPath(key).parts).open("rb") as fh:
+            fh.seek(start)
+            return fh.read(end - start)
+
+
+class InMemoryObjectStore:
+    """In-process stand-in store, mainly for tests."""
+
+    def __init__(self, objects: Mapping[str, bytes]) -> None:
+        self._objects = dict(objects)
+
+    def list(self, prefix: str) -> list[ObjectInfo]:
+        return [
+            ObjectInfo(key=key, size=len(data))
+            for key, data in sorted(self._objects.items())
+            if key.startswith(prefix)
+        ]
+
+    def head(self, key: str) -> ObjectInfo | None:
+        data = self._objects.get(key)
+        return None if data is None else ObjectInfo(key=key, size=len(data))
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        return self._objects[key][start:end]
+
+
+class RangePrefetcher:
+    """Fetch objects as concurrent byte-range reads, yielding whole objects in input order.
+
+    Ranges are issued ahead of the consumer until ``max_inflight_bytes`` of requested but not
+    yet consumed data is outstanding, so many small parts are fetched in parallel while one
+    huge part cannot blow the memory budget. The range at the head of the queue is always
+    issued, so a single range larger than the budget still makes progress.
+    """
+
+    def __init__(
+        self,
+        store: ObjectStore,
+        *,
+        max_concurrency: int = 16,
+        range_size: int = 8 * MiB,
+        max_inflight_bytes: int = 256 * MiB,
+    ) -> None:
+        if max_concurrency < 1 or range_size < 1 or max_inflight_bytes < 1:
+            raise ValueError("Prefetch concurrency, range size and byte budget must be positive")
+        self._store = store
+        self._max_concurrency = max_concurrency
+        self._range_size = range_size
+        self._max_inflight_bytes = max_inflight_bytes
+
+    def fetch(self, objects: Sequence[ObjectInfo]) -> Iterator[tuple[ObjectInfo, bytes]]:
+        pending: deque[tuple[int, int, int]] = deque()
+        for idx, obj in enumerate(objects):
+            pending += [
+                (idx, start, min(start + self._range_size, obj.size))
+                for start in range(0, max(obj.size, 1), self._range_size)
+            ]
+        issued: deque[tuple[int, int, Future[bytes]]] = deque()
+        inflight = 0
+
+        pool = ThreadPoolExecutor(max_workers=self._max_concurrency)
+        try:
+            for idx, obj in enumerate(objects):
+                chunks: list[bytes] = []
+                while True:
+                    while pending:
+                        owner, start, end = pending[0]
+                        if issued and inflight + (end - start) > self._max_inflight_bytes:
+                            break
+                        pending.popleft()
+                        key = objects[owner].key
+                        future = pool.submit(self._store.read_range, key, start, end)
+                        issued.append((owner, end - start, future))
+                        inflight += end - start
+                    if not issued or issued[0][0] != idx:
+                        break
+                    _, nbytes, future = issued.popleft()
+                    chunks.append(future.result())
+                    inflight -= nbytes
+                yield obj, b"".join(chunks)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+class ObjectStoreProvider:
+    """Provider backend reading billing parts from an object store laid out like ``data_dir``.
+
+    Billing objects are discovered the same way as local deliveries (CUR manifests first,
+    then every part with a matching suffix, then the single-file export) and fetched through
+    a :class:`RangePrefetcher`, so parsing one part overlaps with fetching the next ones.
+    """
+
+    def __init__(
+        self,
+        store: ObjectStore,
+        *,
+        provider: str,
+        billing_format: BillingFormat = "csv",
+        prefetcher: RangePrefetcher | None = None,
+        shared: SharedDatasets | None = None,
+        decompression_threads: int = DEFAULT_DECOMPRESSION_THREADS,
+    ) -> None:
+        self.provider = provider
+        self._store = store
+        self._billing_format: BillingFormat = billing_format
+        self._decompression_threads = decompression_threads
+        self._prefetcher = prefetcher if prefetcher is not None else RangePrefetcher(store)
+        self._shared = shared if shared is not None else object_store_shared_datasets(store)
+
+    @property
+    def billing_format(self) -> BillingFormat:
+        return self._billing_format
+
+    def billing_objects(self, *, invoice_month: str | None = None) -> list[ObjectInfo]:
+        billing_dir, billing_file = _KEY_PATHS.billing_location(self.provider, self._billing_format)
+        listed = self._store.list(billing_dir.as_posix() + "/")
+        if not listed:
+            single = _head_with_compression(self._store, billing_file.as_posix())
+            if single is None:
+                raise FileNotFoundError(f"No billing objects for {self.provider}")
+            return [single]
+        by_key = {o.key: o for o in listed}
+        manifests = [by_key[key] for key in current_manifests(by_key)]
+        if not manifests:
+            suffixes = BILLING_SUFFIXES[self._billing_format]
+            return [o for o in listed if o.key.endswith(suffixes)]
+        parts: list[ObjectInfo] = []
+        for manifest, data in self._prefetcher.fetch(manifests):
+            doc = json.loads(data)
+            for key in manifest_report_keys(doc, invoice_month=invoice_month):
+                local = billing_dir.as_posix() + "/" + key
+                sibling = str(PurePosixPath(manifest.key).parent / PurePosixPath(key).name)
+                match = by_key.get(local) or by_key.get(sibling)
+                if match is None:
+                    raise FileNotFoundError(f"{manifest.key} lists a missing billing part: {key}")
+                parts.append(match)
+        return list(dict.fromkeys(parts))
+
+    def billing(self, *, invoice_month: str | None = None) -> pd.DataFrame:
+        frames = [
+            read_billing(
+                BillingBlob(obj.key, data),
+                fmt=self._billing_format,
+                schema=BILLING_SCHEMAS[self.provider],
+                invoice_month=invoice_month,
+                decompression_threads=self._decompression_threads,
+            )
+            for obj, data in self._prefetcher.fetch(
+                self.billing_objects(invoice_month=invoice_month)
+            )
+        ]
+        if not frames:
+            raise ValueError("No billing parts to load")
+        return concat_frames(frames)
+
+    def billing_chunks(
+        self, chunk_size: int, *, invoice_month: str | None = None
+    ) -> Iterator[pd.DataFrame]:
+        objects = self.billing_objects(invoice_month=invoice_month)
+        for obj, data in self._prefetcher.fetch(objects):
+            yield from iter_billing(
+                BillingBlob(obj.key, data),
+                fmt=self._billing_format,
+                schema=BILLING_SCHEMAS[self.provider],
+                chunk_size=chunk_size,
+                invoice_month=invoice_month,
+                decompression_threads=self._decompression_threads,
+            )
+
+    def inventory(self) -> pd.DataFrame:
+        return self._shared.inventory(self.provider)
+
+    def utilization(self) -> pd.DataFrame:
+        return self._shared.utilization(self.provider)
+
+
+# Object keys mirror the local data_dir layout (generated/aws_cur/..., generated/inventory.csv).
+_KEY_PATHS = DataPaths(Path())
+
+
+def object_store_shared_datasets(
+    store: ObjectStore, prefetcher: RangePrefetcher | None = None
+) -> SharedDatasets:
+    fetcher = prefetcher if prefetcher is not None else RangePrefetcher(store)
+
+    def fetch(key: str) -> BillingBlob:
+        info = _head_with_compression(store, key)
+        if info is None:
+            raise FileNotFoundError(f"Object not found: {key}")
+        [(obj, data)] = fetcher.fetch([info])
+        return BillingBlob(obj.key, data)
+
+    return SharedDatasets(
+        {
+            "inventory": lambda: fetch(_KEY_PATHS.inventory_csv.as_posix()),
+            "utilization": lambda: fetch(_KEY_PATHS.utilization_csv.as_posix()),
+        }
+    )
+
+
+def providers_from_object_store(
+    store: ObjectStore,
+    *,
+    billing_format: BillingFormat = "csv",
+    prefetcher: RangePrefetcher | None = None,
+    decompression_threads: int = DEFAULT_DECOMPRESSION_THREADS,
+) -> Providers:
+    fetcher = prefetcher if prefetcher is not None else RangePrefetcher(store)
+    shared = object_store_shared_datasets(store, fetcher)
+    aws, gcp = (
+        ObjectStoreProvider(
+            store,
+            provider=provider,
+            billing_format=billing_format,
+            prefetcher=fetcher,
+            shared=shared,
+            decompression_threads=decompression_threads,
+        )
+        for provider in ("aws", "gcp")
+    )
+    return Providers(aws=aws, gcp=gcp, shared=shared)
+
+
+def _head_with_compression(store: ObjectStore, key: str) -> ObjectInfo | None:
+    for candidate in (key, key + ".gz", key + ".zst", key + ".bz2"):
+        info = store.head(candidate)
+        if info is not None:
+            return info
+    return None
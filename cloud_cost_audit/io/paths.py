@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Literal
 
 
 @dataclass(frozen=True)
@@ -20,6 +21,39 @@ class DataPaths:
     def gcp_billing_csv(self) -> Path:
         return self.generated_dir / "gcp_billing.csv"
 
+    @property
+    def aws_billing_dir(self) -> Path:
+        # Multi-part CUR deliveries (one or more accounts/months, optionally with manifests).
+        return self.generated_dir / "aws_cur"
+
+    @property
+    def gcp_billing_dir(self) -> Path:
+        return self.generated_dir / "gcp_billing"
+
+    @property
+    def aws_billing_parquet(self) -> Path:
+        return self.generated_dir / "aws_cur.parquet"
+
+    @property
+    def gcp_billing_parquet(self) -> Path:
+        return self.generated_dir / "gcp_billing.parquet"
+
+    @property
+    def aws_billing_arrow(self) -> Path:
+        return self.generated_dir / "aws_cur.arrow"
+
+    @property
+    def gcp_billing_arrow(self) -> Path:
+        return self.generated_dir / "gcp_billing.arrow"
+
+    def billing_location(
+        self, provider: str, fmt: Literal["csv", "parquet", "arrow"]
+    ) -> tuple[Path, Path]:
+        """Return ``(multi-part directory, single-file export)`` for a provider's billing."""
+        prefix = {"aws": "aws_cur", "gcp": "gcp_billing"}[provider]
+        suffix = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}[fmt]
+        return self.generated_dir / prefix, self.generated_dir / f"{prefix}{suffix}"
+
     @property
     def inventory_csv(self) -> Path:
         return self.generated_dir / "inventory.csv"
@@ -27,3 +61,14 @@ class DataPaths:
     @property
     def utilization_csv(self) -> Path:
         return self.generated_dir / "utilization.csv"
+
+
+def resolve_input(path: Path) -> Path:
+    """Return ``path``, or its compressed sibling if only that exists."""
+    if path.exists():
+        return path
+    for suffix in (".gz", ".zst", ".bz2"):
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+    return path
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from cloud_cost_audit.io.json_stream import iter_json_members
+
+_SCHEMA = """
+create table instance_prices (
+    provider TEXT,
+    region TEXT,
+    family TEXT,
+    size TEXT,
+    size_weight REAL,
+    os TEXT,
+    usd_per_hour REAL,
+    primary key (provider, region, family, os, size)
+) without rowid;
+create index instance_prices_by_weight
+    on instance_prices (provider, region, family, os, size_weight);
+create temp table aws_products (sku TEXT primary key, region TEXT, instance_type TEXT, os TEXT);
+create temp table aws_on_demand (sku TEXT primary key, usd_per_hour REAL);
+"""
+
+_INSERT_BATCH_ROWS = 10_000
+
+# AWS size suffixes without a multiplier, weighted relative to "xlarge" = 4 (about vCPUs).
+_AWS_SIZE_WEIGHTS = {"nano": 0.125, "micro": 0.25, "small": 0.5, "medium": 1.0, "large": 2.0}
+_AWS_NXLARGE = re.compile(r"^(\d*)xlarge$")
+# Billing operation of the plain license-included SKU per operating system. Other operations
+# on the same instance type and OS (BYOL, SQL Server, HA add-ons) are priced differently.
+_AWS_BASE_OPERATIONS = {
+    "Linux": "RunInstances",
+    "Windows": "RunInstances:0002",
+    "RHEL": "RunInstances:0010",
+    "SUSE": "RunInstances:000g",
+}
+
+# GCP prices predefined machine types per vCPU and GiB of RAM; rows are materialized for the
+# standard shapes so both providers share one lookup.
+_GCP_SKU = re.compile(
+    r"^(?P<series>[A-Z][A-Z0-9]*) (?:Predefined )?(?:Instance )?(?P<unit>Core|Ram) running in",
+    re.IGNORECASE,
+)
+_GCP_GIB_PER_VCPU = {"standard": 4.0, "highmem": 8.0, "highcpu": 1.0}
+_GCP_N1_GIB_PER_VCPU = {"standard": 3.75, "highmem": 6.5, "highcpu": 0.9}
+_GCP_VCPUS = (2, 4, 8, 16, 32, 48, 64, 80, 96, 128)
+
+
+@dataclass(frozen=True)
+class InstancePrice:
+    instance_type: str
+    usd_per_hour: float
+
+
+def split_instance_type(provider: str, instance_type: str) -> tuple[str, str]:
+    """``(family, size)``: ``m5.2xlarge`` -> ``(m5, 2xlarge)``, ``n2-standard-8`` ->
+    ``(n2-standard, 8)``."""
+    sep = "." if provider == "aws" else "-"
+    family, _, size = instance_type.rpartition(sep)
+    return family, size
+
+
+def join_instance_type(provider: str, family: str, size: str) -> str:
+    return f"{family}{'.' if provider == 'aws' else '-'}{size}"
+
+
+def _aws_size_weight(size: str) -> float | None:
+    if size in _AWS_SIZE_WEIGHTS:
+        return _AWS_SIZE_WEIGHTS[size]
+    match = _AWS_NXLARGE.match(size)
+    # Bare-metal and other irregular sizes have no place in the "next size down" order.
+    return 4.0 * int(match.group(1) or 1) if match else None
+
+
+def _batched(rows: Iterable[tuple[Any, ...]]) -> Iterator[list[tuple[Any, ...]]]:
+    it = iter(rows)
+    while batch := list(islice(it, _INSERT_BATCH_ROWS)):
+        yield batch
+
+
+def _load_aws_offer(con: sqlite3.Connection, path: Path) -> None:
+    """Stream an EC2 offer file (``products`` + ``terms.OnDemand``) into staging tables."""
+    products: list[tuple[str, str, str, str]] = []
+    prices: list[tuple[str, float]] = []
+    for container, sku, value in iter_json_members(path, [("products",), ("terms", "OnDemand")]):
+        if container == ("products",):
+            attrs = value.get("attributes", {})
+            os_name = attrs.get("operatingSystem", "Linux")
+            base_operation = _AWS_BASE_OPERATIONS.get(os_name)
+            if (
+                value.get("productFamily") == "Compute Instance"
+                and attrs.get("tenancy") == "Shared"
+                and attrs.get("preInstalledSw", "NA") == "NA"
+                and attrs.get("capacitystatus", "Used") == "Used"
+                and attrs.get("licenseModel", "No License required") == "No License required"
+                and (
+                    base_operation is None
+                    or attrs.get("operation", base_operation) == base_operation
+                )
+                and attrs.get("regionCode")
+                and attrs.get("instanceType")
+            ):
+                products.append((str(sku), attrs["regionCode"], attrs["instanceType"], os_name))
+        else:
+            for term in value.values():
+                for dimension in term.get("priceDimensions", {}).values():
+                    if dimension.get("unit") == "Hrs" and "USD" in dimension["pricePerUnit"]:
+                        prices.append((str(sku), float(dimension["pricePerUnit"]["USD"])))
+                        break
+        if len(products) >= _INSERT_BATCH_ROWS or len(prices) >= _INSERT_BATCH_ROWS:
+            _flush_aws(con, products, prices)
+    _flush_aws(con, products, prices)
+
+
+def _flush_aws(
+    con: sqlite3.Connection,
+    products: list[tuple[str, str, str, str]],
+    prices: list[tuple[str, float]],
+) -> None:
+    con.executemany("insert or replace into aws_products values (?, ?, ?, ?)", products)
+    con.executemany("insert or replace into aws_on_demand values (?, ?)", prices)
+    products.clear()
+    prices.clear()
+
+
+def _aws_instance_rows(con: sqlite3.Connection) -> Iterator[tuple[Any, ...]]:
+    for region, instance_type, os_name, usd in con.execute(
+        "select p.region, p.instance_type, p.os, d.usd_per_hour "
+        "from aws_products p join aws_on_demand d using (sku) where d.usd_per_hour > 0"
+    ):
+        family, size = split_instance_type("aws", instance_type)
+        yield ("aws", region, family, size, _aws_size_weight(size), os_name, usd)
+
+
+def _gcp_unit_prices(path: Path) -> dict[tuple[str, str], dict[str, float]]:
+    """``(region, series) -> {"core": usd/vCPU-hour, "ram": usd/GiB-hour}`` from a SKU list."""
+    units: dict[tuple[str, str], dict[str, float]] = {}
+    for _, _, sku in iter_json_members(path, [("skus",)]):
+        category = sku.get("category", {})
+        if category.get("resourceFamily") != "Compute" or category.get("usageType") != "OnDemand":
+            continue
+        match = _GCP_SKU.match(sku.get("description", ""))
+        if match is None or not sku.get("pricingInfo"):
+            continue
+        rates = sku["pricingInfo"][0]["pricingExpression"]["tieredRates"]
+        price = rates[-1]["unitPrice"]
+        usd = int(price.get("units", 0) or 0) + price.get("nanos", 0) / 1e9
+        for region in sku.get("serviceRegions", []):
+            key = (region, match["series"].lower())
+            units.setdefault(key, {})[match["unit"].lower()] = usd
+    return units
+
+
+def _gcp_instance_rows(units: dict[tuple[str, str], dict[str, float]]) -> Iterator[tuple[Any, ...]]:
+    for (region, series), prices in units.items():
+        if "core" not in prices or "ram" not in prices:
+            continue
+        gib_per_vcpu = _GCP_N1_GIB_PER_VCPU if series == "n1" else _GCP_GIB_PER_VCPU
+        for shape, gib in gib_per_vcpu.items():
+            for vcpus in _GCP_VCPUS:
+                usd = vcpus * prices["core"] + vcpus * gib * prices["ram"]
+                yield ("gcp", region, f"{series}-{shape}", str(vcpus), vcpus, "Linux", usd)
+
+
+def build_pricing_catalog(
+    path: Path, *, aws_offer_files: Sequence[Path] = (), gcp_sku_files: Sequence[Path] = ()
+) -> Path:
+    """Stream-parse offline price lists into an indexed SQLite catalog at ``path``.
+
+    AWS offer files are EC2 price list JSON (``products`` / ``terms.OnDemand``); GCP files are
+    Cloud Billing catalog SKU listings (``skus``). The catalog is written to a temporary file
+    and moved into place, so readers never see a partial index.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    con = sqlite3.connect(tmp)
+    try:
+        con.executescript(_SCHEMA)
+        insert = "insert or replace into instance_prices values (?, ?, ?, ?, ?, ?, ?)"
+        for offer in aws_offer_files:
+            _load_aws_offer(con, offer)
+        for batch in _batched(_aws_instance_rows(con)):
+            con.executemany(insert, batch)
+        for sku_file in gcp_sku_files:
+            for batch in _batched(_gcp_instance_rows(_gcp_unit_prices(sku_file))):
+                con.executemany(insert, batch)
+        con.commit()
+    finally:
+        con.close()
+    tmp.replace(path)
+    return path
+
+
+class PricingCatalog:
+    """Read-only lookups against a catalog built by ``build_pricing_catalog``.
+
+    Point lookups hit the primary key / size-order index; hot keys are served from an
+    in-process LRU. Connections are per thread, and the catalog pickles by path so it can be
+    handed to process-pool detectors.
+    """
+
+    def __init__(self, path: Path, *, cache_size: int = 4096) -> None:
+        if not path.exists():
+            raise ValueError(f"Pricing catalog not found: {path}")
+        self.path = path
+        self._cache_size = cache_size
+        self._local = threading.local()
+        self._lookup = lru_cache(maxsize=cache_size)(self._query)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"path": self.path, "cache_size": self._cache_size}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["path"], cache_size=state["cache_size"])  # type: ignore[misc]
+
+    def price(
+        self, provider: str, region: str, instance_type: str, os_name: str = "Linux"
+    ) -> InstancePrice | None:
+        return self._lookup(provider, region, instance_type, os_name)[0]
+
+    def next_size_down(
+        self, provider: str, region: str, instance_type: str, os_name: str = "Linux"
+    ) -> InstancePrice | None:
+        """The next cheaper size in the same family, region and OS, if the catalog has one."""
+        return self._lookup(provider, region, instance_type, os_name)[1]
+
+    def rightsizing(self, resources: pd.DataFrame) -> pd.DataFrame:
+        """``next_instance_type`` / ``hourly_savings_usd`` per row of ``resources``.
+
+        Rows need ``provider``, ``region`` and ``instance_type`` (``os`` defaults to Linux);
+        rows without a catalog price or a smaller size get NaN savings. Each distinct
+        instance is looked up once.
+        """
+        keys = pd.DataFrame(
+            {
+                "provider": resources["provider"].astype(str),
+                "region": resources["region"].astype(str),
+                "instance_type": resources["instance_type"].fillna("").astype(str),
+                "os": (
+                    resources["os"].fillna("Linux").astype(str)
+                    if "os" in resources.columns
+                    else "Linux"
+                ),
+            },
+            index=resources.index,
+        )
+        distinct = keys.drop_duplicates()
+        targets: list[str | None] = []
+        savings: list[float] = []
+        for provider, region, instance_type, os_name in distinct.itertuples(index=False):
+            current, smaller = self._lookup(provider, region, instance_type, os_name)
+            if current is None or smaller is None:
+                targets.append(None)
+                savings.append(float("nan"))
+            else:
+                targets.append(smaller.instance_type)
+                savings.append(current.usd_per_hour - smaller.usd_per_hour)
+        found = distinct.assign(next_instance_type=targets, hourly_savings_usd=savings)
+        return keys.merge(found, how="left", on=list(keys.columns)).set_axis(resources.index)[
+            ["next_instance_type", "hourly_savings_usd"]
+        ]
+
+    def _connection(self) -> sqlite3.Connection:
+        con: sqlite3.Connection | None = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.con = con
+        return con
+
+    def _query(
+        self, provider: str, region: str, instance_type: str, os_name: str
+    ) -> tuple[InstancePrice | None, InstancePrice | None]:
+        family, size = split_instance_type(provider, instance_type)
+        con = self._connection()
+        row = con.execute(
+            "select size_weight, usd_per_hour from instance_prices "
+            "where provider = ? and region = ? and family = ? and os = ? and size = ?",
+            [provider, region, family, os_name, size],
+        ).fetchone()
+        if row is None:
+            return None, None
+        current = InstancePrice(instance_type, row[1])
+        if row[0] is None:
+            return current, None
+        smaller = con.execute(
+            "select size, usd_per_hour from instance_prices "
+            "where provider = ? and region = ? and family = ? and os = ? and size_weight < ? "
+            "order by size_weight desc limit 1",
+            [provider, region, family, os_name, row[0]],
+        ).fetchone()
+        if smaller is None:
+            return current, None
+        return current, InstancePrice(join_instance_type(provider, family, smaller[0]), smaller[1])
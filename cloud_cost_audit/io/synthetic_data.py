@@ -6,6 +6,7 @@ from pathlib import Path
 
 import pandas as pd
 
+from cloud_cost_audit.io.billing_readers import BillingFormat, export_columnar_billing
 from cloud_cost_audit.io.paths import DataPaths
 
 
@@ -25,7 +26,25 @@ def _month_bounds(invoice_month: str) -> tuple[date, date]:
     return start, end
 
 
-def ensure_synthetic_inputs(*, data_dir: Path, invoice_month: str) -> SyntheticDataSummary:
+def ensure_synthetic_inputs(
+    *, data_dir: Path, invoice_month: str, billing_format: BillingFormat = "csv"
+) -> SyntheticDataSummary:
+    summary = _ensure_synthetic_csvs(data_dir=data_dir, invoice_month=invoice_month)
+    if billing_format != "csv":
+        paths = DataPaths(data_dir)
+        targets = {
+            "parquet": (paths.aws_billing_parquet, paths.gcp_billing_parquet),
+            "arrow": (paths.aws_billing_arrow, paths.gcp_billing_arrow),
+        }[billing_format]
+        for csv_path, out_path in zip(
+            (paths.aws_billing_csv, paths.gcp_billing_csv), targets, strict=True
+        ):
+            if not out_path.exists():
+                export_columnar_billing(csv_path, out_path, fmt=billing_format)
+    return summary
+
+
+def _ensure_synthetic_csvs(*, data_dir: Path, invoice_month: str) -> SyntheticDataSummary:
     paths = DataPaths(data_dir)
     paths.generated_dir.mkdir(parents=True, exist_ok=True)
 
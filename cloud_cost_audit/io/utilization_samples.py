@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Literal
+
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+SampleFormat = Literal["csv", "parquet", "arrow"]
+
+# Raw per-resource metric samples (minute or hour resolution) behind the utilization summary.
+UTILIZATION_SAMPLE_METRICS = ["cpu_pct", "mem_pct", "network_mbps"]
+UTILIZATION_SAMPLE_COLUMNS = ["provider", "resource_id", *UTILIZATION_SAMPLE_METRICS]
+
+_DATASET_FORMATS: dict[str, str] = {"csv": "csv", "parquet": "parquet", "arrow": "ipc"}
+
+
+def iter_utilization_samples(
+    path: Path, *, fmt: SampleFormat, batch_rows: int
+) -> Iterator[pd.DataFrame]:
+    """Yield metric samples from a file or directory of parts, ``batch_rows`` at a time.
+
+    Only the key and metric columns are read. Arrow IPC files are memory-mapped, so batches
+    are sliced from the page cache rather than copied in.
+    """
+    dataset = ds.dataset(
+        str(path),
+        format=_DATASET_FORMATS[fmt],
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
+    missing = sorted(set(UTILIZATION_SAMPLE_COLUMNS) - set(dataset.schema.names))
+    if missing:
+        raise ValueError(f"Utilization samples {path} are missing columns: {missing}")
+    for batch in dataset.to_batches(columns=UTILIZATION_SAMPLE_COLUMNS, batch_size=batch_rows):
+        if batch.num_rows:
+            yield batch.to_pandas()
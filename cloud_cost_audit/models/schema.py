@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Logical column types. Low-cardinality dimensions are categoricals (one small dictionary plus
+# int8/int16 codes instead of one Python string per row); per-row identifiers stay strings.
+CATEGORY = "category"
+STRING = "string"
+FLOAT = "float64"
+# Naive UTC timestamps. CSV text is read as str and parsed by parse_timestamps, not by
+# read_csv's per-row format inference.
+DATETIME = "datetime64[ns]"
+
+_DUCKDB_TYPES = {CATEGORY: "VARCHAR", STRING: "VARCHAR", FLOAT: "DOUBLE", DATETIME: "TIMESTAMP"}
+_READ_DTYPES = {CATEGORY: "category", STRING: str, FLOAT: "float64", DATETIME: str}
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    name: str
+    columns: dict[str, str]
+
+    @property
+    def column_names(self) -> list[str]:
+        return list(self.columns)
+
+    def read_dtypes(self) -> dict[str, object]:
+        """dtype mapping for ``pd.read_csv`` so columns are typed while parsing."""
+        return {col: _READ_DTYPES[kind] for col, kind in self.columns.items()}
+
+    def duckdb_columns(self) -> str:
+        return ", ".join(f"{col} {_DUCKDB_TYPES[kind]}" for col, kind in self.columns.items())
+
+
+AWS_BILLING_SCHEMA = TableSchema(
+    name="aws_billing",
+    columns={
+        "account_id": CATEGORY,
+        "payer_account_id": CATEGORY,
+        "region": CATEGORY,
+        "service": CATEGORY,
+        "usage_type": CATEGORY,
+        "operation": CATEGORY,
+        "resource_id": STRING,
+        "tag_env": CATEGORY,
+        "tag_app": CATEGORY,
+        "tag_team": CATEGORY,
+        "tag_cost_center": CATEGORY,
+        "cost_usd": FLOAT,
+        "usage_amount": FLOAT,
+        "pricing_unit": CATEGORY,
+        "line_item_type": CATEGORY,
+        "invoice_month": CATEGORY,
+        "usage_start_time": DATETIME,
+        "usage_end_time": DATETIME,
+    },
+)
+
+GCP_BILLING_SCHEMA = TableSchema(
+    name="gcp_billing",
+    columns={
+        "billing_account_id": CATEGORY,
+        "project_id": CATEGORY,
+        "location": CATEGORY,
+        "service_description": CATEGORY,
+        "sku_description": CATEGORY,
+        "label_env": CATEGORY,
+        "label_app": CATEGORY,
+        "label_team": CATEGORY,
+        "label_cost_center": CATEGORY,
+        "cost_usd": FLOAT,
+        "credits_usd": FLOAT,
+        "usage_amount": FLOAT,
+        "usage_unit": CATEGORY,
+        "invoice_month": CATEGORY,
+        "usage_start_time": DATETIME,
+        "usage_end_time": DATETIME,
+    },
+)
+
+UNIFIED_LINE_ITEM_SCHEMA = TableSchema(
+    name="unified_line_items",
+    columns={
+        "provider": CATEGORY,
+        "account": CATEGORY,
+        "project": CATEGORY,
+        "region": CATEGORY,
+        "service": CATEGORY,
+        "sku": CATEGORY,
+        "operation": CATEGORY,
+        "resource_id": STRING,
+        "env": CATEGORY,
+        "app": CATEGORY,
+        "team": CATEGORY,
+        "cost_center": CATEGORY,
+        "cost_usd": FLOAT,
+        "usage_amount": FLOAT,
+        "unit": CATEGORY,
+        "line_item_type": CATEGORY,
+        "invoice_month": CATEGORY,
+        "usage_start_time": DATETIME,
+        "usage_end_time": DATETIME,
+        "usage_hour": DATETIME,
+        "usage_day": DATETIME,
+    },
+)
+
+SCHEMAS: dict[str, TableSchema] = {
+    schema.name: schema
+    for schema in (AWS_BILLING_SCHEMA, GCP_BILLING_SCHEMA, UNIFIED_LINE_ITEM_SCHEMA)
+}
+
+
+def as_category(values: pd.Series) -> pd.Series:
+    """Categorical view of ``values`` with string categories and blanks as ``""``."""
+    cat = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category")
+    categories = cat.cat.categories
+    if categories.dtype != object:
+        cat = cat.cat.rename_categories(categories.astype(str))
+    if cat.hasnans:
+        if "" not in cat.cat.categories:
+            cat = cat.cat.add_categories("")
+        cat = cat.fillna("")
+    return cat
+
+
+def has_value(values: pd.Series) -> npt.NDArray[np.bool_]:
+    """True where ``values`` is neither missing nor blank (empty or whitespace only).
+
+    Categoricals are tested once per category rather than once per row.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        present = np.asarray(values.cat.categories.astype(str).str.strip() != "", dtype=bool)
+        # Missing values (code -1) read the appended trailing slot.
+        codes = np.asarray(values.cat.codes, dtype=np.intp)
+        mask: npt.NDArray[np.bool_] = np.append(present, False)[codes]
+        return mask
+    blank = values.isna().to_numpy() | (values.astype(str).str.strip() == "").to_numpy()
+    mask = ~blank
+    return mask
+
+
+def constant_category(value: str, length: int) -> pd.Categorical:
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[value])
+
+
+# Distinct timestamp strings already parsed, shared across chunks and parts of a run.
+# Parts are parsed on worker threads, so lookups and updates hold the lock.
+_TIMESTAMP_CACHE: dict[str, np.datetime64] = {}
+_TIMESTAMP_CACHE_LOCK = threading.Lock()
+_TIMESTAMP_CACHE_MAX_ENTRIES = 100_000
+_UTC_OFFSET = r"(?:Z|[+-]\d{2}:?\d{2})$"
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """Parse ISO-8601 timestamps into naive UTC ``datetime64[ns]``.
+
+    Hourly billing exports repeat a few hundred distinct timestamps across millions of rows,
+    so the column is factorized and only strings not seen before are parsed (with the fixed
+    ISO-8601 fast path); rows are then filled by indexing the parsed uniques with the codes.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        return values.astype(DATETIME)
+    codes, uniques = pd.factorize(values)
+    keys = np.asarray(uniques, dtype=object).astype(str)
+    # One extra slot so the -1 code of missing values indexes NaT.
+    parsed = np.full(len(keys) + 1, np.datetime64("NaT"), dtype=DATETIME)
+    misses = []
+    with _TIMESTAMP_CACHE_LOCK:
+        for i, key in enumerate(keys):
+            hit = _TIMESTAMP_CACHE.get(key)
+            if hit is None:
+                misses.append(i)
+            else:
+                parsed[i] = hit
+    if misses:
+        # Naive strings are taken as UTC. They are parsed apart from offset-qualified ones
+        # because pandas' ISO-8601 path misreads naive values that follow an offset.
+        miss_idx = np.asarray(misses)
+        miss_keys = keys[miss_idx]
+        has_offset = pd.Series(miss_keys).str.contains(_UTC_OFFSET, regex=True).to_numpy()
+        for group in (has_offset, ~has_offset):
+            if group.any():
+                fresh = pd.to_datetime(miss_keys[group], format="ISO8601", utc=True)
+                parsed[miss_idx[group]] = fresh.tz_localize(None).to_numpy(DATETIME)
+        with _TIMESTAMP_CACHE_LOCK:
+            if len(_TIMESTAMP_CACHE) + len(misses) > _TIMESTAMP_CACHE_MAX_ENTRIES:
+                _TIMESTAMP_CACHE.clear()
+            _TIMESTAMP_CACHE.update(zip(miss_keys.tolist(), parsed[miss_idx], strict=True))
+    return pd.Series(parsed[codes], index=values.index, name=values.name)
+
+
+def conform(df: pd.DataFrame, schema: TableSchema) -> pd.DataFrame:
+    """Cast the schema columns present in ``df``; already-conforming columns are untouched."""
+    out = {}
+    for col in df.columns:
+        kind = schema.columns.get(col)
+        values = df[col]
+        if kind == CATEGORY:
+            out[col] = as_category(values)
+        elif kind == FLOAT and values.dtype != np.float64:
+            out[col] = values.astype(np.float64)
+        elif kind == STRING and values.dtype != object:
+            out[col] = values.astype(str)
+        elif kind == DATETIME and values.dtype != DATETIME:
+            out[col] = parse_timestamps(values)
+        else:
+            out[col] = values
+    return pd.DataFrame(out, index=df.index)
+
+
+def conforms(df: pd.DataFrame, schema: TableSchema) -> bool:
+    """True if ``df`` already has exactly the schema's columns, order and dtypes."""
+    if df.columns.tolist() != schema.column_names:
+        return False
+    for col, kind in schema.columns.items():
+        values = df[col]
+        if kind == CATEGORY:
+            dtype = values.dtype
+            if not isinstance(dtype, pd.CategoricalDtype) or dtype.categories.dtype != object:
+                return False
+            if values.hasnans:
+                return False
+        elif values.dtype != (object if kind == STRING else kind):
+            return False
+    return True
+
+
+def concat_frames(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate frames, unioning categorical dictionaries so columns stay categorical.
+
+    Each column is concatenated once: categoricals are recoded straight into the unioned
+    dictionary (no per-frame ``astype`` to the union dtype first) and the result is assembled
+    without consolidating columns into 2-D blocks, which would copy every row again.
+    """
+    if not frames:
+        raise ValueError("Nothing to concatenate")
+    columns = frames[0].columns
+    if any(not f.columns.equals(columns) for f in frames[1:]):
+        return pd.concat(frames, ignore_index=True)
+    out: dict[str, object] = {}
+    for col in columns:
+        parts = [f[col] for f in frames]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            out[col] = union_categoricals([p.array for p in parts])
+        else:
+            out[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(out, copy=False)
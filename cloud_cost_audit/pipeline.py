@@ -1,35 +1,74 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Iterator
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
 import duckdb
 import pandas as pd
 
-from cloud_cost_audit.analytics.metrics import (
-    TagCoverage,
-    compute_tag_coverage,
-    export_cost_by_service,
-    export_unallocated_spend,
+from cloud_cost_audit.analytics.allocation import allocate_shared_costs
+from cloud_cost_audit.analytics.anomalies import anomaly_opportunities, detect_cost_anomalies
+from cloud_cost_audit.analytics.classification import SERVICE_CLASS_COLUMN, ClassificationIndex
+from cloud_cost_audit.analytics.forecast import forecast_spend
+from cloud_cost_audit.analytics.metrics import TagCoverage, aggregate_line_items
+from cloud_cost_audit.analytics.percentiles import sketch_quantiles
+from cloud_cost_audit.analytics.quick_wins import build_quick_wins, top_opportunities_by_team
+from cloud_cost_audit.analytics.registry import (
+    BUILTIN_DETECTOR_MODULES,
+    DetectorInputs,
+    load_detector_modules,
+    registered_detectors,
+    run_detectors,
 )
-from cloud_cost_audit.analytics.quick_wins import build_top_10_quick_wins
-from cloud_cost_audit.analytics.waste_detection import (
-    detect_commitment_opportunities,
-    detect_egress_hotspots,
-    detect_schedule_nonprod_compute,
-    detect_storage_tier_optimizations,
-    detect_underutilized_compute,
-    detect_zombie_assets,
+from cloud_cost_audit.config import (
+    AuditConfig,
+    IngestionConfig,
+    PricingConfig,
+    UtilizationSamplesConfig,
+)
+from cloud_cost_audit.io.billing_readers import read_billing
+from cloud_cost_audit.io.cloud_providers import (
+    BILLING_SCHEMAS,
+    CloudProvider,
+    MockProvider,
+    Providers,
+)
+from cloud_cost_audit.io.incremental import ensure_incremental_tables, sync_line_item_parts
+from cloud_cost_audit.io.line_item_cache import LineItemCache, cache_key
+from cloud_cost_audit.io.object_store import (
+    LocalObjectStore,
+    RangePrefetcher,
+    providers_from_object_store,
+)
+from cloud_cost_audit.io.pricing_catalog import PricingCatalog, build_pricing_catalog
+from cloud_cost_audit.io.utilization_samples import (
+    UTILIZATION_SAMPLE_METRICS,
+    iter_utilization_samples,
 )
-from cloud_cost_audit.config import AuditConfig
-from cloud_cost_audit.io.cloud_providers import Providers
 from cloud_cost_audit.models.core import QuickWin
+from cloud_cost_audit.models.schema import UNIFIED_LINE_ITEM_SCHEMA, concat_frames, conform
+from cloud_cost_audit.transforms.duckdb_normalize import (
+    create_line_item_views,
+    fetch_compacted_line_items,
+    fetch_last_usage_day,
+)
 from cloud_cost_audit.transforms.normalize import (
+    NORMALIZATION_VERSION,
     normalize_aws_billing,
     normalize_gcp_billing,
     unify_line_items,
 )
+from cloud_cost_audit.transforms.rollup import (
+    LineItemRollups,
+    RollupGrain,
+    grain_dimensions,
+    rollup_line_items,
+)
+from cloud_cost_audit.transforms.tag_inference import TagInference
+from cloud_cost_audit.units import MiB
 
 
 @dataclass(frozen=True)
@@ -40,62 +79,151 @@ class AuditRunResult:
     tag_coverage: TagCoverage
     quick_wins_csv: Path
     duckdb_path: Path
+    anomalies: pd.DataFrame | None = None
 
 
 def run_audit(*, config: AuditConfig) -> AuditRunResult:
     config.output_dir.mkdir(parents=True, exist_ok=True)
-    providers = Providers.from_data_dir(config.data_dir)
+    providers = _providers(config.data_dir, config.ingestion)
 
-    aws_billing = normalize_aws_billing(providers.aws.billing())
-    gcp_billing = normalize_gcp_billing(providers.gcp.billing())
-    line_items = unify_line_items([aws_billing, gcp_billing])
+    # Blank allocation keys are back-filled from ownership sources as line items are loaded.
+    tags = None
+    if config.tag_inference is not None:
+        ownership_map = config.tag_inference.ownership_map
+        tags = TagInference(
+            providers.inventory(),
+            pd.read_csv(ownership_map, dtype=str) if ownership_map is not None else None,
+        )
 
-    baseline = float(line_items["cost_usd"].sum())
+    config.duckdb_path.parent.mkdir(parents=True, exist_ok=True)
+    with duckdb.connect(str(config.duckdb_path)) as con:
+        rollups = _ingest_line_items(
+            con,
+            providers,
+            invoice_month=config.invoice_month,
+            ingestion=config.ingestion,
+            tags=tags,
+        )
+        # Day rollups drop usage windows, so daily series are cut off at the last metered day
+        # of the full-detail table.
+        usage_through = (
+            fetch_last_usage_day(con, invoice_month=config.invoice_month)
+            if config.forecast is not None or config.anomalies is not None
+            else None
+        )
 
-    # Pull inventory/utilization for both providers (still mocked, local CSV).
-    inventory = pd.concat([providers.aws.inventory(), providers.gcp.inventory()], ignore_index=True)
-    utilization = pd.concat(
-        [providers.aws.utilization(), providers.gcp.utilization()], ignore_index=True
+    # One grouped pass feeds the baseline, coverage, exports and line-item detectors.
+    aggregates = aggregate_line_items(
+        rollups.for_consumer(aggregate_line_items), config.required_allocation_keys
     )
+    baseline = aggregates.total_cost_usd
+
+    # Service/SKU classes are looked up per distinct tuple, reusing earlier runs' results.
+    with duckdb.connect(str(config.duckdb_path)) as con:
+        classification = ClassificationIndex.load(con)
+        line_item_groups = aggregates.groups.assign(
+            **{SERVICE_CLASS_COLUMN: classification.classify(aggregates.groups)}
+        )
+        classification.save(con)
+
+    # Inventory/utilization for all providers (still mocked, local CSV), parsed once per run.
+    inventory = providers.inventory()
+    utilization = providers.utilization()
+    if config.utilization_samples is not None:
+        utilization = _with_sample_percentiles(utilization, config.utilization_samples)
 
-    opps = []
-    opps += detect_underutilized_compute(
-        inventory=inventory,
-        utilization=utilization,
-        underutilized_cpu_pct=config.thresholds.underutilized_cpu_pct,
-        min_cost_usd=config.thresholds.min_compute_cost_usd,
+    # Registered detectors (built-ins plus configured in-house modules) run concurrently over
+    # the shared read-only inputs.
+    detector_modules = [*BUILTIN_DETECTOR_MODULES, *config.detectors.modules]
+    load_detector_modules(detector_modules)
+    opportunities = run_detectors(
+        registered_detectors(
+            config.detectors.enabled, config.detectors.disabled, modules=detector_modules
+        ),
+        DetectorInputs(
+            inventory=inventory,
+            utilization=utilization,
+            line_items=rollups.at,
+            line_item_groups=line_item_groups,
+            pricing=_pricing_catalog(config.pricing) if config.pricing is not None else None,
+        ),
+        thresholds=config.thresholds,
+        executor=config.detectors.executor,
+        max_workers=config.detectors.max_workers,
     )
-    opps += detect_schedule_nonprod_compute(inventory=inventory)
-    opps += detect_zombie_assets(inventory=inventory)
-    opps += detect_storage_tier_optimizations(line_items=line_items)
-    opps += detect_egress_hotspots(line_items=line_items)
-    opps += detect_commitment_opportunities(line_items=line_items)
 
-    quick_wins = build_top_10_quick_wins(opps)
+    # Spend spikes are scored against persisted per-series baselines, then ranked with the
+    # detector findings.
+    anomalies = None
+    if config.anomalies is not None:
+        with duckdb.connect(str(config.duckdb_path)) as con:
+            anomalies = detect_cost_anomalies(
+                con,
+                rollups.for_consumer(detect_cost_anomalies),
+                alpha=config.anomalies.alpha,
+                z_threshold=config.anomalies.z_threshold,
+                warmup_days=config.anomalies.warmup_days,
+                min_excess_usd=config.anomalies.min_excess_usd,
+                through=usage_through,
+            )
+        opportunities = pd.concat(
+            [opportunities, anomaly_opportunities(anomalies)], ignore_index=True
+        )
+        anomalies.to_csv(config.output_dir / "cost_anomalies.csv", index=False)
+
+    quick_wins = build_quick_wins(
+        opportunities,
+        k=config.quick_wins.k,
+        max_per_kind=config.quick_wins.max_per_kind,
+        max_per_team=config.quick_wins.max_per_team,
+    )
 
     # Persist to DuckDB for dashboarding.
-    config.duckdb_path.parent.mkdir(parents=True, exist_ok=True)
     with duckdb.connect(str(config.duckdb_path)) as con:
-        con.register("line_items", line_items)
-        con.execute("create or replace table unified_line_items as select * from line_items")
         con.register("quick_wins_df", pd.DataFrame([q.model_dump() for q in quick_wins]))
         con.execute("create or replace table quick_wins as select * from quick_wins_df")
 
     # Machine-readable exports.
     quick_wins_csv = config.output_dir / "quick_wins.csv"
     pd.DataFrame([q.model_dump() for q in quick_wins]).to_csv(quick_wins_csv, index=False)
-    export_cost_by_service(line_items, config.output_dir / "cost_by_service.csv")
-    export_unallocated_spend(
-        line_items, config.required_allocation_keys, config.output_dir / "unallocated_spend.csv"
+    top_opportunities_by_team(opportunities, k=config.quick_wins.per_team_k).to_csv(
+        config.output_dir / "quick_wins_by_team.csv", index=False
     )
+    aggregates.cost_by_service().to_csv(config.output_dir / "cost_by_service.csv", index=False)
+    aggregates.unallocated_spend().to_csv(config.output_dir / "unallocated_spend.csv", index=False)
+    if config.allocation is not None:
+        allocation = config.allocation
+        allocate_shared_costs(
+            rollups.for_consumer(allocate_shared_costs),
+            key=allocation.key,
+            driver=allocation.driver,
+            scope=allocation.scope,
+            shared_services=allocation.shared_services,
+            weights=allocation.weights,
+        ).to_csv(config.output_dir / "allocated_cost.csv", index=False)
 
-    tag_coverage = compute_tag_coverage(line_items, config.required_allocation_keys)
+    tag_coverage = aggregates.tag_coverage()
     (config.output_dir / "tag_coverage.json").write_text(
         tag_coverage.to_json() + "\n", encoding="utf-8"
     )
+    if tags is not None:
+        _write_tag_inference(
+            config.output_dir / "tag_inference.json", tags=tags, tag_coverage=tag_coverage
+        )
+
+    forecast = None
+    if config.forecast is not None:
+        forecast = forecast_spend(
+            rollups.for_consumer(forecast_spend),
+            seasonality=config.forecast.seasonality,
+            through=usage_through,
+        )
+        forecast.to_csv(config.output_dir / "forecast.csv", index=False)
 
     # Monthly plan (derived from findings, deterministic template).
-    _write_monthly_plan(config.output_dir / "monthly_plan.md", tag_coverage=tag_coverage)
+    _write_monthly_plan(
+        config.output_dir / "monthly_plan.md", tag_coverage=tag_coverage, forecast=forecast
+    )
 
     savings_total = float(sum(q.expected_savings_monthly_usd for q in quick_wins))
     (config.output_dir / "run_summary.json").write_text(
@@ -119,10 +247,250 @@ def run_audit(*, config: AuditConfig) -> AuditRunResult:
         tag_coverage=tag_coverage,
         quick_wins_csv=quick_wins_csv,
         duckdb_path=config.duckdb_path,
+        anomalies=anomalies,
+    )
+
+
+def _with_sample_percentiles(
+    utilization: pd.DataFrame, samples: UtilizationSamplesConfig
+) -> pd.DataFrame:
+    percentiles = sketch_quantiles(
+        iter_utilization_samples(samples.path, fmt=samples.format, batch_rows=samples.batch_rows),
+        metrics=UTILIZATION_SAMPLE_METRICS,
+        quantiles=samples.quantiles,
+        relative_accuracy=samples.relative_accuracy,
+    )
+    keys = ["provider", "resource_id"]
+    # Outer join: sampled resources missing from the summary still get percentiles.
+    return utilization.astype({k: str for k in keys}).merge(percentiles, on=keys, how="outer")
+
+
+def _pricing_catalog(pricing: PricingConfig) -> PricingCatalog:
+    sources = [*pricing.aws_offer_files, *pricing.gcp_sku_files]
+    built = pricing.catalog.stat().st_mtime_ns if pricing.catalog.exists() else None
+    if built is None or any(path.stat().st_mtime_ns > built for path in sources):
+        build_pricing_catalog(
+            pricing.catalog,
+            aws_offer_files=pricing.aws_offer_files,
+            gcp_sku_files=pricing.gcp_sku_files,
+        )
+    return PricingCatalog(pricing.catalog, cache_size=pricing.cache_size)
+
+
+def _write_tag_inference(out_path: Path, *, tags: TagInference, tag_coverage: TagCoverage) -> None:
+    recovered = tags.recovered()
+    by_key = recovered.groupby("key", sort=False)["recovered_cost_usd"].sum()
+    total = tag_coverage.total_cost_usd
+    coverage = {
+        key: {
+            "recovered_cost_usd": round(float(by_key[key]), 2),
+            "coverage_before": (
+                (tag_coverage.coverage_by_key[key] - by_key[key] / total) if total else 0.0
+            ),
+            "coverage_after": tag_coverage.coverage_by_key[key],
+            "by_source": {
+                r.source: r.recovered_cost_usd
+                for r in recovered[recovered["key"] == key].itertuples()
+            },
+        }
+        for key in tag_coverage.required_keys
+    }
+    out_path.write_text(
+        json.dumps({"coverage_by_key": coverage}, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
     )
 
 
-def _write_monthly_plan(out_path: Path, *, tag_coverage: TagCoverage) -> None:
+def _providers(data_dir: Path, ingestion: IngestionConfig) -> Providers:
+    store_cfg = ingestion.object_store
+    if store_cfg is None:
+        return Providers.from_data_dir(
+            data_dir,
+            billing_format=ingestion.billing_format,
+            max_workers=ingestion.max_workers,
+            decompression_threads=ingestion.decompression_threads,
+        )
+    store = LocalObjectStore(Path(store_cfg.root))
+    prefetcher = RangePrefetcher(
+        store,
+        max_concurrency=store_cfg.max_concurrency,
+        range_size=store_cfg.range_size_mb * MiB,
+        max_inflight_bytes=store_cfg.max_inflight_mb * MiB,
+    )
+    return providers_from_object_store(
+        store,
+        billing_format=ingestion.billing_format,
+        prefetcher=prefetcher,
+        decompression_threads=ingestion.decompression_threads,
+    )
+
+
+def _ingest_line_items(
+    con: duckdb.DuckDBPyConnection,
+    providers: Providers,
+    *,
+    invoice_month: str,
+    ingestion: IngestionConfig,
+    tags: TagInference | None = None,
+) -> LineItemRollups:
+    # Streaming, incremental runs and the duckdb engine never hold full detail in pandas, so
+    # they always compact.
+    compact_grain: RollupGrain = ingestion.rollup_grain or "month"
+    if ingestion.engine == "duckdb":
+        create_line_item_views(
+            con,
+            aws_billing=_local_provider(providers.aws).billing_parts(invoice_month=invoice_month),
+            gcp_billing=_local_provider(providers.gcp).billing_parts(invoice_month=invoice_month),
+            fmt=ingestion.billing_format,
+            invoice_month=invoice_month,
+        )
+        _create_line_item_table(con)
+        con.execute("insert into unified_line_items select * from line_items_v")
+        fetched = fetch_compacted_line_items(con, dimensions=grain_dimensions(compact_grain))
+        return LineItemRollups(conform(fetched, UNIFIED_LINE_ITEM_SCHEMA), grain=compact_grain)
+
+    if ingestion.incremental:
+        _sync_line_items(con, providers, invoice_month=invoice_month)
+        fetched = fetch_compacted_line_items(
+            con, dimensions=grain_dimensions(compact_grain), invoice_month=invoice_month
+        )
+        if fetched.empty:
+            raise ValueError("Billing inputs produced no line items")
+        return LineItemRollups(conform(fetched, UNIFIED_LINE_ITEM_SCHEMA), grain=compact_grain)
+
+    chunk_size = ingestion.chunk_size_rows
+    if chunk_size is None:
+        line_items = _load_line_items(providers, invoice_month=invoice_month, ingestion=ingestion)
+        if tags is not None:
+            line_items = tags.enrich(line_items)
+        _create_line_item_table(con)
+        con.register("line_items", line_items)
+        con.execute("insert into unified_line_items select * from line_items")
+        con.unregister("line_items")
+        if ingestion.rollup_grain is None:
+            return LineItemRollups(line_items, grain="line_item")
+        return LineItemRollups(
+            rollup_line_items(line_items, ingestion.rollup_grain), grain=ingestion.rollup_grain
+        )
+
+    # Streaming mode: every chunk is appended to DuckDB at full detail, while the analytics
+    # only keep a running compaction, so memory is bounded by the chunk size plus the number
+    # of distinct analytic dimension tuples rather than by the size of the billing files.
+    _create_line_item_table(con)
+    compacted: list[pd.DataFrame] = []
+    compacted_rows = 0
+    # Re-compact once the pending rows exceed twice the last compacted size (and at least a
+    # chunk), so the re-compaction work stays linear in the rows streamed.
+    recompact_at = chunk_size
+    for chunk in _stream_line_items(providers, chunk_size, invoice_month=invoice_month):
+        if tags is not None:
+            chunk = tags.enrich(chunk)
+        con.register("line_items_chunk", chunk)
+        con.execute("insert into unified_line_items select * from line_items_chunk")
+        con.unregister("line_items_chunk")
+
+        compacted.append(rollup_line_items(chunk, compact_grain))
+        compacted_rows += len(compacted[-1])
+        if compacted_rows > recompact_at and len(compacted) > 1:
+            compacted = [rollup_line_items(concat_frames(compacted), compact_grain)]
+            compacted_rows = len(compacted[0])
+            recompact_at = max(chunk_size, 2 * compacted_rows)
+    if not compacted:
+        raise ValueError("Billing inputs produced no line items")
+    return LineItemRollups(
+        rollup_line_items(concat_frames(compacted), compact_grain), grain=compact_grain
+    )
+
+
+def _load_line_items(
+    providers: Providers, *, invoice_month: str, ingestion: IngestionConfig
+) -> pd.DataFrame:
+    cache_cfg = ingestion.cache
+    # Only local deliveries can be content-hashed without fetching them first.
+    local = isinstance(providers.aws, MockProvider) and isinstance(providers.gcp, MockProvider)
+    if cache_cfg is None or not local:
+        return _normalize_line_items(providers, invoice_month=invoice_month)
+
+    cache = LineItemCache(Path(cache_cfg.dir), max_bytes=cache_cfg.max_size_mb * MiB)
+    key = cache_key(
+        {
+            "aws": _local_provider(providers.aws).billing_parts(invoice_month=invoice_month),
+            "gcp": _local_provider(providers.gcp).billing_parts(invoice_month=invoice_month),
+        },
+        schema=UNIFIED_LINE_ITEM_SCHEMA,
+        params={
+            "invoice_month": invoice_month,
+            "billing_format": ingestion.billing_format,
+            "normalization_version": NORMALIZATION_VERSION,
+        },
+    )
+    cached = cache.get(key, schema=UNIFIED_LINE_ITEM_SCHEMA)
+    if cached is not None:
+        return cached
+    line_items = _normalize_line_items(providers, invoice_month=invoice_month)
+    cache.put(key, line_items)
+    return line_items
+
+
+def _normalize_line_items(providers: Providers, *, invoice_month: str) -> pd.DataFrame:
+    aws_billing = normalize_aws_billing(providers.aws.billing(invoice_month=invoice_month))
+    gcp_billing = normalize_gcp_billing(providers.gcp.billing(invoice_month=invoice_month))
+    return unify_line_items([aws_billing, gcp_billing])
+
+
+def _create_line_item_table(con: duckdb.DuckDBPyConnection) -> None:
+    # Explicit column types: categoricals would otherwise become per-chunk ENUM types.
+    con.execute(
+        "create or replace table unified_line_items "
+        f"({UNIFIED_LINE_ITEM_SCHEMA.duckdb_columns()})"
+    )
+
+
+def _local_provider(provider: CloudProvider) -> MockProvider:
+    if not isinstance(provider, MockProvider):
+        raise ValueError(
+            "The duckdb engine and incremental ingestion only read billing files from data_dir"
+        )
+    return provider
+
+
+def _sync_line_items(
+    con: duckdb.DuckDBPyConnection, providers: Providers, *, invoice_month: str
+) -> None:
+    ensure_incremental_tables(con)
+    for provider in (_local_provider(providers.aws), _local_provider(providers.gcp)):
+        sync_line_item_parts(
+            con,
+            provider=provider.provider,
+            parts=provider.billing_parts(invoice_month=invoice_month),
+            invoice_month=invoice_month,
+            load_part=partial(_load_part, provider, invoice_month=invoice_month),
+        )
+
+
+def _load_part(provider: MockProvider, part: Path, *, invoice_month: str) -> pd.DataFrame:
+    raw = read_billing(
+        part,
+        fmt=provider.billing_format,
+        schema=BILLING_SCHEMAS[provider.provider],
+        invoice_month=invoice_month,
+    )
+    normalize = normalize_aws_billing if provider.provider == "aws" else normalize_gcp_billing
+    return unify_line_items([normalize(raw)])
+
+
+def _stream_line_items(
+    providers: Providers, chunk_size: int, *, invoice_month: str
+) -> Iterator[pd.DataFrame]:
+    for chunk in providers.aws.billing_chunks(chunk_size, invoice_month=invoice_month):
+        yield unify_line_items([normalize_aws_billing(chunk)])
+    for chunk in providers.gcp.billing_chunks(chunk_size, invoice_month=invoice_month):
+        yield unify_line_items([normalize_gcp_billing(chunk)])
+
+
+def _write_monthly_plan(
+    out_path: Path, *, tag_coverage: TagCoverage, forecast: pd.DataFrame | None = None
+) -> None:
     lines = [
         "# Monthly Optimization Plan (Anti Cost-Drift)",
         "",
@@ -159,4 +527,21 @@ def _write_monthly_plan(out_path: Path, *, tag_coverage: TagCoverage) -> None:
         "- Savings realized vs expected (from quick wins)",
         "",
     ]
+    if forecast is not None and not forecast.empty:
+        top = forecast.nlargest(5, "forecast_next_quarter_usd")
+        quarter = forecast["next_quarter"].iloc[0]
+        lines += [
+            f"## Spend outlook (as of {forecast['as_of'].iloc[0]})",
+            f"- Projected month-end spend: **${forecast['forecast_month_usd'].sum():,.0f}**",
+            f"- Projected {quarter} spend: **${forecast['forecast_next_quarter_usd'].sum():,.0f}**",
+            "",
+            f"| Provider | Account | Service | Projected {quarter} |",
+            "|---|---|---|---:|",
+            *(
+                f"| {r.provider} | {r.account} | {r.service} | "
+                f"${r.forecast_next_quarter_usd:,.0f} |"
+                for r in top.itertuples()
+            ),
+            "",
+        ]
     out_path.write_text("\n".join(lines), encoding="utf-8")
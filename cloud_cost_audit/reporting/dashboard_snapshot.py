@@ -23,7 +23,7 @@ def generate_static_dashboard_snapshot(
         x="expected_savings_monthly_usd",
         y="title",
         orientation="h",
-        title="Top 10 quick wins (expected monthly savings)",
+        title=f"Top {len(quick_wins)} quick wins (expected monthly savings)",
     )
     fig_wins.update_layout(height=520, margin=dict(l=10, r=10, t=60, b=10))
 
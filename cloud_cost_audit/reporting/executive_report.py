@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 
+import pandas as pd
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from cloud_cost_audit.analytics.metrics import TagCoverage
@@ -15,11 +16,14 @@ class ExecutiveReportInputs:
     baseline_cost_usd: float
     quick_wins: list[QuickWin]
     tag_coverage: TagCoverage
+    # Recorded daily spend spikes (see analytics.anomalies); None when not configured.
+    anomalies: pd.DataFrame | None = None
 
 
 def render_executive_report(
     *, inputs: ExecutiveReportInputs, template_dir: Path, out_html: Path, out_md: Path
 ) -> None:
+    anomalies = _anomaly_rows(inputs.anomalies)
     savings_total = sum(q.expected_savings_monthly_usd for q in inputs.quick_wins)
     savings_pct = (
         (savings_total / inputs.baseline_cost_usd * 100.0) if inputs.baseline_cost_usd else 0.0
@@ -39,6 +43,7 @@ def render_executive_report(
         required_keys=", ".join(inputs.tag_coverage.required_keys),
         fully_allocated_pct=round(inputs.tag_coverage.fully_allocated_pct * 100.0, 1),
         coverage_by_key=inputs.tag_coverage.coverage_by_key,
+        anomalies=anomalies,
     )
     out_html.write_text(html, encoding="utf-8")
 
@@ -47,10 +52,10 @@ def render_executive_report(
         "# Cloud Cost Audit — Executive Report",
         f"- Invoice month: **{inputs.invoice_month}**",
         f"- Baseline spend (monthly): **${inputs.baseline_cost_usd:,.0f}**",
-        f"- Top-10 quick wins savings: **${savings_total:,.0f}**",
+        f"- Top-{len(inputs.quick_wins)} quick wins savings: **${savings_total:,.0f}**",
         f"- Estimated savings rate: **{savings_pct:.1f}%**",
         "",
-        "## Top 10 Quick Wins",
+        f"## Top {len(inputs.quick_wins)} Quick Wins",
         "",
         "| # | Quick win | Scope | Expected monthly savings | Confidence | Risk | Effort |",
         "|---:|---|---|---:|---|---|---|",
@@ -60,6 +65,19 @@ def render_executive_report(
             f"| {q.rank} | {q.title} | {q.scope} | "
             f"${q.expected_savings_monthly_usd:,.0f} | {q.confidence} | {q.risk} | {q.effort} |"
         )
+    if anomalies:
+        md_lines += [
+            "",
+            "## Cost anomalies",
+            "",
+            "| Day | Scope | Team | Spend | Expected | z-score |",
+            "|---|---|---|---:|---:|---:|",
+        ]
+        for a in anomalies:
+            md_lines.append(
+                f"| {a['day']} | {a['scope']} | {a['team']} | ${a['cost_usd']:,.0f} | "
+                f"${a['expected_usd']:,.0f} | {a['zscore']:.1f} |"
+            )
     md_lines += [
         "",
         "## Cost allocation readiness (tags / labels)",
@@ -71,3 +89,19 @@ def render_executive_report(
     for k, v in inputs.tag_coverage.coverage_by_key.items():
         md_lines.append(f"| {k} | {v*100.0:.1f}% |")
     out_md.write_text("\n".join(md_lines) + "\n", encoding="utf-8")
+
+
+def _anomaly_rows(anomalies: pd.DataFrame | None) -> list[dict[str, object]]:
+    if anomalies is None or anomalies.empty:
+        return []
+    return [
+        {
+            "day": pd.Timestamp(r.usage_day).date().isoformat(),
+            "scope": f"{r.provider}:{r.account}:{r.service}",
+            "team": r.team or "—",
+            "cost_usd": float(r.cost_usd),
+            "expected_usd": float(r.expected_usd),
+            "zscore": float(r.zscore),
+        }
+        for r in anomalies.itertuples()
+    ]
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pyarrow.dataset as ds
+
+from cloud_cost_audit.io.billing_readers import BillingFormat
+from cloud_cost_audit.transforms.normalize import (
+    ANALYTIC_DIMENSIONS,
+    REQUIRED_AWS_COLUMNS,
+    REQUIRED_GCP_COLUMNS,
+)
+
+# SQL counterparts of normalize_aws_billing / normalize_gcp_billing. Both produce the unified
+# line-item schema in the same column order, so the union can be persisted as-is.
+_AWS_LINE_ITEMS_SQL = """
+select
+    'aws' as provider,
+    cast(account_id as varchar) as account,
+    '' as project,
+    cast(region as varchar) as region,
+    cast(service as varchar) as service,
+    cast(usage_type as varchar) as sku,
+    cast(operation as varchar) as operation,
+    cast(resource_id as varchar) as resource_id,
+    coalesce(cast(tag_env as varchar), '') as env,
+    coalesce(cast(tag_app as varchar), '') as app,
+    coalesce(cast(tag_team as varchar), '') as team,
+    coalesce(cast(tag_cost_center as varchar), '') as cost_center,
+    cast(cost_usd as double) as cost_usd,
+    cast(usage_amount as double) as usage_amount,
+    cast(pricing_unit as varchar) as unit,
+    cast(line_item_type as varchar) as line_item_type,
+    cast(invoice_month as varchar) as invoice_month,
+    cast(usage_start_time as timestamp) as usage_start_time,
+    cast(usage_end_time as timestamp) as usage_end_time,
+    date_trunc('hour', cast(usage_start_time as timestamp)) as usage_hour,
+    date_trunc('day', cast(usage_start_time as timestamp)) as usage_day
+from {source}
+"""
+
+_GCP_LINE_ITEMS_SQL = """
+select
+    'gcp' as provider,
+    cast(billing_account_id as varchar) as account,
+    cast(project_id as varchar) as project,
+    cast(location as varchar) as region,
+    cast(service_description as varchar) as service,
+    cast(sku_description as varchar) as sku,
+    '' as operation,
+    '' as resource_id,
+    coalesce(cast(label_env as varchar), '') as env,
+    coalesce(cast(label_app as varchar), '') as app,
+    coalesce(cast(label_team as varchar), '') as team,
+    coalesce(cast(label_cost_center as varchar), '') as cost_center,
+    greatest(cast(cost_usd as double) - cast(credits_usd as double), 0.0) as cost_usd,
+    cast(usage_amount as double) as usage_amount,
+    cast(usage_unit as varchar) as unit,
+    'Usage' as line_item_type,
+    cast(invoice_month as varchar) as invoice_month,
+    cast(usage_start_time as timestamp) as usage_start_time,
+    cast(usage_end_time as timestamp) as usage_end_time,
+    date_trunc('hour', cast(usage_start_time as timestamp)) as usage_hour,
+    date_trunc('day', cast(usage_start_time as timestamp)) as usage_day
+from {source}
+"""
+
+
+def create_line_item_views(
+    con: duckdb.DuckDBPyConnection,
+    *,
+    aws_billing: Sequence[Path],
+    gcp_billing: Sequence[Path],
+    fmt: BillingFormat,
+    invoice_month: str | None = None,
+) -> None:
+    """Create temp views ``aws_line_items``, ``gcp_line_items`` and ``line_items_v``.
+
+    DuckDB scans the raw billing files itself, so normalization runs on its parallel reader
+    and the unified frame is never built in pandas.
+    """
+    aws_source = _billing_source(con, aws_billing, fmt, name="aws_billing_raw")
+    gcp_source = _billing_source(con, gcp_billing, fmt, name="gcp_billing_raw")
+    _validate_source_columns(con, aws_source, REQUIRED_AWS_COLUMNS, name="AWS billing input")
+    _validate_source_columns(con, gcp_source, REQUIRED_GCP_COLUMNS, name="GCP billing input")
+
+    where = "" if invoice_month is None else f"where invoice_month = {_sql_literal(invoice_month)}"
+    con.execute(
+        "create or replace temp view aws_line_items as "
+        + _AWS_LINE_ITEMS_SQL.format(source=aws_source)
+        + where
+    )
+    con.execute(
+        "create or replace temp view gcp_line_items as "
+        + _GCP_LINE_ITEMS_SQL.format(source=gcp_source)
+        + where
+    )
+    con.execute(
+        "create or replace temp view line_items_v as "
+        "select * from aws_line_items union all select * from gcp_line_items"
+    )
+
+
+# First day and ceiling-to-midnight end of each row's usage window.
+_DAY_BOUNDS_SQL = """
+select
+    *,
+    cast(date_trunc('day', cast(usage_start_time as timestamp)) as timestamp) as start_day,
+    cast(date_trunc('day', cast(usage_end_time as timestamp) - interval 1 microsecond)
+        as timestamp) + interval 1 day as end_day
+from {source}
+"""
+
+# Rows spanning several days become one row per day (see rollup.usage_day_spans).
+_DAY_SPLIT_SQL = """
+select
+    * exclude (usage_day, cost_usd, usage_amount, start_day, end_day, spans),
+    unnest(range(start_day, start_day + spans * interval 1 day, interval 1 day)) as usage_day,
+    cost_usd / spans as cost_usd,
+    usage_amount / spans as usage_amount
+from (
+    select *, greatest(coalesce(datediff('day', start_day, end_day), 1), 1) as spans
+    from ({bounds})
+)
+"""
+
+# Latest first day among rows spanning at most one day, else the last day any window covers
+# (see rollup.last_usage_day).
+_LAST_USAGE_DAY_SQL = """
+select coalesce(
+    max(start_day) filter (where end_day <= start_day + interval 1 day),
+    max(end_day) - interval 1 day
+)
+from (
+    select start_day, coalesce(end_day, start_day + interval 1 day) as end_day
+    from ({bounds})
+)
+"""
+
+
+def fetch_last_usage_day(
+    con: duckdb.DuckDBPyConnection,
+    table: str = "unified_line_items",
+    *,
+    invoice_month: str | None = None,
+) -> pd.Timestamp | None:
+    """``rollup.last_usage_day`` of a line-item table, computed inside DuckDB."""
+    where = "" if invoice_month is None else f"where invoice_month = {_sql_literal(invoice_month)} "
+    source = f"(select * from {table} {where})"
+    bounds = _DAY_BOUNDS_SQL.format(source=source)
+    row = con.execute(_LAST_USAGE_DAY_SQL.format(bounds=bounds)).fetchone()
+    return None if row is None or row[0] is None else pd.Timestamp(row[0])
+
+
+def fetch_compacted_line_items(
+    con: duckdb.DuckDBPyConnection,
+    table: str = "unified_line_items",
+    *,
+    dimensions: Sequence[str] = tuple(ANALYTIC_DIMENSIONS),
+    invoice_month: str | None = None,
+) -> pd.DataFrame:
+    """Aggregate a line-item table over the analytic dimensions inside DuckDB.
+
+    With ``usage_day`` among the dimensions, rows are split evenly across the days of their
+    usage window, as ``rollup_line_items`` does for day grain.
+    """
+    dims = ", ".join(dimensions)
+    where = "" if invoice_month is None else f"where invoice_month = {_sql_literal(invoice_month)} "
+    source = f"(select * from {table} {where})"
+    if "usage_day" in dimensions:
+        source = f"({_DAY_SPLIT_SQL.format(bounds=_DAY_BOUNDS_SQL.format(source=source))})"
+    return con.execute(
+        f"select {dims}, sum(cost_usd) as cost_usd, sum(usage_amount) as usage_amount "
+        f"from {source} group by {dims} order by {dims}"
+    ).df()
+
+
+def _billing_source(
+    con: duckdb.DuckDBPyConnection, paths: Sequence[Path], fmt: BillingFormat, *, name: str
+) -> str:
+    files = "[" + ", ".join(_sql_literal(str(p)) for p in paths) + "]"
+    if fmt == "csv":
+        # DuckDB decompresses .gz/.zst parts itself while scanning, but has no bz2 codec.
+        if any(p.suffix == ".bz2" for p in paths):
+            raise ValueError("The duckdb ingestion engine cannot read bz2 billing parts")
+        # all_varchar keeps ids byte-identical to the pandas path; timestamps are cast explicitly.
+        return f"read_csv({files}, header = true, all_varchar = true)"
+    if fmt == "parquet":
+        return f"read_parquet({files})"
+    # DuckDB has no built-in Arrow IPC reader; scan the files through a registered dataset.
+    con.register(name, ds.dataset([str(p) for p in paths], format="ipc"))
+    return name
+
+
+def _validate_source_columns(
+    con: duckdb.DuckDBPyConnection, source: str, required: set[str], *, name: str
+) -> None:
+    columns = {row[0] for row in con.execute(f"describe select * from {source}").fetchall()}
+    missing = sorted(required - columns)
+    if missing:
+        raise ValueError(f"{name} is missing required columns: {missing}")
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
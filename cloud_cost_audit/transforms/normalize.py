@@ -1,48 +1,27 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 
 import pandas as pd
 
-REQUIRED_AWS_COLUMNS = {
-    "account_id",
-    "payer_account_id",
-    "region",
-    "service",
-    "usage_type",
-    "operation",
-    "resource_id",
-    "tag_env",
-    "tag_app",
-    "tag_team",
-    "tag_cost_center",
-    "cost_usd",
-    "usage_amount",
-    "pricing_unit",
-    "line_item_type",
-    "invoice_month",
-    "usage_start_time",
-    "usage_end_time",
-}
-
-REQUIRED_GCP_COLUMNS = {
-    "billing_account_id",
-    "project_id",
-    "location",
-    "service_description",
-    "sku_description",
-    "label_env",
-    "label_app",
-    "label_team",
-    "label_cost_center",
-    "cost_usd",
-    "credits_usd",
-    "usage_amount",
-    "usage_unit",
-    "invoice_month",
-    "usage_start_time",
-    "usage_end_time",
-}
+from cloud_cost_audit.models.schema import (
+    AWS_BILLING_SCHEMA,
+    GCP_BILLING_SCHEMA,
+    UNIFIED_LINE_ITEM_SCHEMA,
+    as_category,
+    concat_frames,
+    conform,
+    conforms,
+    constant_category,
+    parse_timestamps,
+)
+
+# Bump whenever normalization output changes for identical inputs; part of the cache key.
+NORMALIZATION_VERSION = "2"
+
+REQUIRED_AWS_COLUMNS = set(AWS_BILLING_SCHEMA.columns)
+
+REQUIRED_GCP_COLUMNS = set(GCP_BILLING_SCHEMA.columns)
 
 
 def _validate_columns(df: pd.DataFrame, required: set[str], *, name: str) -> None:
@@ -55,25 +34,24 @@ def normalize_aws_billing(df: pd.DataFrame) -> pd.DataFrame:
     _validate_columns(df, REQUIRED_AWS_COLUMNS, name="AWS billing input")
     out = pd.DataFrame(
         {
-            "provider": "aws",
-            "account": df["account_id"].astype(str),
-            "project": "",
-            "region": df["region"].astype(str),
-            "service": df["service"].astype(str),
-            "sku": df["usage_type"].astype(str),
-            "operation": df["operation"].astype(str),
+            "provider": constant_category("aws", len(df)),
+            "account": as_category(df["account_id"]),
+            "project": constant_category("", len(df)),
+            "region": as_category(df["region"]),
+            "service": as_category(df["service"]),
+            "sku": as_category(df["usage_type"]),
+            "operation": as_category(df["operation"]),
             "resource_id": df["resource_id"].astype(str),
-            "env": df["tag_env"].fillna("").astype(str),
-            "app": df["tag_app"].fillna("").astype(str),
-            "team": df["tag_team"].fillna("").astype(str),
-            "cost_center": df["tag_cost_center"].fillna("").astype(str),
+            "env": as_category(df["tag_env"]),
+            "app": as_category(df["tag_app"]),
+            "team": as_category(df["tag_team"]),
+            "cost_center": as_category(df["tag_cost_center"]),
             "cost_usd": df["cost_usd"].astype(float),
             "usage_amount": df["usage_amount"].astype(float),
-            "unit": df["pricing_unit"].astype(str),
-            "line_item_type": df["line_item_type"].astype(str),
-            "invoice_month": df["invoice_month"].astype(str),
-            "usage_start_time": df["usage_start_time"].astype(str),
-            "usage_end_time": df["usage_end_time"].astype(str),
+            "unit": as_category(df["pricing_unit"]),
+            "line_item_type": as_category(df["line_item_type"]),
+            "invoice_month": as_category(df["invoice_month"]),
+            **_usage_times(df),
         }
     )
     return out
@@ -84,33 +62,70 @@ def normalize_gcp_billing(df: pd.DataFrame) -> pd.DataFrame:
     net_cost = (df["cost_usd"].astype(float) - df["credits_usd"].astype(float)).clip(lower=0.0)
     out = pd.DataFrame(
         {
-            "provider": "gcp",
-            "account": df["billing_account_id"].astype(str),
-            "project": df["project_id"].astype(str),
-            "region": df["location"].astype(str),
-            "service": df["service_description"].astype(str),
-            "sku": df["sku_description"].astype(str),
-            "operation": "",
+            "provider": constant_category("gcp", len(df)),
+            "account": as_category(df["billing_account_id"]),
+            "project": as_category(df["project_id"]),
+            "region": as_category(df["location"]),
+            "service": as_category(df["service_description"]),
+            "sku": as_category(df["sku_description"]),
+            "operation": constant_category("", len(df)),
             "resource_id": "",
-            "env": df["label_env"].fillna("").astype(str),
-            "app": df["label_app"].fillna("").astype(str),
-            "team": df["label_team"].fillna("").astype(str),
-            "cost_center": df["label_cost_center"].fillna("").astype(str),
+            "env": as_category(df["label_env"]),
+            "app": as_category(df["label_app"]),
+            "team": as_category(df["label_team"]),
+            "cost_center": as_category(df["label_cost_center"]),
             "cost_usd": net_cost.astype(float),
             "usage_amount": df["usage_amount"].astype(float),
-            "unit": df["usage_unit"].astype(str),
-            "line_item_type": "Usage",
-            "invoice_month": df["invoice_month"].astype(str),
-            "usage_start_time": df["usage_start_time"].astype(str),
-            "usage_end_time": df["usage_end_time"].astype(str),
+            "unit": as_category(df["usage_unit"]),
+            "line_item_type": constant_category("Usage", len(df)),
+            "invoice_month": as_category(df["invoice_month"]),
+            **_usage_times(df),
         }
     )
     return out
 
 
+def _usage_times(df: pd.DataFrame) -> dict[str, pd.Series]:
+    start = parse_timestamps(df["usage_start_time"])
+    return {
+        "usage_start_time": start,
+        "usage_end_time": parse_timestamps(df["usage_end_time"]),
+        "usage_hour": start.dt.floor("h"),
+        "usage_day": start.dt.floor("D"),
+    }
+
+
 def unify_line_items(parts: Iterable[pd.DataFrame]) -> pd.DataFrame:
-    df = pd.concat(list(parts), ignore_index=True)
-    # Normalize blanks to empty strings for allocation keys.
-    for col in ["env", "app", "team", "cost_center"]:
-        df[col] = df[col].fillna("").astype(str)
-    return df
+    # Parts from the normalizers above already conform and are concatenated as-is; others are
+    # cast first (conform() also normalizes blank allocation keys to ""). Categorical
+    # dictionaries are unioned across parts.
+    schema = UNIFIED_LINE_ITEM_SCHEMA
+    conformed = [part if conforms(part, schema) else conform(part, schema) for part in parts]
+    return concat_frames(conformed)
+
+
+# Columns the analytics group or filter on; everything else is per-row detail that only the
+# persisted line-item table needs.
+ANALYTIC_DIMENSIONS = [
+    "provider",
+    "account",
+    "project",
+    "region",
+    "service",
+    "sku",
+    "env",
+    "app",
+    "team",
+    "cost_center",
+    "unit",
+    "line_item_type",
+    "invoice_month",
+]
+
+
+def compact_line_items(
+    df: pd.DataFrame, dimensions: Sequence[str] = tuple(ANALYTIC_DIMENSIONS)
+) -> pd.DataFrame:
+    return df.groupby(list(dimensions), as_index=False, sort=False, dropna=False, observed=True)[
+        ["cost_usd", "usage_amount"]
+    ].sum()
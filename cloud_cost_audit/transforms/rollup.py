@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, Literal, TypeVar
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from cloud_cost_audit.transforms.normalize import ANALYTIC_DIMENSIONS, compact_line_items
+
+# Line-item grains, finest first. "line_item" is the unified frame as normalized (hourly rows
+# with resource ids); "day" and "month" sum cost/usage over the analytic dimensions. Day
+# rollups split rows whose usage window spans several days evenly across those days.
+Grain = Literal["line_item", "day", "month"]
+RollupGrain = Literal["day", "month"]
+
+_GRAIN_ORDER: dict[str, int] = {"line_item": 0, "day": 1, "month": 2}
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+_DECLARED_GRAINS: dict[Callable[..., Any], Grain] = {}
+
+
+def grain_dimensions(grain: RollupGrain) -> list[str]:
+    # invoice_month is already an analytic dimension, so month grain needs no time bucket.
+    return [*ANALYTIC_DIMENSIONS, "usage_day"] if grain == "day" else list(ANALYTIC_DIMENSIONS)
+
+
+def usage_day_spans(line_items: pd.DataFrame) -> tuple[pd.Series, npt.NDArray[np.int64]]:
+    """First day and number of days each row's usage window touches.
+
+    Rows without a usage window (already at day grain) cover their ``usage_day`` only.
+    """
+    if not {"usage_start_time", "usage_end_time"} <= set(line_items.columns):
+        return line_items["usage_day"], np.ones(len(line_items), dtype=np.int64)
+    start = line_items["usage_start_time"].dt.floor("D")
+    end = line_items["usage_end_time"].dt.ceil("D")
+    spans = ((end - start) // pd.Timedelta(days=1)).fillna(1).to_numpy(dtype=np.int64)
+    return start, np.maximum(spans, 1)
+
+
+def last_usage_day(line_items: pd.DataFrame) -> pd.Timestamp:
+    """Last day with metered usage: the latest day of rows whose window fits in one day.
+
+    Monthly and fee rows cover days that have not happened yet on a mid-month run, so they
+    only decide it when nothing shorter was billed.
+    """
+    start, spans = usage_day_spans(line_items)
+    metered = spans == 1
+    if metered.any():
+        return start[metered].max()
+    return (start + pd.to_timedelta(spans - 1, unit="D")).max()
+
+
+def split_across_days(line_items: pd.DataFrame) -> pd.DataFrame:
+    """One row per day of each row's usage window, with cost and usage split evenly."""
+    start, spans = usage_day_spans(line_items)
+    if (spans == 1).all():
+        return line_items
+    rows = np.repeat(np.arange(len(line_items)), spans)
+    offset = np.arange(len(rows)) - np.repeat(np.cumsum(spans) - spans, spans)
+    out = line_items.iloc[rows].reset_index(drop=True)
+    out["usage_day"] = start.to_numpy()[rows] + offset * np.timedelta64(1, "D")
+    for column in ("cost_usd", "usage_amount"):
+        if column in out.columns:
+            out[column] = out[column].to_numpy(dtype=float) / spans[rows]
+    return out
+
+
+def rollup_line_items(line_items: pd.DataFrame, grain: Grain) -> pd.DataFrame:
+    if grain == "line_item":
+        return line_items
+    dimensions = grain_dimensions(grain)
+    if grain == "day":
+        windows = [c for c in ("usage_start_time", "usage_end_time") if c in line_items]
+        line_items = split_across_days(
+            line_items[[*dimensions, "cost_usd", "usage_amount", *windows]]
+        )
+    return compact_line_items(line_items, dimensions=dimensions)
+
+
+def requires_grain(grain: Grain) -> Callable[[_F], _F]:
+    """Declare the coarsest line-item grain a detector still produces correct results at."""
+
+    def register(fn: _F) -> _F:
+        _DECLARED_GRAINS[fn] = grain
+        return fn
+
+    return register
+
+
+def required_grain(fn: Callable[..., Any]) -> Grain:
+    # Undeclared consumers get full detail.
+    return _DECLARED_GRAINS.get(fn, "line_item")
+
+
+class LineItemRollups:
+    """Line items at ``grain`` plus memoized coarser rollups derived from them."""
+
+    def __init__(self, line_items: pd.DataFrame, *, grain: Grain) -> None:
+        self.grain = grain
+        self._frames: dict[Grain, pd.DataFrame] = {grain: line_items}
+
+    def at(self, grain: Grain) -> pd.DataFrame:
+        frame = self._frames.get(grain)
+        if frame is not None:
+            return frame
+        if _GRAIN_ORDER[grain] < _GRAIN_ORDER[self.grain]:
+            raise ValueError(
+                f"Line items were rolled up to {self.grain} grain; {grain} detail is unavailable"
+            )
+        frame = self._frames[grain] = rollup_line_items(self._frames[self.grain], grain)
+        return frame
+
+    def for_consumer(self, fn: Callable[..., Any]) -> pd.DataFrame:
+        return self.at(required_grain(fn))
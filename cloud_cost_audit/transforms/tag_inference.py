@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from cloud_cost_audit.models.schema import as_category, has_value
+
+ALLOCATION_KEYS = ("env", "app", "team", "cost_center")
+
+# Line-item column each source is joined on (with provider), in order of precedence.
+INFERENCE_SOURCES = {"resource": "resource_id", "project": "project", "account": "account"}
+
+
+class _KeyIndex:
+    """Unique (provider, id) hash index with the allocation key values of each entry."""
+
+    def __init__(self, frame: pd.DataFrame, column: str, keys: Sequence[str]) -> None:
+        self.column = column
+        frame = frame[has_value(frame[column])].drop_duplicates(["provider", column], keep="last")
+        self.index = pd.MultiIndex.from_frame(frame[["provider", column]].astype(str))
+        # One trailing "" so rows without a match (position -1) read a blank.
+        self.values = {
+            key: np.append(
+                frame[key].astype(object).where(has_value(frame[key]), "").to_numpy(), ""
+            )
+            if key in frame.columns
+            else np.array([""], dtype=object)
+            for key in keys
+        }
+
+    def positions(self, line_items: pd.DataFrame) -> npt.NDArray[np.int64]:
+        """Matching entry per line item, or -1; each distinct (provider, id) is hashed once."""
+        grouped = line_items.groupby(
+            ["provider", self.column], observed=True, sort=False, dropna=False
+        )
+        codes = grouped.ngroup().to_numpy()
+        _, first = np.unique(codes, return_index=True)
+        distinct = line_items[["provider", self.column]].iloc[first].astype(str)
+        found = self.index.get_indexer(pd.MultiIndex.from_frame(distinct))
+        positions: npt.NDArray[np.int64] = found[codes]
+        return positions
+
+
+class TagInference:
+    """Back-fill blank allocation keys of normalized line items from ownership sources.
+
+    Indexes are built once per run: ``inventory`` by (provider, resource_id), and the
+    optional ``ownership`` map by (provider, project) for rows with a ``project`` and
+    (provider, account) otherwise; a map may carry either column or both. A blank key takes
+    the first non-blank value from the resource, then the project, then the account; tagged
+    values are never overwritten.
+    Each chunk costs one hash lookup per distinct id plus a linear pass over its rows.
+    Cost whose keys were filled is accumulated per key and source across ``enrich`` calls.
+    """
+
+    def __init__(
+        self,
+        inventory: pd.DataFrame,
+        ownership: pd.DataFrame | None = None,
+        *,
+        keys: Sequence[str] = ALLOCATION_KEYS,
+    ) -> None:
+        self.keys = list(keys)
+        self._indexes = {"resource": _KeyIndex(inventory, "resource_id", self.keys)}
+        if ownership is not None:
+            if not {"project", "account"} & set(ownership.columns):
+                raise ValueError("Ownership map needs an account or project column")
+            by_project = np.zeros(len(ownership), dtype=bool)
+            if "project" in ownership.columns:
+                by_project = has_value(ownership["project"])
+                self._indexes["project"] = _KeyIndex(ownership[by_project], "project", self.keys)
+            if "account" in ownership.columns:
+                self._indexes["account"] = _KeyIndex(ownership[~by_project], "account", self.keys)
+        self._recovered = np.zeros((len(self.keys), len(INFERENCE_SOURCES)))
+
+    def enrich(self, line_items: pd.DataFrame) -> pd.DataFrame:
+        positions = {source: index.positions(line_items) for source, index in self._indexes.items()}
+        cost = line_items["cost_usd"].to_numpy(dtype=float)
+        # Shallow: only the filled columns are replaced, the rest share ``line_items`` data.
+        out = line_items.copy(deep=False)
+        for k, key in enumerate(self.keys):
+            current = line_items[key]
+            missing = ~has_value(current)
+            if not missing.any():
+                continue
+            values = current.astype(object).to_numpy(copy=True)
+            for s, source in enumerate(INFERENCE_SOURCES):
+                if source not in positions:
+                    continue
+                candidate = self._indexes[source].values[key][positions[source]]
+                fill = missing & (candidate != "")
+                values[fill] = candidate[fill]
+                self._recovered[k, s] += float(cost[fill].sum())
+                missing &= ~fill
+            out[key] = as_category(pd.Series(values, index=line_items.index))
+        return out
+
+    def recovered(self) -> pd.DataFrame:
+        """Cost (USD) whose ``key`` was filled from each ``source`` so far."""
+        return pd.DataFrame(
+            [
+                (key, source, round(float(self._recovered[k, s]), 2))
+                for k, key in enumerate(self.keys)
+                for s, source in enumerate(INFERENCE_SOURCES)
+            ],
+            columns=["key", "source", "recovered_cost_usd"],
+        )
@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+# Dependency-free unit constants shared across io and analytics modules.
+
+MiB = 1024 * 1024
+
+# Average hours in a month, for turning hourly rates into monthly figures.
+HOURS_PER_MONTH = 730.0
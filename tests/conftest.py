@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from cloud_cost_audit.config import AuditConfig
+from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
+from cloud_cost_audit.pipeline import run_audit
+
+AuditConfigFactory = Callable[..., AuditConfig]
+
+
+@pytest.fixture
+def audit_config(tmp_path: Path) -> AuditConfigFactory:
+    """Factory for configs over synthetic 2026-01 inputs generated under ``tmp_path/data``.
+
+    Keyword arguments override top-level config keys; mapping values (``thresholds``,
+    ``ingestion``, ...) are merged into the defaults one level deep.
+    """
+    ensure_synthetic_inputs(data_dir=tmp_path / "data", invoice_month="2026-01")
+
+    def make(**overrides: Any) -> AuditConfig:
+        cfg: dict[str, Any] = {
+            "invoice_month": "2026-01",
+            "data_dir": str(tmp_path / "data"),
+            "output_dir": str(tmp_path / "out"),
+            "duckdb_path": str(tmp_path / "out" / "audit.duckdb"),
+            "required_allocation_keys": ["env", "app", "team", "cost_center"],
+            "thresholds": {"underutilized_cpu_pct": 10.0, "min_compute_cost_usd": 150.0},
+        }
+        for key, value in overrides.items():
+            base = cfg.get(key)
+            cfg[key] = base | value if isinstance(base, dict) and isinstance(value, dict) else value
+        return AuditConfig.model_validate(cfg)
+
+    return make
+
+
+@pytest.fixture
+def assert_rejects_month_grain(audit_config: AuditConfigFactory) -> Callable[..., None]:
+    """Check that a run with ``overrides`` refuses line items rolled up to month grain."""
+
+    def check(**overrides: Any) -> None:
+        ingestion = {**overrides.pop("ingestion", {}), "rollup_grain": "month"}
+        with pytest.raises(ValueError, match="rolled up to month grain"):
+            run_audit(config=audit_config(ingestion=ingestion, **overrides))
+
+    return check
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from cloud_cost_audit.analytics.allocation import UNALLOCATED_OWNER, allocate_shared_costs
+from cloud_cost_audit.config import AllocationConfig, AuditConfig
+from cloud_cost_audit.pipeline import run_audit
+
+
+def test_shared_pools_follow_tagged_spend_within_scope() -> None:
+    items = pd.DataFrame(
+        {
+            "provider": ["aws"] * 5 + ["gcp"] * 2,
+            "account": ["a1", "a1", "a1", "a1", "a2", "p1", "p1"],
+            "service": ["ec2", "ec2", "ec2", "AWS Support", "ec2", "gce", "gce"],
+            "team": ["web", "data", "", "web", "", "", ""],
+            "cost_usd": [300.0, 100.0, 40.0, 60.0, 50.0, 10.0, 20.0],
+            "usage_amount": [1.0, 3.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+        }
+    )
+
+    out = allocate_shared_costs(items, shared_services=["AWS Support"]).set_index("team")
+
+    # a1's pool (40 untagged + 60 support) splits 3:1; a2 and p1 have no tagged spend and
+    # follow the bill-wide 3:1 split.
+    assert out.loc["web", "direct_cost_usd"] == 300.0
+    assert out.loc["web", "shared_cost_usd"] == pytest.approx(75.0 + 0.75 * 80.0)
+    assert out.loc["data", "shared_cost_usd"] == pytest.approx(25.0 + 0.25 * 80.0)
+    assert out["total_cost_usd"].sum() == pytest.approx(items["cost_usd"].sum())
+    assert list(out.index) == ["web", "data"]
+
+    by_usage = allocate_shared_costs(items, driver="usage").set_index("team")
+    assert by_usage.loc["data", "shared_cost_usd"] == pytest.approx(0.75 * 120.0)
+
+    fixed = allocate_shared_costs(
+        items, driver="fixed", weights={"web": 1.0, "platform": 3.0}
+    ).set_index("team")
+    assert fixed.loc["platform", "direct_cost_usd"] == 0.0
+    assert fixed.loc["platform", "shared_cost_usd"] == pytest.approx(0.75 * 120.0)
+
+
+def test_untagged_bill_is_reported_unallocated() -> None:
+    items = pd.DataFrame(
+        {
+            "provider": "aws",
+            "account": ["a1", "a2", "a3"],
+            "service": "ec2",
+            # Whitespace-only and missing owners are as untagged as empty ones.
+            "team": ["", "  ", None],
+            "cost_usd": [5.0, 7.0, 3.0],
+            "usage_amount": 1.0,
+        }
+    )
+    out = allocate_shared_costs(items)
+    assert allocate_shared_costs(items.astype({"team": "category"})).equals(out)
+    assert out.to_dict("records") == [
+        {
+            "team": UNALLOCATED_OWNER,
+            "direct_cost_usd": 0.0,
+            "shared_cost_usd": 15.0,
+            "total_cost_usd": 15.0,
+        }
+    ]
+
+
+def test_allocation_scales_with_many_owners() -> None:
+    rng = np.random.default_rng(3)
+    n = 500_000
+    teams = np.array([f"team-{i}" for i in range(2_000)] + [""], dtype=object)
+    items = pd.DataFrame(
+        {
+            "provider": "aws",
+            "account": rng.integers(0, 300, n).astype(str),
+            "service": "ec2",
+            "team": teams[rng.integers(0, len(teams), n)],
+            "cost_usd": rng.random(n),
+            "usage_amount": rng.random(n),
+        }
+    )
+    out = allocate_shared_costs(items)
+    assert len(out) == 2_000
+    # Totals are rounded to cents per owner.
+    assert out["total_cost_usd"].sum() == pytest.approx(items["cost_usd"].sum(), abs=0.005 * 2_000)
+
+
+def test_allocation_config_and_stage(
+    tmp_path: Path, audit_config: Callable[..., AuditConfig]
+) -> None:
+    with pytest.raises(ValidationError, match="requires non-negative owner weights"):
+        AllocationConfig(driver="fixed")
+    with pytest.raises(ValidationError, match="Unknown allocation scope"):
+        AllocationConfig(scope=["resource_id"])
+
+    result = run_audit(config=audit_config(allocation={"key": "cost_center"}))
+
+    allocated = pd.read_csv(tmp_path / "out" / "allocated_cost.csv")
+    assert "cost_center" in allocated.columns
+    assert allocated["total_cost_usd"].sum() == pytest.approx(result.baseline_cost_usd, abs=0.5)
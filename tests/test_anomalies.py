@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from cloud_cost_audit.analytics.anomalies import (
+    ANOMALY_KEYS,
+    anomaly_opportunities,
+    detect_cost_anomalies,
+    load_anomaly_state,
+    update_anomaly_state,
+)
+from cloud_cost_audit.config import AuditConfig
+from cloud_cost_audit.pipeline import run_audit
+
+
+def _line_items(days: pd.DatetimeIndex, n_series: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cost = 100.0 + rng.normal(0.0, 5.0, size=(n_series, len(days)))
+    return pd.DataFrame(
+        {
+            "provider": "aws",
+            "account": "acct-1",
+            "service": np.repeat([f"svc-{i}" for i in range(n_series)], len(days)),
+            "team": np.repeat([f"team-{i % 3}" for i in range(n_series)], len(days)),
+            "usage_day": np.tile(days, n_series),
+            "cost_usd": cost.ravel(),
+        }
+    )
+
+
+def test_incremental_updates_match_a_full_rescan() -> None:
+    days = pd.date_range("2026-01-01", "2026-02-28", freq="D")
+    items = _line_items(days, 50)
+    spike = (items["service"] == "svc-3") & (items["usage_day"] == pd.Timestamp("2026-02-10"))
+    items.loc[spike, "cost_usd"] += 400.0
+    daily = items.astype({k: str for k in ANOMALY_KEYS})
+    params: dict[str, Any] = {
+        "alpha": 0.1,
+        "z_threshold": 4.0,
+        "warmup_days": 7,
+        "min_excess_usd": 50.0,
+    }
+    empty = pd.DataFrame(
+        {
+            **{k: pd.Series(dtype=str) for k in ANOMALY_KEYS},
+            "last_day": pd.Series(dtype="datetime64[ns]"),
+            "days": pd.Series(dtype=np.int64),
+            "mean": pd.Series(dtype=float),
+            "var": pd.Series(dtype=float),
+        }
+    )
+
+    full_state, full_found = update_anomaly_state(empty, daily, **params)
+    state, found_jan = update_anomaly_state(
+        empty, daily[daily["usage_day"].dt.month == 1], **params
+    )
+    state, found_feb = update_anomaly_state(state, daily, **params)
+
+    pd.testing.assert_frame_equal(state, full_state)
+    assert found_jan.empty
+    assert list(found_feb["service"]) == ["svc-3"]
+    pd.testing.assert_frame_equal(found_feb, full_found)
+    assert (state["days"] == len(days)).all()
+    # Nothing new: the state is unchanged and nothing is flagged again.
+    again, none = update_anomaly_state(state, daily, **params)
+    pd.testing.assert_frame_equal(again, state)
+    assert none.empty
+
+
+def test_detected_anomalies_persist_and_rank(tmp_path: Path) -> None:
+    days = pd.date_range("2026-01-01", "2026-01-31", freq="D")
+    items = _line_items(days, 5)
+    spike = (items["service"] == "svc-1") & (items["usage_day"] == pd.Timestamp("2026-01-20"))
+    items.loc[spike, "cost_usd"] += 300.0
+
+    with duckdb.connect(str(tmp_path / "audit.duckdb")) as con:
+        first = detect_cost_anomalies(con, items)
+    with duckdb.connect(str(tmp_path / "audit.duckdb")) as con:
+        second = detect_cost_anomalies(con, items)
+        assert len(load_anomaly_state(con)) == 5
+
+    pd.testing.assert_frame_equal(first, second)
+    assert list(first["usage_day"]) == [pd.Timestamp("2026-01-20")]
+    opps = anomaly_opportunities(first)
+    assert list(opps["kind"]) == ["cost_anomaly"]
+    assert opps["team"].iloc[0] == "team-1"
+    excess = first["cost_usd"].iloc[0] - first["expected_usd"].iloc[0]
+    assert opps["estimated_savings_usd"].iloc[0] == pytest.approx(excess, abs=0.01)
+
+
+def test_anomaly_stage_requires_day_grain(
+    tmp_path: Path,
+    audit_config: Callable[..., AuditConfig],
+    assert_rejects_month_grain: Callable[..., None],
+) -> None:
+    result = run_audit(config=audit_config(ingestion={"rollup_grain": "day"}, anomalies={}))
+
+    assert result.anomalies is not None
+    assert (tmp_path / "out" / "cost_anomalies.csv").exists()
+    assert_rejects_month_grain(anomalies={})
+
+
+def test_month_long_rows_are_not_day_one_spikes(tmp_path: Path) -> None:
+    days = pd.date_range("2026-01-01", "2026-02-28", freq="D")
+    items = _line_items(days, 1).assign(
+        usage_start_time=lambda df: df["usage_day"],
+        usage_end_time=lambda df: df["usage_day"] + pd.Timedelta(days=1),
+    )
+    # A February fee billed as one row covering the whole month.
+    fee = items.iloc[[0]].assign(
+        usage_day=pd.Timestamp("2026-02-01"),
+        usage_start_time=pd.Timestamp("2026-02-01"),
+        usage_end_time=pd.Timestamp("2026-02-28 23:59:59"),
+        cost_usd=280.0,
+    )
+
+    with duckdb.connect(str(tmp_path / "audit.duckdb")) as con:
+        found = detect_cost_anomalies(con, pd.concat([items, fee], ignore_index=True))
+
+    assert found.empty
+
+
+def test_mid_month_fee_rows_do_not_close_unbilled_days(tmp_path: Path) -> None:
+    def billed_through(last: str) -> pd.DataFrame:
+        hours = pd.date_range("2026-01-01", f"{last} 23:00", freq="h")
+        rng = np.random.default_rng(3)
+        hourly = pd.DataFrame(
+            {
+                "provider": "aws",
+                "account": "acct-1",
+                "service": "AmazonEC2",
+                "team": "team-0",
+                "usage_day": hours.floor("D"),
+                "usage_start_time": hours,
+                "usage_end_time": hours + pd.Timedelta(hours=1),
+                "cost_usd": 10.0 + rng.normal(0.0, 0.5, size=len(hours)),
+            }
+        )
+        hourly.loc[hourly["usage_day"] == pd.Timestamp("2026-01-15"), "cost_usd"] += 100_000 / 24
+        # The month's support fee is billed up front with a window covering all of January.
+        fee = hourly.iloc[[0]].assign(
+            usage_start_time=pd.Timestamp("2026-01-01"),
+            usage_end_time=pd.Timestamp("2026-02-01"),
+            cost_usd=3_100.0,
+        )
+        return pd.concat([hourly, fee], ignore_index=True)
+
+    with duckdb.connect(str(tmp_path / "audit.duckdb")) as con:
+        assert detect_cost_anomalies(con, billed_through("2026-01-10")).empty
+        assert list(load_anomaly_state(con)["last_day"]) == [pd.Timestamp("2026-01-10")]
+        found = detect_cost_anomalies(con, billed_through("2026-01-20"))
+
+    assert list(found["usage_day"]) == [pd.Timestamp("2026-01-15")]
+    assert found["cost_usd"].iloc[0] - found["expected_usd"].iloc[0] > 100_000 * 0.99
+
+
+def test_failed_update_keeps_persisted_baselines(tmp_path: Path) -> None:
+    days = pd.date_range("2026-01-01", "2026-02-28", freq="D")
+    items = _line_items(days, 3)
+    spike = (items["service"] == "svc-0") & (items["usage_day"] == pd.Timestamp("2026-02-10"))
+    items.loc[spike, "cost_usd"] += 400.0
+    january = items[items["usage_day"].dt.month == 1]
+
+    with duckdb.connect(str(tmp_path / "audit.duckdb")) as con:
+        detect_cost_anomalies(con, january)
+        before = load_anomaly_state(con)
+        # An incompatible anomaly table makes the write fail after the state was replaced.
+        con.execute("drop table cost_anomalies")
+        con.execute("create table cost_anomalies (provider VARCHAR)")
+        with pytest.raises(duckdb.Error):
+            detect_cost_anomalies(con, items)
+        pd.testing.assert_frame_equal(load_anomaly_state(con), before)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from cloud_cost_audit.analytics.classification import (
+    DEFAULT_RULES,
+    ClassificationIndex,
+    ClassificationRule,
+    category_bit,
+    in_category,
+)
+from cloud_cost_audit.io.cloud_providers import Providers
+from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
+from cloud_cost_audit.transforms.normalize import (
+    normalize_aws_billing,
+    normalize_gcp_billing,
+    unify_line_items,
+)
+
+
+def test_index_matches_row_wise_pattern_scans(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    providers = Providers.from_data_dir(tmp_path)
+    line_items = unify_line_items(
+        [
+            normalize_aws_billing(providers.aws.billing()),
+            normalize_gcp_billing(providers.gcp.billing()),
+        ]
+    )
+    service = line_items["service"].astype(str)
+    egress = (
+        service.str.contains("DataTransfer", case=False)
+        | line_items["sku"].astype(str).str.contains("Egress", case=False)
+        | service.str.contains("Networking", case=False)
+    )
+
+    assert egress.any()
+    assert (in_category(line_items, "egress") == egress.to_numpy()).all()
+    compute = service.isin(["AmazonEC2", "Compute Engine"]).to_numpy()
+    assert (in_category(line_items, "compute") == compute).all()
+
+
+def test_index_is_cached_per_rule_table_in_duckdb(tmp_path: Path) -> None:
+    frame = pd.DataFrame(
+        {
+            "provider": pd.Categorical(["aws", "aws", "gcp", "aws"]),
+            "service": ["AWSDataTransfer", "AmazonS3", "Cloud Storage", "AWSDataTransfer"],
+            "sku": ["Egress", "TimedStorage", "Standard Storage", "Egress"],
+        }
+    )
+    db = str(tmp_path / "audit.duckdb")
+    with duckdb.connect(db) as con:
+        index = ClassificationIndex.load(con)
+        classes = index.classify(frame)
+        index.save(con)
+    egress, storage = category_bit("egress"), category_bit("object_storage")
+    assert classes.tolist() == [egress, storage, storage, egress]
+
+    with duckdb.connect(db) as con:
+        cached = ClassificationIndex.load(con)
+        assert len(cached) == 3
+        np.testing.assert_array_equal(cached.classify(frame), classes)
+        # A different rule table ignores, then replaces, the cached classes.
+        rules = (*DEFAULT_RULES, ClassificationRule("egress", "service", equals=("AmazonS3",)))
+        changed = ClassificationIndex.load(con, rules)
+        assert len(changed) == 0
+        assert changed.classify(frame)[1] == egress | storage
+        changed.save(con)
+        assert len(ClassificationIndex.load(con)) == 0
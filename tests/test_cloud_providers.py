@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+import types
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from cloud_cost_audit.config import IngestionConfig
+from cloud_cost_audit.io.cloud_providers import MockAwsProvider, MockGcpProvider, Providers
+from cloud_cost_audit.io.paths import DataPaths
+from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
+from cloud_cost_audit.models.schema import AWS_BILLING_SCHEMA, concat_frames
+
+
+def test_shared_inputs_are_parsed_once_and_partitioned(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    providers = Providers.from_data_dir(tmp_path)
+
+    raw = pd.read_csv(DataPaths(tmp_path).inventory_csv)
+    aws = providers.aws.inventory()
+    gcp = providers.gcp.inventory()
+    pd.testing.assert_frame_equal(aws, raw[raw["provider"] == "aws"].reset_index(drop=True))
+    pd.testing.assert_frame_equal(gcp, raw[raw["provider"] == "gcp"].reset_index(drop=True))
+    pd.testing.assert_frame_equal(providers.inventory(), pd.concat([aws, gcp], ignore_index=True))
+    assert providers.inventory() is providers.inventory()
+    assert providers.shared.utilization("azure").empty
+
+
+def test_multi_part_billing_discovery_is_manifest_aware(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    paths = DataPaths(tmp_path)
+    aws = pd.read_csv(paths.aws_billing_csv, dtype=AWS_BILLING_SCHEMA.read_dtypes())
+
+    delivery = paths.aws_billing_dir / "cur" / "20260101-20260201"
+    (delivery / "assembly-1").mkdir(parents=True)
+    keys = []
+    for idx, start in enumerate(range(0, len(aws), 3)):
+        key = f"cur/20260101-20260201/assembly-1/part-{idx}.csv"
+        aws.iloc[start : start + 3].to_csv(paths.aws_billing_dir / key, index=False)
+        keys.append(key)
+    # A superseded assembly that the period-level manifest no longer references.
+    (delivery / "assembly-0").mkdir()
+    aws.to_csv(delivery / "assembly-0" / "part-0.csv", index=False)
+    stale = ["cur/20260101-20260201/assembly-0/part-0.csv"]
+    # As in real CUR deliveries, every assembly folder repeats its own copy of the manifest.
+    for folder, report_keys in (
+        (delivery, keys),
+        (delivery / "assembly-1", keys),
+        (delivery / "assembly-0", stale),
+    ):
+        (folder / "cur-Manifest.json").write_text(
+            json.dumps(
+                {"billingPeriod": {"start": "20260101T000000.000Z"}, "reportKeys": report_keys}
+            ),
+            encoding="utf-8",
+        )
+
+    provider = MockAwsProvider(tmp_path, max_workers=2)
+    assert provider.billing_parts(invoice_month="2026-01") == [
+        paths.aws_billing_dir / key for key in keys
+    ]
+    assert provider.billing_parts(invoice_month="2026-02") == []
+    loaded = provider.billing(invoice_month="2026-01")
+    pd.testing.assert_frame_equal(loaded, aws[loaded.columns.tolist()], check_categorical=False)
+
+
+def test_compressed_billing_inputs_are_streamed(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    paths = DataPaths(tmp_path)
+    expected = Providers.from_data_dir(tmp_path).gcp.billing()
+
+    raw = paths.gcp_billing_csv.read_bytes()
+    paths.gcp_billing_csv.unlink()
+    for suffix, codec in ((".gz", "gzip"), (".bz2", "bz2"), (".zst", "zstd")):
+        target = paths.gcp_billing_csv.with_name(paths.gcp_billing_csv.name + suffix)
+        with pa.output_stream(str(target), compression=codec) as out:
+            out.write(raw)
+        provider = MockGcpProvider(tmp_path)
+        assert provider.billing_parts() == [target]
+        pd.testing.assert_frame_equal(provider.billing(), expected)
+        chunks = list(provider.billing_chunks(4))
+        pd.testing.assert_frame_equal(concat_frames(chunks), expected, check_categorical=False)
+        target.unlink()
+
+
+def test_gzip_inputs_use_the_configured_decompression_threads(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    paths = DataPaths(tmp_path)
+    expected = Providers.from_data_dir(tmp_path).gcp.billing()
+    target = paths.gcp_billing_csv.with_name(paths.gcp_billing_csv.name + ".gz")
+    target.write_bytes(gzip.compress(paths.gcp_billing_csv.read_bytes()))
+    paths.gcp_billing_csv.unlink()
+
+    # Stand-in for python-isal's threaded reader, recording the requested thread count.
+    requested: list[int] = []
+
+    def open_threaded(path: Path, mode: str, *, threads: int) -> gzip.GzipFile:
+        requested.append(threads)
+        return gzip.GzipFile(path, mode)
+
+    igzip_threaded = types.ModuleType("isal.igzip_threaded")
+    igzip_threaded.open = open_threaded  # type: ignore[attr-defined]
+    isal = types.ModuleType("isal")
+    isal.igzip_threaded = igzip_threaded  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "isal", isal)
+    monkeypatch.setitem(sys.modules, "isal.igzip_threaded", igzip_threaded)
+
+    provider = Providers.from_data_dir(tmp_path, decompression_threads=6).gcp
+    pd.testing.assert_frame_equal(provider.billing(), expected)
+    assert requested == [6]
+    assert IngestionConfig().decompression_threads > 1
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cloud_cost_audit.analytics.commitments import hourly_spend_curves, simulate_commitments
+from cloud_cost_audit.config import AuditConfig
+from cloud_cost_audit.pipeline import run_audit
+
+
+def test_simulation_matches_brute_force_over_a_year() -> None:
+    rng = np.random.default_rng(3)
+    hours = np.arange(8760)
+    spend = 10.0 + 4.0 * np.sin(hours * 2 * np.pi / 24) + rng.gamma(2.0, 1.0, len(hours))
+    discounts = {"1yr": 0.27, "3yr": 0.46}
+
+    sim = simulate_commitments(spend, discounts, levels=300)
+
+    covered = np.minimum(spend[None, :], sim.levels[:, None]).sum(axis=1)
+    for t, term in enumerate(sim.terms):
+        expected = covered - sim.levels * len(spend) * (1 - discounts[term])
+        np.testing.assert_allclose(sim.savings[t], expected, rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(sim.coverage, covered / spend.sum())
+    term, k = sim.best()
+    assert term == "3yr"
+    # Deeper discounts justify committing above the curve's minimum, never above its peak.
+    assert spend.min() <= sim.levels[k] < spend.max()
+    assert sim.utilization[k] < 1.0 <= sim.utilization[0]
+
+
+def test_hourly_curves_spread_cost_over_usage_windows() -> None:
+    start = pd.Timestamp("2026-01-01")
+    line_items = pd.DataFrame(
+        {
+            "provider": ["aws", "aws", "gcp"],
+            "account": ["a", "a", "b"],
+            "usage_start_time": [start, start + pd.Timedelta(hours=2), start],
+            "usage_end_time": [
+                start + pd.Timedelta(days=1),
+                start + pd.Timedelta(hours=3),
+                start + pd.Timedelta(hours=12),
+            ],
+            "cost_usd": [24.0, 5.0, 6.0],
+        }
+    )
+
+    curves = hourly_spend_curves(line_items)
+
+    assert curves.keys.values.tolist() == [["aws", "a"], ["gcp", "b"]]
+    assert len(curves.hours) == 24
+    np.testing.assert_allclose(curves.spend.sum(axis=1), [29.0, 6.0])
+    assert curves.spend[0, 2] == pytest.approx(6.0)
+    assert curves.spend[1, 12:].sum() == 0.0
+
+
+def test_commitment_model_replaces_flat_estimate(
+    audit_config: Callable[..., AuditConfig], assert_rejects_month_grain: Callable[..., None]
+) -> None:
+    detectors = {
+        "modules": ["cloud_cost_audit.analytics.commitments"],
+        "disabled": ["commitments"],
+    }
+
+    titles = [q.title for q in run_audit(config=audit_config(detectors=detectors)).quick_wins]
+
+    assert any(t.startswith("Commit $") and "(3yr)" in t for t in titles)
+    assert not any(t.startswith("Commitments for steady-state compute") for t in titles)
+    assert_rejects_month_grain(detectors=detectors)
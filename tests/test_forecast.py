@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cloud_cost_audit.analytics.forecast import daily_cost_series, forecast_spend
+from cloud_cost_audit.config import AuditConfig
+from cloud_cost_audit.pipeline import run_audit
+
+
+def test_stacked_fit_recovers_trend_and_weekly_pattern() -> None:
+    days = pd.date_range("2026-01-01", "2026-02-14", freq="D")
+    n_series = 2_000
+    base = np.linspace(10.0, 500.0, n_series)
+    weekend = np.isin(days.dayofweek, [5, 6])
+    # Each series: base + 0.5/day trend, 40% cheaper on weekends.
+    cost = (base[:, None] + 0.5 * np.arange(len(days))) * np.where(weekend, 0.6, 1.0)
+    line_items = pd.DataFrame(
+        {
+            "provider": "aws",
+            "account": np.repeat([f"acct-{i % 50}" for i in range(n_series)], len(days)),
+            "service": np.repeat([f"svc-{i}" for i in range(n_series)], len(days)),
+            "usage_day": np.tile(days, n_series),
+            "cost_usd": cost.ravel(),
+        }
+    )
+
+    forecast = forecast_spend(line_items).set_index("service")
+
+    assert len(forecast) == n_series
+    assert forecast["as_of"].iloc[0] == "2026-02-14"
+    assert forecast["next_quarter"].iloc[0] == "2026Q2"
+    row = forecast.loc["svc-0"]
+    # The trend is linear but weekends scale it, so a tolerance covers the misfit.
+    future = pd.date_range("2026-02-15", "2026-02-28", freq="D")
+    t = np.arange(len(days), len(days) + len(future))
+    expected_rest = ((10.0 + 0.5 * t) * np.where(np.isin(future.dayofweek, [5, 6]), 0.6, 1.0)).sum()
+    assert row["month_to_date_usd"] == pytest.approx(cost[0, days.month == 2].sum(), abs=0.01)
+    assert row["forecast_month_usd"] - row["month_to_date_usd"] == pytest.approx(
+        expected_rest, rel=0.05
+    )
+    by_base = forecast.loc[[f"svc-{i}" for i in range(n_series)], "forecast_next_quarter_usd"]
+    assert by_base.is_monotonic_increasing
+
+
+def test_multi_day_rows_are_spread_across_their_window() -> None:
+    line_items = pd.DataFrame(
+        {
+            "provider": "aws",
+            "account": "a1",
+            "service": ["svc-month", "svc-hour"],
+            "usage_start_time": pd.to_datetime(["2026-01-01 00:00:00", "2026-01-10 05:00:00"]),
+            "usage_end_time": pd.to_datetime(["2026-01-31 23:59:59", "2026-01-10 06:00:00"]),
+            "cost_usd": [310.0, 4.0],
+        }
+    )
+
+    series = daily_cost_series(line_items)
+
+    # Metered usage stops on Jan 10, so the month-long row only counts the days up to it.
+    assert list(series.keys["service"]) == ["svc-hour", "svc-month"]
+    assert len(series.days) == 10
+    np.testing.assert_allclose(series.cost[1], 10.0)
+    assert series.cost[0].sum() == pytest.approx(4.0)
+    assert series.cost[0, 9] == pytest.approx(4.0)
+    # A flat month-long row projects at the same daily rate.
+    forecast = forecast_spend(line_items, seasonality=False).set_index("service")
+    assert forecast.loc["svc-month", "as_of"] == "2026-01-10"
+    assert forecast.loc["svc-month", "forecast_month_usd"] == pytest.approx(310.0)
+    assert forecast.loc["svc-month", "forecast_next_quarter_usd"] == pytest.approx(910.0)
+
+
+def test_forecast_stage_writes_outlook(
+    tmp_path: Path,
+    audit_config: Callable[..., AuditConfig],
+    assert_rejects_month_grain: Callable[..., None],
+) -> None:
+    result = run_audit(config=audit_config(ingestion={"rollup_grain": "day"}, forecast={}))
+
+    # The synthetic billing rows each cover the whole month, so spend is flat across it.
+    forecast = pd.read_csv(tmp_path / "out" / "forecast.csv")
+    assert forecast["month_to_date_usd"].sum() == pytest.approx(result.baseline_cost_usd)
+    assert forecast["forecast_month_usd"].sum() == pytest.approx(result.baseline_cost_usd)
+    assert forecast["forecast_next_quarter_usd"].sum() == pytest.approx(
+        result.baseline_cost_usd / 31 * 91, rel=0.01
+    )
+    plan = (tmp_path / "out" / "monthly_plan.md").read_text(encoding="utf-8")
+    assert "## Spend outlook (as of 2026-01-31)" in plan
+    assert "Projected 2026Q2 spend" in plan
+
+    assert_rejects_month_grain(forecast={})
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pytest
+
+from cloud_cost_audit.config import AuditConfig
+from cloud_cost_audit.io.incremental import ensure_incremental_tables, sync_line_item_parts
+from cloud_cost_audit.io.paths import DataPaths
+from cloud_cost_audit.pipeline import run_audit
+
+
+def _split_aws_delivery(data_dir: Path) -> list[Path]:
+    paths = DataPaths(data_dir)
+    aws = pd.read_csv(paths.aws_billing_csv, dtype=str)
+    paths.aws_billing_dir.mkdir(parents=True)
+    parts = []
+    for idx, start in enumerate(range(0, len(aws), 4)):
+        part = paths.aws_billing_dir / f"part-{idx}.csv"
+        aws.iloc[start : start + 4].to_csv(part, index=False)
+        parts.append(part)
+    return parts
+
+
+def test_incremental_runs_only_reingest_restated_parts(
+    audit_config: Callable[..., AuditConfig], tmp_path: Path
+) -> None:
+    parts = _split_aws_delivery(tmp_path / "data")
+    full = run_audit(config=audit_config())
+    incremental_cfg = audit_config(ingestion={"incremental": True})
+    first = run_audit(config=incremental_cfg)
+    assert first.baseline_cost_usd == pytest.approx(full.baseline_cost_usd)
+    assert first.quick_wins == full.quick_wins
+
+    # Restate one part: double its cost and touch another without changing its content.
+    restated = pd.read_csv(parts[0], dtype=str)
+    delta = restated["cost_usd"].astype(float).sum()
+    restated["cost_usd"] = (restated["cost_usd"].astype(float) * 2).astype(str)
+    restated.to_csv(parts[0], index=False)
+    parts[1].touch()
+
+    with duckdb.connect(str(incremental_cfg.duckdb_path)) as con:
+        ensure_incremental_tables(con)
+        summary = sync_line_item_parts(
+            con,
+            provider="aws",
+            parts=parts[1:],
+            invoice_month="2026-01",
+            load_part=lambda part: pytest.fail(f"unchanged part reloaded: {part}"),
+        )
+        assert summary.ingested == []
+        assert summary.removed == [parts[0].resolve().as_posix()]
+
+    second = run_audit(config=incremental_cfg)
+    assert second.baseline_cost_usd == pytest.approx(full.baseline_cost_usd + delta)
+    with duckdb.connect(str(incremental_cfg.duckdb_path), read_only=True) as con:
+        row = con.execute("select count(*) from unified_line_items").fetchone()
+        marks = con.execute("select count(*) from ingestion_watermarks").fetchone()
+    assert row is not None and row[0] == 14
+    assert marks is not None and marks[0] == len(parts) + 1
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any
 
+import duckdb
+import pandas as pd
+import pytest
 import yaml
 
+from cloud_cost_audit import pipeline
 from cloud_cost_audit.config import AuditConfig
+from cloud_cost_audit.io.billing_readers import BillingFormat
+from cloud_cost_audit.io.cloud_providers import MockAwsProvider
 from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
 from cloud_cost_audit.pipeline import run_audit
+from cloud_cost_audit.transforms.normalize import REQUIRED_AWS_COLUMNS
 
 
-def _write_config(tmp_dir: Path) -> Path:
-    cfg = {
+def _write_config(tmp_dir: Path, **overrides: Any) -> Path:
+    cfg: dict[str, Any] = {
         "invoice_month": "2026-01",
         "data_dir": str(tmp_dir / "data"),
         "output_dir": str(tmp_dir / "out"),
@@ -18,6 +26,8 @@ def _write_config(tmp_dir: Path) -> Path:
         "required_allocation_keys": ["env", "app", "team", "cost_center"],
         "thresholds": {"underutilized_cpu_pct": 10.0, "min_compute_cost_usd": 150.0},
     }
+    cfg.update(overrides)
+    tmp_dir.mkdir(parents=True, exist_ok=True)
     path = tmp_dir / "config.yaml"
     path.write_text(yaml.safe_dump(cfg), encoding="utf-8")
     return path
@@ -37,3 +47,103 @@ def test_end_to_end_pipeline_outputs(tmp_path: Path) -> None:
     assert (out_dir / "quick_wins.csv").exists()
     assert (out_dir / "tag_coverage.json").exists()
     assert Path(cfg.duckdb_path).exists()
+
+
+def test_streaming_ingestion_matches_full_load(tmp_path: Path) -> None:
+    full_cfg = AuditConfig.load(_write_config(tmp_path / "full"))
+    ensure_synthetic_inputs(data_dir=Path(full_cfg.data_dir), invoice_month=full_cfg.invoice_month)
+    full = run_audit(config=full_cfg)
+
+    streamed_cfg = AuditConfig.load(
+        _write_config(
+            tmp_path / "streamed",
+            data_dir=str(tmp_path / "full" / "data"),
+            ingestion={"chunk_size_rows": 3},
+        )
+    )
+    streamed = run_audit(config=streamed_cfg)
+
+    assert streamed.baseline_cost_usd == full.baseline_cost_usd
+    assert streamed.tag_coverage == full.tag_coverage
+    assert streamed.quick_wins == full.quick_wins
+    with duckdb.connect(str(streamed.duckdb_path), read_only=True) as con:
+        row = con.execute("select count(*) from unified_line_items").fetchone()
+    assert row is not None and row[0] == 14
+
+
+def test_columnar_billing_formats_match_csv(tmp_path: Path) -> None:
+    csv_cfg = AuditConfig.load(_write_config(tmp_path / "csv"))
+    ensure_synthetic_inputs(data_dir=Path(csv_cfg.data_dir), invoice_month=csv_cfg.invoice_month)
+    expected = run_audit(config=csv_cfg)
+
+    formats: tuple[BillingFormat, ...] = ("parquet", "arrow")
+    for fmt in formats:
+        cfg = AuditConfig.load(
+            _write_config(
+                tmp_path / fmt,
+                data_dir=str(tmp_path / "csv" / "data"),
+                ingestion={"billing_format": fmt},
+            )
+        )
+        ensure_synthetic_inputs(
+            data_dir=Path(cfg.data_dir), invoice_month=cfg.invoice_month, billing_format=fmt
+        )
+        result = run_audit(config=cfg)
+        assert result.baseline_cost_usd == expected.baseline_cost_usd
+        assert result.quick_wins == expected.quick_wins
+
+
+def test_columnar_billing_pushes_down_invoice_month(tmp_path: Path) -> None:
+    data_dir = tmp_path / "data"
+    ensure_synthetic_inputs(data_dir=data_dir, invoice_month="2026-01", billing_format="parquet")
+    aws = MockAwsProvider(data_dir, billing_format="parquet")
+
+    assert set(aws.billing(invoice_month="2026-01").columns) == REQUIRED_AWS_COLUMNS
+    assert aws.billing(invoice_month="2025-12").empty
+
+
+def test_duckdb_engine_matches_pandas_engine(tmp_path: Path) -> None:
+    pandas_cfg = AuditConfig.load(_write_config(tmp_path / "pandas"))
+    ensure_synthetic_inputs(
+        data_dir=Path(pandas_cfg.data_dir), invoice_month="2026-01", billing_format="parquet"
+    )
+    expected = run_audit(config=pandas_cfg)
+
+    for fmt in ("csv", "parquet"):
+        cfg = AuditConfig.load(
+            _write_config(
+                tmp_path / f"duckdb-{fmt}",
+                data_dir=str(tmp_path / "pandas" / "data"),
+                ingestion={"engine": "duckdb", "billing_format": fmt},
+            )
+        )
+        result = run_audit(config=cfg)
+        assert result.baseline_cost_usd == pytest.approx(expected.baseline_cost_usd)
+        assert [q.title for q in result.quick_wins] == [q.title for q in expected.quick_wins]
+        with duckdb.connect(str(cfg.duckdb_path), read_only=True) as con:
+            aws = con.execute(
+                "select * from unified_line_items where provider = 'aws' order by resource_id"
+            ).df()
+        with duckdb.connect(str(pandas_cfg.duckdb_path), read_only=True) as con:
+            ref = con.execute(
+                "select * from unified_line_items where provider = 'aws' order by resource_id"
+            ).df()
+        pd.testing.assert_frame_equal(aws, ref)
+
+
+def test_line_item_cache_is_reused_for_unchanged_inputs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_dir = tmp_path / "cache"
+    cfg = AuditConfig.load(_write_config(tmp_path, ingestion={"cache": {"dir": str(cache_dir)}}))
+    ensure_synthetic_inputs(data_dir=Path(cfg.data_dir), invoice_month=cfg.invoice_month)
+    first = run_audit(config=cfg)
+    [entry] = cache_dir.glob("*.arrow")
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("cache hit must not re-normalize")
+
+    monkeypatch.setattr(pipeline, "_normalize_line_items", fail)
+    second = run_audit(config=cfg)
+    assert second == first
+    assert list(cache_dir.glob("*.arrow")) == [entry]
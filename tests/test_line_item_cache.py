@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from cloud_cost_audit.io.cloud_providers import Providers
+from cloud_cost_audit.io.line_item_cache import LineItemCache, cache_key
+from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
+from cloud_cost_audit.models.schema import UNIFIED_LINE_ITEM_SCHEMA, conform
+from cloud_cost_audit.transforms.normalize import (
+    normalize_aws_billing,
+    normalize_gcp_billing,
+    unify_line_items,
+)
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return conform(
+        pd.DataFrame(
+            {
+                "provider": ["aws"] * rows,
+                "cost_usd": [1.5] * rows,
+                "usage_start_time": ["2026-01-01T00:00:00"] * rows,
+            }
+        ),
+        UNIFIED_LINE_ITEM_SCHEMA,
+    )
+
+
+def test_cache_round_trips_and_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = LineItemCache(tmp_path / "cache", max_bytes=1)
+    first = _frame(5)
+    cache.put("a", first)
+    pd.testing.assert_frame_equal(cache.get("a", schema=UNIFIED_LINE_ITEM_SCHEMA), first)
+
+    # Over the size limit, writing a new entry evicts older ones but never itself.
+    cache.put("b", _frame(6))
+    assert cache.get("a", schema=UNIFIED_LINE_ITEM_SCHEMA) is None
+    assert cache.get("b", schema=UNIFIED_LINE_ITEM_SCHEMA) is not None
+
+    roomy = LineItemCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024)
+    roomy.put("c", _frame(1))
+    os.utime(tmp_path / "cache" / "c.arrow", (0, 0))
+    assert roomy.get("c", schema=UNIFIED_LINE_ITEM_SCHEMA) is not None
+    assert (tmp_path / "cache" / "c.arrow").stat().st_mtime > 0
+
+
+def test_cache_hits_map_fixed_width_columns_without_copying(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path / "data", invoice_month="2026-01")
+    providers = Providers.from_data_dir(tmp_path / "data")
+    line_items = unify_line_items(
+        [
+            normalize_aws_billing(providers.aws.billing()),
+            normalize_gcp_billing(providers.gcp.billing()),
+        ]
+    )
+    cache = LineItemCache(tmp_path / "cache")
+    cache.put("k", line_items)
+
+    cached = cache.get("k", schema=UNIFIED_LINE_ITEM_SCHEMA)
+
+    assert cached is not None
+    pd.testing.assert_frame_equal(cached, line_items)
+    # Read-only means the column is still backed by the memory-mapped file.
+    assert not cached["cost_usd"].to_numpy().flags.writeable
+    assert not cached["usage_start_time"].to_numpy().flags.writeable
+
+
+def test_cache_key_tracks_content_not_paths(tmp_path: Path) -> None:
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    a.write_text("x\n1\n")
+    b.write_text("x\n1\n")
+    params = {"invoice_month": "2026-01"}
+
+    def key(path: Path, **extra: str) -> str:
+        return cache_key({"aws": [path]}, schema=UNIFIED_LINE_ITEM_SCHEMA, params=params | extra)
+
+    assert key(a) == key(b)
+    assert key(a) != key(a, invoice_month="2026-02")
+    b.write_text("x\n2\n")
+    assert key(a) != key(b)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import pandas as pd
 
-from cloud_cost_audit.analytics.metrics import compute_tag_coverage
+from cloud_cost_audit.analytics.metrics import aggregate_line_items, compute_tag_coverage
 
 
 def test_tag_coverage_computation() -> None:
@@ -18,3 +18,29 @@ def test_tag_coverage_computation() -> None:
     assert 0.0 < cov.coverage_by_key["env"] < 1.0
     assert cov.fully_allocated_cost_usd == 100.0
     assert cov.fully_allocated_pct == 0.5
+
+
+def test_aggregates_match_per_row_reductions() -> None:
+    line_items = pd.DataFrame(
+        {
+            "provider": ["aws", "aws", "gcp", "gcp", "aws"],
+            "service": ["AmazonEC2", "AmazonS3", "Cloud Storage", "Cloud Storage", "AmazonEC2"],
+            "sku": ["a", "b", "c", "c", "a"],
+            "env": ["prod", "", "dev", "dev", "prod"],
+            "team": ["t", "t", "", "u", "t"],
+            "cost_usd": [10.0, 20.0, 30.0, 40.0, 5.0],
+        }
+    ).astype({"env": "category", "team": "category"})
+    aggregates = aggregate_line_items(line_items, ["env", "team"])
+
+    assert len(aggregates.groups) == 4
+    assert aggregates.total_cost_usd == 105.0
+    assert aggregates.tag_coverage() == compute_tag_coverage(
+        line_items.astype(str).astype({"cost_usd": float}), ["env", "team"]
+    )
+    assert aggregates.tag_coverage().fully_allocated_cost_usd == 55.0
+    unallocated = aggregates.unallocated_spend()
+    assert unallocated[["service", "cost_usd"]].values.tolist() == [
+        ["Cloud Storage", 30.0],
+        ["AmazonS3", 20.0],
+    ]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from cloud_cost_audit.io.cloud_providers import Providers
+from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
+from cloud_cost_audit.models.schema import UNIFIED_LINE_ITEM_SCHEMA, conforms, parse_timestamps
+from cloud_cost_audit.transforms.normalize import (
+    normalize_aws_billing,
+    normalize_gcp_billing,
+    unify_line_items,
+)
+
+
+def test_unified_line_items_follow_schema_registry(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    providers = Providers.from_data_dir(tmp_path)
+    line_items = unify_line_items(
+        [
+            normalize_aws_billing(providers.aws.billing()),
+            normalize_gcp_billing(providers.gcp.billing()),
+        ]
+    )
+
+    assert line_items.columns.tolist() == UNIFIED_LINE_ITEM_SCHEMA.column_names
+    for col, kind in UNIFIED_LINE_ITEM_SCHEMA.columns.items():
+        is_category = isinstance(line_items[col].dtype, pd.CategoricalDtype)
+        assert is_category == (kind == "category"), col
+    assert line_items["provider"].cat.categories.tolist() == ["aws", "gcp"]
+    assert not line_items["cost_center"].isna().any()
+    assert (line_items["cost_center"] == "").sum() == 3
+    assert line_items["usage_start_time"].dtype == "datetime64[ns]"
+    assert (line_items["usage_day"] == line_items["usage_start_time"].dt.normalize()).all()
+    assert (line_items["usage_hour"] <= line_items["usage_start_time"]).all()
+
+
+def test_parse_timestamps_normalizes_offsets_and_blanks() -> None:
+    raw = pd.Series(
+        ["2026-01-01T05:00:00+02:00", "2026-01-01T03:00:00", None, "2026-01-01T03:00:00Z"] * 3
+    )
+    parsed = parse_timestamps(raw)
+
+    assert parsed.dtype == "datetime64[ns]"
+    assert parsed.isna().sum() == 3
+    assert set(parsed.dropna()) == {pd.Timestamp("2026-01-01T03:00:00")}
+    # A second pass is served from the cache and must agree with the first.
+    pd.testing.assert_series_equal(parse_timestamps(raw), parsed)
+
+
+def test_parse_timestamps_is_consistent_across_threads() -> None:
+    hours = pd.date_range("2026-02-01", periods=24 * 28, freq="h")
+    batches = [pd.Series(hours[i::8].strftime("%Y-%m-%dT%H:%M:%SZ").tolist() * 4) for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(parse_timestamps, batches))
+
+    for batch, parsed in zip(batches, results, strict=True):
+        expected = pd.to_datetime(batch, utc=True).dt.tz_localize(None).astype("datetime64[ns]")
+        pd.testing.assert_series_equal(parsed, expected)
+
+
+def test_unify_line_items_unions_dictionaries_across_partitions(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    aws = normalize_aws_billing(Providers.from_data_dir(tmp_path).aws.billing())
+    assert conforms(aws, UNIFIED_LINE_ITEM_SCHEMA)
+    # One row per partition, each with its own (pruned) service dictionary.
+    partitions = [
+        aws.iloc[[i]].assign(service=lambda df: df["service"].cat.remove_unused_categories())
+        for i in range(len(aws))
+    ] * 3
+
+    line_items = unify_line_items(partitions)
+
+    assert conforms(line_items, UNIFIED_LINE_ITEM_SCHEMA)
+    assert set(line_items["service"].cat.categories) == set(aws["service"])
+    expected = pd.concat([aws.astype({"service": str})] * 3, ignore_index=True)
+    assert line_items["service"].astype(str).tolist() == expected["service"].tolist()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from cloud_cost_audit.io.cloud_providers import Providers
+from cloud_cost_audit.io.object_store import (
+    InMemoryObjectStore,
+    LocalObjectStore,
+    ObjectInfo,
+    ObjectStoreProvider,
+    RangePrefetcher,
+    providers_from_object_store,
+)
+from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
+from cloud_cost_audit.models.schema import concat_frames
+
+
+class _InflightTrackingStore(InMemoryObjectStore):
+    def __init__(self, objects: dict[str, bytes]) -> None:
+        super().__init__(objects)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self.peak_inflight = 0
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        with self._lock:
+            self._inflight += end - start
+            self.peak_inflight = max(self.peak_inflight, self._inflight)
+        time.sleep(0.005)
+        try:
+            return super().read_range(key, start, end)
+        finally:
+            with self._lock:
+                self._inflight -= end - start
+
+
+def test_prefetcher_reassembles_objects_in_order_within_budget() -> None:
+    objects = {f"parts/{i:02d}.bin": bytes([i]) * (i * 7) for i in range(12)}
+    store = _InflightTrackingStore(objects)
+    prefetcher = RangePrefetcher(store, max_concurrency=4, range_size=5, max_inflight_bytes=16)
+
+    fetched = list(prefetcher.fetch(store.list("parts/")))
+
+    assert [obj.key for obj, _ in fetched] == sorted(objects)
+    assert all(data == objects[obj.key] for obj, data in fetched)
+    assert 5 < store.peak_inflight <= 16
+    assert list(prefetcher.fetch([ObjectInfo("parts/00.bin", 0)])) == [
+        (ObjectInfo("parts/00.bin", 0), b"")
+    ]
+
+
+def test_local_object_store_provider_matches_data_dir(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    expected = Providers.from_data_dir(tmp_path)
+    store = LocalObjectStore(tmp_path)
+    providers = providers_from_object_store(
+        store, prefetcher=RangePrefetcher(store, range_size=256, max_inflight_bytes=1024)
+    )
+
+    pd.testing.assert_frame_equal(providers.aws.billing(), expected.aws.billing())
+    pd.testing.assert_frame_equal(
+        concat_frames(list(providers.gcp.billing_chunks(2))),
+        expected.gcp.billing(),
+        check_categorical=False,
+    )
+    pd.testing.assert_frame_equal(providers.inventory(), expected.inventory())
+    pd.testing.assert_frame_equal(providers.gcp.utilization(), expected.gcp.utilization())
+
+
+def test_object_store_billing_uses_only_period_level_manifests() -> None:
+    prefix = "generated/aws_cur/"
+    parts = {f"{prefix}202601/assembly-1/part-{i}.csv": b"" for i in range(2)}
+    current = json.dumps({"reportKeys": [key.removeprefix(prefix) for key in parts]}).encode()
+    stale = json.dumps({"reportKeys": ["202601/assembly-0/part-0.csv"]}).encode()
+    store = InMemoryObjectStore(
+        {
+            **parts,
+            f"{prefix}202601/assembly-0/part-0.csv": b"",
+            f"{prefix}202601/cur-Manifest.json": current,
+            f"{prefix}202601/assembly-1/cur-Manifest.json": current,
+            f"{prefix}202601/assembly-0/cur-Manifest.json": stale,
+        }
+    )
+
+    provider = ObjectStoreProvider(store, provider="aws")
+
+    assert [obj.key for obj in provider.billing_objects()] == sorted(parts)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cloud_cost_audit.analytics.percentiles import QuantileSketches
+from cloud_cost_audit.config import AuditConfig
+from cloud_cost_audit.io.utilization_samples import iter_utilization_samples
+from cloud_cost_audit.pipeline import run_audit
+
+
+def _samples(rng: np.random.Generator, n: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "provider": "aws",
+            "resource_id": rng.choice(["i-a", "i-b", "i-c"], n),
+            "cpu_pct": rng.gamma(2.0, 10.0, n),
+            "mem_pct": np.where(rng.random(n) < 0.8, 0.0, 40.0),
+            "network_mbps": rng.lognormal(1.0, 2.0, n),
+        }
+    )
+
+
+def test_streamed_sketch_quantiles_stay_within_relative_accuracy() -> None:
+    rng = np.random.default_rng(7)
+    chunks = [_samples(rng, 20_000) for _ in range(5)]
+    sketches = QuantileSketches(["cpu_pct", "mem_pct", "network_mbps"], relative_accuracy=0.01)
+    for chunk in chunks:
+        sketches.update(chunk)
+
+    result = sketches.quantiles([0.5, 0.95, 0.99]).set_index("resource_id")
+    exact = pd.concat(chunks).groupby("resource_id")
+    for metric in ("cpu_pct", "network_mbps"):
+        for q, col in ((0.5, f"p50_{metric}"), (0.99, f"p99_{metric}")):
+            expected = exact[metric].quantile(q, interpolation="lower")
+            np.testing.assert_allclose(result[col], expected[result.index], rtol=0.01)
+    assert (result["p50_mem_pct"] == 0.0).all()
+    np.testing.assert_allclose(result["p95_mem_pct"], 40.0, rtol=0.01)
+
+
+def test_rightsizing_uses_sampled_peaks(
+    audit_config: Callable[..., AuditConfig], tmp_path: Path
+) -> None:
+    # i-prod-app-1 averages 6% CPU in the summary but spikes to 90% a tenth of the time.
+    hours = 24 * 31
+    cpu = np.where(np.arange(hours) % 10 == 0, 90.0, 2.0)
+    samples = pd.DataFrame(
+        {
+            "provider": "aws",
+            "resource_id": "i-prod-app-1",
+            "cpu_pct": cpu,
+            "mem_pct": 30.0,
+            "network_mbps": 1.0,
+        }
+    )
+    path = tmp_path / "samples.arrow"
+    samples.to_feather(path)
+    assert sum(len(b) for b in iter_utilization_samples(path, fmt="arrow", batch_rows=100)) == hours
+
+    baseline = run_audit(config=audit_config())
+    sampled = run_audit(
+        config=audit_config(
+            utilization_samples={"path": str(path), "format": "arrow", "batch_rows": 100},
+        )
+    )
+
+    def titles(result: Any) -> set[str]:
+        return {q.title for q in result.quick_wins}
+
+    spiky = "Rightsize underutilized compute: i-prod-app-1"
+    assert spiky in titles(baseline)
+    assert spiky not in titles(sampled)
+
+    with pytest.raises(ValueError, match="not among the sketched quantiles"):
+        audit_config(
+            thresholds={"rightsizing_cpu_statistic": "p90"},
+            utilization_samples={"path": str(path)},
+        )
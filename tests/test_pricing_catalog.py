@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import gzip
+import json
+import pickle
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from cloud_cost_audit.analytics.waste_detection import detect_underutilized_compute
+from cloud_cost_audit.io.pricing_catalog import (
+    InstancePrice,
+    PricingCatalog,
+    build_pricing_catalog,
+)
+from cloud_cost_audit.units import HOURS_PER_MONTH
+
+
+def _aws_offer(path: Path) -> None:
+    products: dict[str, Any] = {}
+    on_demand: dict[str, Any] = {}
+    # Windows BYOL (cheaper) and a licensed variant (dearer) share the instance type and OS
+    # of the license-included SKU and come after it, so only the product filter keeps them
+    # out of the catalog.
+    variants = [
+        ("Linux", "Shared", "No License required", "RunInstances", 1.0),
+        ("Windows", "Shared", "No License required", "RunInstances:0002", 2.0),
+        ("Linux", "Host", "No License required", "RunInstances", 1.0),
+        ("Windows", "Shared", "Bring your own license", "RunInstances:0800", 1.0),
+        ("Windows", "Shared", "No License required", "RunInstances:0102", 10.0),
+    ]
+    for i, (instance_type, usd) in enumerate(
+        [("m5.large", 0.096), ("m5.xlarge", 0.192), ("m5.2xlarge", 0.384), ("m5.metal", 4.608)]
+    ):
+        for j, (os_name, tenancy, license_model, operation, factor) in enumerate(variants):
+            sku = f"SKU{i}{os_name}{tenancy}{j}"
+            products[sku] = {
+                "sku": sku,
+                "productFamily": "Compute Instance",
+                "attributes": {
+                    "regionCode": "us-east-1",
+                    "instanceType": instance_type,
+                    "operatingSystem": os_name,
+                    "tenancy": tenancy,
+                    "licenseModel": license_model,
+                    "operation": operation,
+                    "preInstalledSw": "NA",
+                    "capacitystatus": "Used",
+                },
+            }
+            price = usd * factor
+            on_demand[sku] = {
+                f"{sku}.JRTCKXETXF": {
+                    "priceDimensions": {
+                        f"{sku}.JRTCKXETXF.6YS6EN2CT7": {
+                            "unit": "Hrs",
+                            "pricePerUnit": {"USD": f"{price:.10f}"},
+                        }
+                    }
+                }
+            }
+    offer = {
+        "formatVersion": "v1.0",
+        "products": products,
+        "terms": {"Reserved": {sku: {} for sku in products}, "OnDemand": on_demand},
+    }
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        json.dump(offer, fh, indent=2)
+
+
+def _gcp_skus(path: Path) -> None:
+    def sku(description: str, nanos: int) -> dict[str, Any]:
+        rate = {"unitPrice": {"units": "0", "nanos": nanos}}
+        return {
+            "description": description,
+            "category": {"resourceFamily": "Compute", "usageType": "OnDemand"},
+            "serviceRegions": ["us-central1"],
+            "pricingInfo": [{"pricingExpression": {"tieredRates": [rate]}}],
+        }
+
+    skus = [
+        sku("N2 Instance Core running in Americas", 31_611_000),
+        sku("N2 Instance Ram running in Americas", 4_237_000),
+        sku("N2 Instance Core running in Americas (Preemptible)", 1),
+    ]
+    skus[2]["category"]["usageType"] = "Preemptible"
+    path.write_text(json.dumps({"skus": skus, "nextPageToken": ""}), encoding="utf-8")
+
+
+@pytest.fixture()
+def catalog(tmp_path: Path) -> PricingCatalog:
+    _aws_offer(tmp_path / "ec2.json.gz")
+    _gcp_skus(tmp_path / "gce.json")
+    build_pricing_catalog(
+        tmp_path / "pricing.sqlite",
+        aws_offer_files=[tmp_path / "ec2.json.gz"],
+        gcp_sku_files=[tmp_path / "gce.json"],
+    )
+    return PricingCatalog(tmp_path / "pricing.sqlite")
+
+
+def test_next_size_down_lookups(catalog: PricingCatalog) -> None:
+    assert catalog.next_size_down("aws", "us-east-1", "m5.2xlarge") == InstancePrice(
+        "m5.xlarge", 0.192
+    )
+    assert catalog.next_size_down("aws", "us-east-1", "m5.xlarge", "Windows") == InstancePrice(
+        "m5.large", 0.192
+    )
+    assert catalog.price("aws", "us-east-1", "m5.2xlarge", "Windows") == InstancePrice(
+        "m5.2xlarge", 0.768
+    )
+    assert catalog.next_size_down("aws", "us-east-1", "m5.large") is None
+    assert catalog.next_size_down("aws", "us-east-1", "m5.metal") is None
+    assert catalog.price("aws", "eu-west-1", "m5.large") is None
+
+    smaller = catalog.next_size_down("gcp", "us-central1", "n2-standard-8")
+    assert smaller is not None and smaller.instance_type == "n2-standard-4"
+    assert smaller.usd_per_hour == pytest.approx(4 * 0.031611 + 16 * 0.004237)
+
+    restored = pickle.loads(pickle.dumps(catalog))
+    assert restored.price("aws", "us-east-1", "m5.large") == InstancePrice("m5.large", 0.096)
+
+
+def test_rightsizing_uses_catalog_prices(catalog: PricingCatalog) -> None:
+    inventory = pd.DataFrame(
+        {
+            "provider": ["aws", "aws", "gcp"],
+            "resource_id": ["i-1", "i-2", "vm-1"],
+            "resource_type": "instance",
+            "service": ["EC2", "EC2", "Compute Engine"],
+            "region": ["us-east-1", "us-east-1", "us-central1"],
+            "team": "core",
+            "instance_type": ["m5.2xlarge", "c9.large", "n2-standard-8"],
+            "monthly_cost_estimate_usd": [300.0, 200.0, 250.0],
+        }
+    )
+    utilization = inventory[["provider", "resource_id"]].assign(avg_cpu_pct=3.0)
+
+    found = detect_underutilized_compute(
+        inventory=inventory,
+        utilization=utilization,
+        underutilized_cpu_pct=10.0,
+        min_cost_usd=150.0,
+        pricing=catalog,
+    ).set_index("title")
+
+    m5 = found.loc["Rightsize underutilized compute: i-1"]
+    assert m5["estimated_savings_usd"] == round(0.192 * HOURS_PER_MONTH, 2)
+    assert m5["details"].endswith(", rightsize_to=m5.xlarge")
+    # Not in the catalog: flat estimate.
+    assert found.loc["Rightsize underutilized compute: i-2", "estimated_savings_usd"] == 50.0
+    assert (
+        "rightsize_to=n2-standard-4"
+        in found.loc["Rightsize underutilized compute: vm-1"]["details"]
+    )
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-import pytest
-
-from cloud_cost_audit.analytics.quick_wins import build_top_10_quick_wins
-from cloud_cost_audit.analytics.waste_detection import Opportunity
+from cloud_cost_audit.analytics.opportunities import (
+    Opportunity,
+    materialize_opportunities,
+    opportunity_frame,
+)
+from cloud_cost_audit.analytics.quick_wins import (
+    TopOpportunities,
+    build_quick_wins,
+    select_top_opportunities,
+    top_opportunities_by_team,
+)
 
 
 def test_builds_exactly_10_quick_wins_sorted() -> None:
@@ -20,13 +27,13 @@ def test_builds_exactly_10_quick_wins_sorted() -> None:
         )
         for i in range(1, 15)
     ]
-    wins = build_top_10_quick_wins(opps)
+    wins = build_quick_wins(opps)
     assert len(wins) == 10
     assert wins[0].expected_savings_monthly_usd == 14.0
     assert wins[-1].expected_savings_monthly_usd == 5.0
 
 
-def test_raises_when_less_than_10_opportunities() -> None:
+def test_returns_what_exists_when_less_than_k_opportunities() -> None:
     opps = [
         Opportunity(
             kind="k",
@@ -40,5 +47,82 @@ def test_raises_when_less_than_10_opportunities() -> None:
         )
         for _ in range(3)
     ]
-    with pytest.raises(ValueError):
-        build_top_10_quick_wins(opps)
+    wins = build_quick_wins(opps)
+    assert [w.rank for w in wins] == [1, 2, 3]
+    assert build_quick_wins(opps, k=2)[-1].rank == 2
+
+
+def test_columnar_opportunities_rank_like_objects() -> None:
+    opps = [
+        Opportunity(
+            kind=f"k{i}",
+            title=f"opp-{i}",
+            scope="aws",
+            estimated_savings_usd=float(i % 4),
+            confidence="high",
+            risk="low",
+            effort="S",
+            details="x",
+        )
+        for i in range(1, 15)
+    ]
+    frame = opportunity_frame(opps)
+
+    assert materialize_opportunities(frame) == opps
+    assert build_quick_wins(frame) == build_quick_wins(opps)
+
+
+def _opportunity(i: int, *, kind: str, team: str) -> Opportunity:
+    return Opportunity(
+        kind=kind,
+        title=f"opp-{i}",
+        scope="aws",
+        estimated_savings_usd=float(i % 7),
+        confidence="high",
+        risk="low",
+        effort="S",
+        details="x",
+        team=team,
+    )
+
+
+def test_streamed_batches_with_caps_match_a_greedy_full_sort() -> None:
+    opps = [
+        _opportunity(i, kind=f"k{i % 3}", team=["a", "b", "c", "d", ""][i % 5]) for i in range(200)
+    ]
+
+    def greedy(k: int, max_per_kind: int | None, max_per_team: int | None) -> list[str]:
+        kinds: dict[str, int] = {}
+        teams: dict[str, int] = {}
+        out: list[str] = []
+        for o in sorted(opps, key=lambda o: -o.estimated_savings_usd):
+            if kinds.get(o.kind, 0) >= (max_per_kind or k) or teams.get(o.team, 0) >= (
+                max_per_team or k
+            ):
+                continue
+            kinds[o.kind] = kinds.get(o.kind, 0) + 1
+            teams[o.team] = teams.get(o.team, 0) + 1
+            out.append(o.title)
+        return out[:k]
+
+    for caps in [(None, None), (2, None), (None, 3), (4, 2)]:
+        top = TopOpportunities(7, max_per_kind=caps[0], max_per_team=caps[1])
+        for start in range(0, len(opps), 16):
+            top.push(opportunity_frame(opps[start : start + 16]))
+        assert top.result()["title"].tolist() == greedy(7, *caps), caps
+        assert top.candidate_count <= 7 * 3 * 5
+        whole = select_top_opportunities(opps, k=7, max_per_kind=caps[0], max_per_team=caps[1])
+        assert whole["title"].tolist() == greedy(7, *caps)
+
+
+def test_top_opportunities_by_team_ranks_within_each_team() -> None:
+    opps = [_opportunity(i, kind="k", team="ab"[i % 2]) for i in range(10)]
+
+    by_team = top_opportunities_by_team(opps, k=2)
+
+    assert by_team[["team", "team_rank", "title"]].values.tolist() == [
+        ["a", 1, "opp-6"],
+        ["a", 2, "opp-4"],
+        ["b", 1, "opp-5"],
+        ["b", 2, "opp-3"],
+    ]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from cloud_cost_audit.analytics import registry
+from cloud_cost_audit.analytics.registry import (
+    BUILTIN_DETECTOR_MODULES,
+    DetectorInputs,
+    load_detector_modules,
+    registered_detectors,
+    run_detectors,
+)
+from cloud_cost_audit.config import AuditConfig, Thresholds
+from cloud_cost_audit.io.cloud_providers import Providers
+from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
+from cloud_cost_audit.pipeline import run_audit
+
+_IN_HOUSE = """
+from cloud_cost_audit.analytics.opportunities import Opportunity
+from cloud_cost_audit.analytics.registry import register_detector
+
+
+@register_detector(
+    "top_account", inputs=("line_items",), grain="month", thresholds={"share": "top_share"}
+)
+def detect_top_account(*, line_items, share):
+    by_account = line_items.groupby("account", observed=True)["cost_usd"].sum()
+    return [
+        Opportunity(
+            kind="top_account",
+            title=f"Review top account {by_account.idxmax()}",
+            scope="aws+gcp",
+            estimated_savings_usd=round(float(by_account.max()) * share, 2),
+            confidence="low",
+            risk="low",
+            effort="S",
+            details=f"{len(line_items)} monthly rows",
+        )
+    ]
+"""
+
+
+def test_in_house_detectors_plug_in_through_config(
+    audit_config: Callable[..., AuditConfig], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Register the built-ins first, so only the in-house detector lands in the patched copy.
+    load_detector_modules(BUILTIN_DETECTOR_MODULES)
+    monkeypatch.setattr(registry, "_REGISTRY", dict(registry._REGISTRY))
+    (tmp_path / "in_house_detectors.py").write_text(_IN_HOUSE, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    in_house = {"modules": ["in_house_detectors"]}
+    with pytest.raises(ValueError, match="needs threshold 'top_share'"):
+        run_audit(config=audit_config(detectors=in_house))
+    with pytest.raises(ValueError, match="Unknown detectors"):
+        registered_detectors(["top_acount"])
+    # Built-in threshold names are checked; in-house ones go under thresholds.custom.
+    with pytest.raises(ValidationError, match="min_compute_cost"):
+        audit_config(thresholds={"min_compute_cost": 150.0})
+
+    result = run_audit(
+        config=audit_config(detectors=in_house, thresholds={"custom": {"top_share": 0.5}})
+    )
+
+    assert result.quick_wins[0].title.startswith("Review top account")
+    assert len(result.quick_wins) == 10
+    # A later run without the module no longer sees its detector.
+    names = [spec.name for spec in registered_detectors(modules=BUILTIN_DETECTOR_MODULES)]
+    assert "top_account" in registry._REGISTRY and "top_account" not in names
+
+
+def test_run_detectors_merges_in_registration_order(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    providers = Providers.from_data_dir(tmp_path)
+    load_detector_modules(BUILTIN_DETECTOR_MODULES)
+    specs = [s for s in registered_detectors() if "line_items" not in s.inputs]
+    inputs = DetectorInputs(
+        inventory=providers.inventory(),
+        utilization=providers.utilization(),
+        line_items=lambda grain: pd.DataFrame(),
+        line_item_groups=pd.DataFrame(
+            {
+                "provider": ["aws"],
+                "service": ["AmazonS3"],
+                "sku": [""],
+                "env": ["prod"],
+                "cost_usd": [100.0],
+            }
+        ),
+    )
+    thresholds = Thresholds(underutilized_cpu_pct=10.0, min_compute_cost_usd=150.0)
+
+    serial = run_detectors(specs, inputs, thresholds=thresholds, max_workers=1)
+    assert serial["kind"].iloc[0] == "underutilized_compute"
+    assert serial["kind"].iloc[-1] == "storage_tier"
+    threaded = run_detectors(specs, inputs, thresholds=thresholds, max_workers=4)
+    pd.testing.assert_frame_equal(threaded, serial)
+    forked = run_detectors(specs, inputs, thresholds=thresholds, executor="process")
+    pd.testing.assert_frame_equal(forked, serial)
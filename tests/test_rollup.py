@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pytest
+
+from cloud_cost_audit.analytics.metrics import aggregate_line_items, compute_tag_coverage
+from cloud_cost_audit.config import AuditConfig
+from cloud_cost_audit.io.cloud_providers import Providers
+from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
+from cloud_cost_audit.pipeline import run_audit
+from cloud_cost_audit.transforms.duckdb_normalize import (
+    fetch_compacted_line_items,
+    fetch_last_usage_day,
+)
+from cloud_cost_audit.transforms.normalize import (
+    normalize_aws_billing,
+    normalize_gcp_billing,
+    unify_line_items,
+)
+from cloud_cost_audit.transforms.rollup import (
+    LineItemRollups,
+    grain_dimensions,
+    last_usage_day,
+    required_grain,
+    rollup_line_items,
+)
+
+
+def _line_items(data_dir: Path) -> pd.DataFrame:
+    ensure_synthetic_inputs(data_dir=data_dir, invoice_month="2026-01")
+    providers = Providers.from_data_dir(data_dir)
+    return unify_line_items(
+        [
+            normalize_aws_billing(providers.aws.billing()),
+            normalize_gcp_billing(providers.gcp.billing()),
+        ]
+    )
+
+
+def test_rollups_preserve_totals_and_refuse_finer_grains(tmp_path: Path) -> None:
+    line_items = _line_items(tmp_path)
+    daily = LineItemRollups(line_items, grain="line_item").at("day")
+    rollups = LineItemRollups(daily, grain="day")
+
+    monthly = rollups.at("month")
+    assert "usage_day" in daily.columns and "usage_day" not in monthly.columns
+    assert len(monthly) <= len(daily)
+    assert monthly["cost_usd"].sum() == pytest.approx(line_items["cost_usd"].sum())
+    # Synthetic rows cover the whole month, so day rollups spread them over all 31 days.
+    assert daily["usage_day"].nunique() == 31
+    assert daily["cost_usd"].sum() == pytest.approx(line_items["cost_usd"].sum())
+    assert rollups.for_consumer(compute_tag_coverage) is monthly
+    assert required_grain(aggregate_line_items) == "month"
+    with pytest.raises(ValueError, match="rolled up to day grain"):
+        rollups.at("line_item")
+
+
+@pytest.mark.parametrize("grain", ["day", "month"])
+def test_rollup_grain_keeps_audit_results(
+    audit_config: Callable[..., AuditConfig], tmp_path: Path, grain: str
+) -> None:
+    detail = run_audit(config=audit_config(output_dir=str(tmp_path / "a")))
+    rolled = run_audit(
+        config=audit_config(output_dir=str(tmp_path / "b"), ingestion={"rollup_grain": grain})
+    )
+
+    assert rolled.baseline_cost_usd == pytest.approx(detail.baseline_cost_usd)
+    assert rolled.quick_wins == detail.quick_wins
+    assert rolled.tag_coverage == detail.tag_coverage
+
+
+def test_duckdb_day_rollup_splits_rows_like_pandas(tmp_path: Path) -> None:
+    line_items = _line_items(tmp_path)
+    # One row crossing midnight, so partial-day windows are covered too.
+    line_items.loc[0, "usage_start_time"] = pd.Timestamp("2026-01-05 23:00:00")
+    line_items.loc[0, "usage_end_time"] = pd.Timestamp("2026-01-06 01:00:00")
+    # And one hourly row, which makes Jan 9 the last metered day.
+    line_items.loc[1, "usage_start_time"] = pd.Timestamp("2026-01-09 10:00:00")
+    line_items.loc[1, "usage_end_time"] = pd.Timestamp("2026-01-09 11:00:00")
+    dims = grain_dimensions("day")
+
+    expected = rollup_line_items(line_items, "day")
+    with duckdb.connect() as con:
+        con.register("line_items", line_items.astype({c: str for c in dims[:-1]}))
+        fetched = fetch_compacted_line_items(con, "line_items", dimensions=dims)
+        through = fetch_last_usage_day(con, "line_items")
+
+    by_day = ["usage_day"]
+    pd.testing.assert_series_equal(
+        fetched.groupby(by_day)["cost_usd"].sum().rename(None),
+        expected.astype({"usage_day": fetched["usage_day"].dtype})
+        .groupby(by_day)["cost_usd"]
+        .sum()
+        .rename(None),
+    )
+    assert through == last_usage_day(line_items) == pd.Timestamp("2026-01-09")
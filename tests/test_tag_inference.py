@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from cloud_cost_audit.config import AuditConfig
+from cloud_cost_audit.models.schema import (
+    UNIFIED_LINE_ITEM_SCHEMA,
+    as_category,
+    conform,
+    has_value,
+)
+from cloud_cost_audit.pipeline import run_audit
+from cloud_cost_audit.transforms.tag_inference import TagInference
+
+
+def test_blank_keys_follow_resource_then_project_then_account() -> None:
+    line_items = conform(
+        pd.DataFrame(
+            {
+                "provider": ["aws", "aws", "aws", "gcp", "gcp"],
+                "account": ["a1", "a1", "a2", "b1", "b1"],
+                "project": ["", "", "", "p1", "p2"],
+                "resource_id": ["i-1", "i-2", "i-1", "vm-1", "vm-2"],
+                "team": ["", "web", "", "", ""],
+                "cost_center": ["", "", "", "", "cc-9"],
+                "cost_usd": [10.0, 20.0, 30.0, 40.0, 50.0],
+            }
+        ),
+        UNIFIED_LINE_ITEM_SCHEMA,
+    )
+    inventory = pd.DataFrame(
+        {
+            "provider": ["aws", "gcp"],
+            "resource_id": ["i-1", "i-1"],
+            "team": ["data", "other"],
+            "cost_center": ["", "cc-0"],
+        }
+    )
+    ownership = pd.DataFrame(
+        {
+            "provider": ["aws", "gcp", "gcp"],
+            "account": ["a1", "b1", "b1"],
+            "project": ["", "p1", ""],
+            "team": ["platform", "ml", "analytics"],
+            "cost_center": ["cc-1", "", "cc-2"],
+        }
+    )
+
+    tags = TagInference(inventory, ownership, keys=["team", "cost_center"])
+    out = tags.enrich(line_items)
+
+    # Tagged values win; the inventory match is provider-qualified.
+    assert list(out["team"]) == ["data", "web", "data", "ml", "analytics"]
+    assert list(out["cost_center"]) == ["cc-1", "cc-1", "", "cc-2", "cc-9"]
+    assert isinstance(out["team"].dtype, pd.CategoricalDtype)
+    recovered = tags.recovered().set_index(["key", "source"])["recovered_cost_usd"]
+    assert recovered[("team", "resource")] == 40.0
+    assert recovered[("team", "project")] == 40.0
+    assert recovered[("team", "account")] == 50.0
+    assert recovered[("cost_center", "account")] == 70.0
+
+
+def test_tag_inference_stage_reports_recovered_coverage(
+    tmp_path: Path, audit_config: Callable[..., AuditConfig]
+) -> None:
+    ownership = tmp_path / "ownership.csv"
+    ownership.write_text(
+        "provider,account,project,team,cost_center\n"
+        "aws,222222222222,,data,cc-200\n"
+        "gcp,,saas-dev,data,cc-300\n",
+        encoding="utf-8",
+    )
+    tag_inference = {"ownership_map": str(ownership)}
+
+    result = run_audit(
+        config=audit_config(ingestion={"chunk_size_rows": 3}, tag_inference=tag_inference)
+    )
+
+    report = json.loads((tmp_path / "out" / "tag_inference.json").read_text(encoding="utf-8"))
+    cost_center = report["coverage_by_key"]["cost_center"]
+    assert cost_center["recovered_cost_usd"] > 0
+    assert cost_center["coverage_after"] == result.tag_coverage.coverage_by_key["cost_center"]
+    assert cost_center["coverage_before"] < cost_center["coverage_after"]
+
+    with pytest.raises(ValidationError, match="tag_inference requires engine=pandas"):
+        audit_config(ingestion={"engine": "duckdb"}, tag_inference=tag_inference)
+
+
+def test_ownership_maps_may_key_on_account_or_project_alone() -> None:
+    line_items = conform(
+        pd.DataFrame(
+            {
+                "provider": ["aws", "gcp"],
+                "account": ["a1", "b1"],
+                "project": ["", "p1"],
+                "resource_id": ["i-1", "vm-1"],
+                "team": [np.nan, "  "],
+                "cost_usd": [10.0, 20.0],
+            }
+        ),
+        UNIFIED_LINE_ITEM_SCHEMA,
+    )
+    inventory = pd.DataFrame(columns=["provider", "resource_id", "team"])
+    by_account = pd.DataFrame({"provider": ["aws"], "account": ["a1"], "team": ["web"]})
+    by_project = pd.DataFrame({"provider": ["gcp"], "project": ["p1"], "team": ["ml"]})
+
+    out = TagInference(inventory, by_account, keys=["team"]).enrich(line_items)
+    assert list(out["team"]) == ["web", "  "]
+    out = TagInference(inventory, by_project, keys=["team"]).enrich(line_items)
+    assert list(out["team"]) == ["", "ml"]
+    assert list(line_items["team"]) == ["", "  "]
+
+    with pytest.raises(ValueError, match="needs an account or project column"):
+        TagInference(inventory, by_account.drop(columns="account"))
+
+
+def test_blank_values_match_tag_coverage() -> None:
+    values = pd.Series(["web", "", "  ", None, np.nan], dtype=object)
+    expected = [True, False, False, False, False]
+    assert list(has_value(values)) == expected
+    assert list(has_value(values.astype("category"))) == expected
+    assert list(has_value(as_category(values))) == expected
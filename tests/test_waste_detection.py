@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from cloud_cost_audit.analytics.opportunities import OPPORTUNITY_COLUMNS, materialize_opportunities
+from cloud_cost_audit.analytics.waste_detection import (
+    detect_underutilized_compute,
+    detect_zombie_assets,
+)
+from cloud_cost_audit.io.cloud_providers import Providers
+from cloud_cost_audit.io.synthetic_data import ensure_synthetic_inputs
+
+
+def test_resource_detectors_emit_ranked_columnar_opportunities(tmp_path: Path) -> None:
+    ensure_synthetic_inputs(data_dir=tmp_path, invoice_month="2026-01")
+    providers = Providers.from_data_dir(tmp_path)
+    inventory = providers.inventory()
+
+    zombies = detect_zombie_assets(inventory=inventory)
+    assert zombies.columns.tolist() == OPPORTUNITY_COLUMNS
+    assert zombies["estimated_savings_usd"].is_monotonic_decreasing
+    first = materialize_opportunities(zombies.head(1))[0]
+    row = inventory.loc[inventory["resource_id"] == first.title.rsplit(" ", 1)[-1]].iloc[0]
+    assert first.kind == f"zombie_{row['resource_type']}"
+    assert first.scope == f"{row['provider']}:{row['region']}:{row['service']}"
+    assert first.details == f"status={row['status']}, created_at={row['created_at']}"
+
+    underutilized = detect_underutilized_compute(
+        inventory=inventory,
+        utilization=providers.utilization(),
+        underutilized_cpu_pct=10.0,
+        min_cost_usd=150.0,
+    )
+    assert len(underutilized) > 0
+    assert (
+        underutilized["details"]
+        .str.fullmatch(r"avg_cpu_pct=\d+\.\d, current_estimated_monthly_cost=\$\d+")
+        .all()
+    )